@@ -1,33 +1,131 @@
 """
 SkillSync Backend - Skill Analysis Module
 Contains core analysis algorithms for skill gap mapping
+
+This is the single gap analysis / roadmap engine: the API endpoints in
+app.py format its results instead of running their own loops.
 """
 
-import pandas as pd
-import os
-from typing import Dict, List, Tuple
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import CatalogSnapshot, get_catalog
+from learning_path import build_items, choose
+from metrics import timed
+from ml_predictor import predict_readiness, predict_readiness_batch, readiness_mode
+from skill_profile import SKILL_LEVELS, SkillProfile, parse_level, popcount, skill_mask
+
+# Level a required skill must reach to count as proficient
+REQUIRED_LEVEL = 'intermediate'
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+# Requestable match_percentage scoring: 'ml' uses the readiness model (which
+# reports itself as 'fallback' when no model file is loaded), 'rule' the
+# proficient + half of to-improve formula
+SCORING_MODES = ('ml', 'rule')
+
+# Share of the readiness model score in the role recommendation ranking
+# (the rest is the rule-based match percentage)
+RECOMMEND_READINESS_WEIGHT = 0.5
+
+# Roadmap step status per step type
+STEP_STATUS = {'new': 'New Skill', 'improve': 'Upgrade', 'prerequisite': 'Prerequisite'}
 
 
 class SkillAnalyzer:
     """Core class for skill gap analysis"""
     
-    SKILL_LEVELS = {
-        'beginner': 1,
-        'intermediate': 2,
-        'advanced': 3
-    }
+    SKILL_LEVELS = SKILL_LEVELS
     
-    def __init__(self):
-        self.skills_df = pd.read_csv(os.path.join(DATA_DIR, 'skills.csv'))
-        self.roles_df = pd.read_csv(os.path.join(DATA_DIR, 'job_roles.csv'))
-        self.resources_df = pd.read_csv(os.path.join(DATA_DIR, 'resources.csv'))
+    def __init__(self, snapshot: Optional[CatalogSnapshot] = None):
+        if snapshot is None:
+            snapshot = get_catalog().snapshot()
+        self.snapshot = snapshot
+        self._build_indexes()
     
+    # The snapshot's DataFrames (built on first use, so pandas is only
+    # imported by callers that want it)
+    
+    @property
+    def skills_df(self):
+        return self.snapshot.skills_df
+    
+    @property
+    def roles_df(self):
+        return self.snapshot.roles_df
+    
+    @property
+    def resources_df(self):
+        return self.snapshot.resources_df
+    
+    def _build_indexes(self):
+        """Precompute O(1) lookup tables from the catalog snapshot"""
+        # skill_id -> skill info dict
+        self._skill_index = {}
+        for skill_id, row in self.snapshot.skills.items():
+            self._skill_index[skill_id] = {
+                'skill_id': row['skill_id'],
+                'skill_name': row['skill_name'],
+                'category': row['category'],
+                'description': row['description']
+            }
+        
+        # role_id -> required skill IDs
+        self._role_index = {
+            role_id: list(row['required_skills'])
+            for role_id, row in self.snapshot.roles.items()
+        }
+        
+        self._skill_ordinal = {
+            skill_id: i for i, skill_id in enumerate(self.snapshot.skill_ids)
+        }
+        
+        # role_id -> bitmask of the required skills that exist in the catalog
+        # and (bit, ordinal, skill info) for them in requirement order; the
+        # analyze_gap fast path works on these
+        self._role_masks = {
+            role_id: skill_mask(required_skills, self._skill_ordinal)
+            for role_id, required_skills in self._role_index.items()
+        }
+        self._role_requirements = {
+            role_id: tuple(
+                (
+                    1 << self._skill_ordinal[skill_id],
+                    self._skill_ordinal[skill_id],
+                    self._skill_index[skill_id]
+                )
+                for skill_id in required_skills
+                if skill_id in self._skill_index
+            )
+            for role_id, required_skills in self._role_index.items()
+        }
+        
+        # Dense role x skill requirement matrix for batch scoring
+        self._role_ids = list(self._role_index)
+        self._role_ordinal = {role_id: i for i, role_id in enumerate(self._role_ids)}
+        self._role_matrix = np.zeros(
+            (len(self._role_ids), len(self._skill_ordinal)), dtype=np.float32
+        )
+        # Totals count every listed skill, even ones missing from skills.csv,
+        # exactly like analyze_gap does
+        self._role_totals = np.zeros(len(self._role_ids), dtype=np.float64)
+        for i, role_id in enumerate(self._role_ids):
+            required_skills = self._role_index[role_id]
+            self._role_totals[i] = len(required_skills)
+            for skill_id in required_skills:
+                ordinal = self._skill_ordinal.get(skill_id)
+                if ordinal is not None:
+                    self._role_matrix[i, ordinal] = 1
+        # Required skills per role that exist in skills.csv
+        self._role_sizes = self._role_matrix.sum(axis=1, dtype=np.float64)
+    
+    @timed('gap_analysis')
     def analyze_gap(
         self,
         user_skills: Dict[str, str],
-        target_role: str
+        target_role: str,
+        scoring_mode: str = 'rule'
     ) -> Dict:
         """
         Analyze skill gap between user skills and job role requirements
@@ -35,54 +133,223 @@ class SkillAnalyzer:
         Args:
             user_skills: Dict mapping skill_id to level (e.g., {"python": "intermediate"})
             target_role: Job role ID
+            scoring_mode: 'rule' or 'ml' (see SCORING_MODES)
             
         Returns:
-            Analysis result with proficient, to_improve, and missing skills
+            Analysis result with proficient, to_improve, and missing skills,
+            the match percentage and the scoring mode that produced it
+            ('rule', 'ml' or 'fallback')
         """
         # Get role requirements
-        role = self.roles_df[self.roles_df['role_id'] == target_role]
-        if role.empty:
+        requirements = self._role_requirements.get(target_role)
+        if requirements is None:
             return {"error": "Role not found"}
         
-        required_skills = role.iloc[0]['required_skills'].split(',')
-        required_skills = [s.strip() for s in required_skills]
+        required_value = self.SKILL_LEVELS[REQUIRED_LEVEL]
+        
+        # Classify every required skill at once
+        profile = self.profile(user_skills)
+        role_mask = self._role_masks[target_role]
+        proficient_mask = role_mask & profile.at_least(required_value)
+        to_improve_mask = role_mask & profile.skills & ~proficient_mask
         
         proficient = []
         to_improve = []
         missing = []
         
-        for skill_id in required_skills:
-            skill_info = self._get_skill_info(skill_id)
-            if not skill_info:
-                continue
-            
-            if skill_id in user_skills:
-                user_level = user_skills[skill_id].lower()
-                if self._is_proficient(user_level):
-                    proficient.append({
-                        **skill_info,
-                        'current_level': user_level
-                    })
-                else:
-                    to_improve.append({
-                        **skill_info,
-                        'current_level': user_level,
-                        'target_level': 'intermediate'
-                    })
+        for bit, ordinal, skill_info in requirements:
+            if proficient_mask & bit:
+                proficient.append({
+                    **skill_info,
+                    'current_level': profile.level_name(ordinal),
+                    'required_level': REQUIRED_LEVEL
+                })
+            elif to_improve_mask & bit:
+                to_improve.append({
+                    **skill_info,
+                    'current_level': profile.level_name(ordinal),
+                    'required_level': REQUIRED_LEVEL,
+                    'target_level': REQUIRED_LEVEL,
+                    'gap': required_value - profile.level_value(ordinal)
+                })
             else:
-                missing.append(skill_info)
+                missing.append({
+                    **skill_info,
+                    'required_level': REQUIRED_LEVEL
+                })
         
-        # Calculate match percentage
-        total = len(required_skills)
-        match = (len(proficient) + len(to_improve) * 0.5) / total * 100 if total > 0 else 0
+        # Calculate match percentage (the total also counts listed skills
+        # that are missing from skills.csv)
+        total = len(self._role_index[target_role])
+        if scoring_mode == 'ml':
+            match = predict_readiness(user_skills, target_role)
+            scoring_mode = readiness_mode()
+        else:
+            covered = popcount(proficient_mask) + popcount(to_improve_mask) * 0.5
+            match = covered / total * 100 if total > 0 else 0
+            scoring_mode = 'rule'
         
         return {
             'match_percentage': int(match),
+            'scoring_mode': scoring_mode,
+            'total_required': total,
             'proficient_skills': proficient,
             'skills_to_improve': to_improve,
             'missing_skills': missing
         }
     
+    def profile(self, user_skills: Dict[str, str]) -> SkillProfile:
+        """Bitset encoding of a skill map over this catalog's skill ordinals"""
+        return SkillProfile.encode(user_skills, self._skill_ordinal)
+    
+    def encode_profiles(self, profiles: List[Dict[str, str]]) -> np.ndarray:
+        """
+        Encode user skill maps as a users x skills level matrix
+        
+        Args:
+            profiles: List of dicts mapping skill_id to level
+            
+        Returns:
+            int8 matrix with -1 where the user lacks the skill, otherwise its
+            level value as SkillProfile.encode reads it (parse_level)
+        """
+        levels = np.full((len(profiles), len(self._skill_ordinal)), -1, dtype=np.int8)
+        for row, user_skills in enumerate(profiles):
+            for skill_id, level in user_skills.items():
+                ordinal = self._skill_ordinal.get(skill_id)
+                if ordinal is None:
+                    continue
+                levels[row, ordinal] = parse_level(level)
+        return levels
+    
+    @timed('gap_analysis_batch')
+    def analyze_gap_batch(
+        self,
+        profiles: List[Dict[str, str]],
+        role_ids: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Score many users against many roles in one pass of matrix operations
+        
+        Uses the same rules as analyze_gap: a required skill is proficient at
+        intermediate or above, to improve if the user has it at a lower level
+        and missing otherwise.
+        
+        Args:
+            profiles: List of dicts mapping skill_id to level
+            role_ids: Roles to score against (default: every role)
+            
+        Returns:
+            Dict with 'role_ids' and users x roles int arrays
+            'match_percentage', 'proficient', 'to_improve' and 'missing'
+        """
+        if role_ids is None:
+            role_ids = self._role_ids
+        unknown = [role_id for role_id in role_ids if role_id not in self._role_ordinal]
+        if unknown:
+            raise KeyError(f"Unknown roles: {', '.join(unknown)}")
+        
+        rows = [self._role_ordinal[role_id] for role_id in role_ids]
+        required = self._role_matrix[rows]
+        totals = self._role_totals[rows]
+        
+        levels = self.encode_profiles(profiles)
+        has_skill = (levels >= 0).astype(np.float32)
+        is_proficient = (levels >= self.SKILL_LEVELS['intermediate']).astype(np.float32)
+        
+        # users x roles counts
+        proficient = (is_proficient @ required.T).astype(np.float64)
+        covered = (has_skill @ required.T).astype(np.float64)
+        to_improve = covered - proficient
+        missing = self._role_sizes[rows] - covered
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            match = (proficient + to_improve * 0.5) / totals * 100
+        match = np.where(totals > 0, match, 0)
+        
+        return {
+            'role_ids': list(role_ids),
+            'match_percentage': match.astype(np.int64),
+            'proficient': proficient.astype(np.int64),
+            'to_improve': to_improve.astype(np.int64),
+            'missing': missing.astype(np.int64)
+        }
+    
+    @timed('recommend_roles')
+    def recommend_roles(
+        self,
+        user_skills: Dict[str, str],
+        k: int = 5,
+        scoring_mode: str = 'ml'
+    ) -> Dict:
+        """
+        Rank every role for one user
+        
+        The match percentage of all roles comes from one product of the
+        role x skill requirement matrix with the user's skill vectors; in
+        'ml' mode the readiness model scores all roles in one batched call
+        and the ranking score blends both (RECOMMEND_READINESS_WEIGHT).
+        
+        Args:
+            user_skills: Dict mapping skill_id to level
+            k: Number of roles to return
+            scoring_mode: 'ml' or 'rule' (see SCORING_MODES)
+            
+        Returns:
+            Dict with the scoring_mode used and 'roles', the top k roles best
+            first, each with role_id, score, match_percentage,
+            readiness_score (None in 'rule' mode) and skill counts
+        """
+        levels = self.encode_profiles([user_skills])[0]
+        vectors = np.stack([
+            levels >= 0,
+            levels >= self.SKILL_LEVELS[REQUIRED_LEVEL]
+        ], axis=1).astype(np.float32)
+        
+        # roles x 2: required skills the user has, and is proficient in
+        counts = (self._role_matrix @ vectors).astype(np.float64)
+        covered = counts[:, 0]
+        proficient = counts[:, 1]
+        to_improve = covered - proficient
+        missing = self._role_sizes - covered
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            match = (proficient + to_improve * 0.5) / self._role_totals * 100
+        match = np.where(self._role_totals > 0, match, 0).astype(np.int64)
+        
+        if scoring_mode == 'ml':
+            readiness = np.asarray(predict_readiness_batch(
+                [user_skills] * len(self._role_ids), self._role_ids
+            ), dtype=np.int64)
+            scores = (
+                RECOMMEND_READINESS_WEIGHT * readiness
+                + (1 - RECOMMEND_READINESS_WEIGHT) * match
+            )
+            scoring_mode = readiness_mode()
+        else:
+            readiness = None
+            scores = match.astype(np.float64)
+            scoring_mode = 'rule'
+        
+        # Best score first; ties keep job_roles.csv order
+        top = np.argsort(-scores, kind='stable')[:max(k, 0)]
+        
+        roles = []
+        for i in top.tolist():
+            roles.append({
+                'role_id': self._role_ids[i],
+                'score': round(float(scores[i]), 1),
+                'match_percentage': int(match[i]),
+                'readiness_score': int(readiness[i]) if readiness is not None else None,
+                'total_required': int(self._role_totals[i]),
+                'proficient': int(proficient[i]),
+                'to_improve': int(to_improve[i]),
+                'missing': int(missing[i])
+            })
+        
+        return {'scoring_mode': scoring_mode, 'roles': roles}
+    
+    @timed('roadmap')
     def generate_roadmap(
         self,
         missing_skills: List[str],
@@ -91,6 +358,12 @@ class SkillAnalyzer:
         """
         Generate personalized learning roadmap
         
+        Missing skills come first, prerequisites before the skills that need
+        them and otherwise by category priority (the catalog's cached
+        learning order), with the top 3 of all their resources; skills to
+        improve follow in the given order with the top 2 resources of the
+        next level.
+        
         Args:
             missing_skills: List of skill IDs to learn
             skills_to_improve: List of dicts with skill_id and current_level
@@ -101,29 +374,26 @@ class SkillAnalyzer:
         roadmap = []
         step = 1
         
-        # Priority order for categories
-        category_order = [
-            'Core CS', 'Programming', 'Web Development',
-            'Database', 'AI/ML', 'Data Science',
-            'Tools', 'Cloud', 'Soft Skills'
-        ]
+        # Resources, hours and priority per skill are precomputed with the catalog
+        missing_fragments = []
+        for skill_id in missing_skills:
+            fragment = self.snapshot.roadmap_fragment(skill_id)
+            if fragment is not None:
+                missing_fragments.append(fragment)
         
-        # Sort missing skills by category priority
-        sorted_missing = self._sort_by_category(missing_skills, category_order)
+        # Sort missing skills into the catalog's learning order
+        rank = self.snapshot.skill_graph.rank
+        missing_fragments.sort(key=lambda fragment: rank[fragment.skill_id])
         
-        for skill_id in sorted_missing:
-            skill_info = self._get_skill_info(skill_id)
-            if not skill_info:
-                continue
-            
-            resources = self._get_resources(skill_id, 'beginner')
-            
+        for fragment in missing_fragments:
             roadmap.append({
                 'step': step,
                 'type': 'new',
-                **skill_info,
-                'target_level': 'intermediate',
-                'resources': resources
+                'status': 'New Skill',
+                **self._skill_index[fragment.skill_id],
+                'target_level': REQUIRED_LEVEL,
+                'estimated_hours': fragment.total_hours,
+                'resources': list(fragment.resources[:3])
             })
             step += 1
         
@@ -132,80 +402,134 @@ class SkillAnalyzer:
             skill_id = skill_data.get('skill_id')
             current = skill_data.get('current_level', 'beginner')
             
-            skill_info = self._get_skill_info(skill_id)
-            if not skill_info:
-                continue
-            
+            # Resources for the next level (all resources if there are none)
             target = 'intermediate' if current == 'beginner' else 'advanced'
-            resources = self._get_resources(skill_id, target)
+            fragment = self.snapshot.roadmap_fragment(skill_id, target)
+            if fragment is None:
+                continue
             
             roadmap.append({
                 'step': step,
                 'type': 'improve',
-                **skill_info,
+                'status': 'Upgrade',
+                **self._skill_index[skill_id],
                 'current_level': current,
                 'target_level': target,
-                'resources': resources
+                'estimated_hours': fragment.total_hours,
+                'resources': list(fragment.resources[:2])
             })
             step += 1
         
         return roadmap
     
-    def _get_skill_info(self, skill_id: str) -> Dict:
-        """Get skill information by ID"""
-        skill = self.skills_df[self.skills_df['skill_id'] == skill_id]
-        if skill.empty:
-            return None
+    @timed('roadmap_optimize')
+    def optimize_roadmap(
+        self,
+        missing_skills: List[str],
+        skills_to_improve: List[Dict],
+        budget_hours: float,
+        hours_per_week: float,
+        known_skills: Optional[Iterable[str]] = None,
+        total_required: Optional[int] = None
+    ) -> Dict:
+        """
+        Roadmap that fits a study-time budget (see learning_path.py)
         
-        row = skill.iloc[0]
-        return {
-            'skill_id': row['skill_id'],
-            'skill_name': row['skill_name'],
-            'category': row['category'],
-            'description': row['description']
-        }
-    
-    def _get_resources(self, skill_id: str, level: str) -> List[Dict]:
-        """Get learning resources for a skill"""
-        resources = self.resources_df[self.resources_df['skill_id'] == skill_id]
-        
-        # Filter by difficulty if possible
-        level_resources = resources[resources['difficulty'] == level]
-        if level_resources.empty:
-            level_resources = resources
-        
-        result = []
-        for _, row in level_resources.head(3).iterrows():
-            result.append({
-                'name': row['resource_name'],
-                'type': row['resource_type'],
-                'url': row['url'],
-                'hours': int(row['estimated_hours'])
+        Picks the skills, target levels and cheapest resources that gain the
+        most match percentage within budget_hours, and schedules every
+        prerequisite the user lacks before the skills that need it.
+        
+        Args:
+            missing_skills: List of skill IDs to learn
+            skills_to_improve: List of dicts with skill_id and current_level
+            budget_hours: Study hours available until the deadline
+            hours_per_week: Study pace, for the week numbers of each step
+            known_skills: Skills the user has at any level (default: every
+                          catalog skill not in missing_skills)
+            total_required: Skills the match percentage is out of (default:
+                            the number of skills listed)
+            
+        Returns:
+            Dict with the 'roadmap' steps, 'total_estimated_hours',
+            'match_percentage_gain', 'gain_per_hour' and the listed skills
+            left 'unscheduled' ({'skill_id', 'reason'})
+        """
+        improve = [
+            (skill_data.get('skill_id'), skill_data.get('current_level', 'beginner'))
+            for skill_data in skills_to_improve
+        ]
+        if known_skills is None:
+            known_skills = set(self.snapshot.skill_ids) - set(missing_skills)
+        items, unscheduled = build_items(self.snapshot, missing_skills, improve, set(known_skills))
+        chosen = choose(items, budget_hours)
+        
+        if not total_required:
+            total_required = len(missing_skills) + len(skills_to_improve)
+        # One match point is half a required skill
+        point_percentage = 50 / total_required if total_required else 0
+        
+        roadmap = []
+        hours = 0
+        points = 0
+        for i, option in chosen:
+            item = items[i]
+            start_week = int(hours // hours_per_week) + 1
+            hours += option.hours
+            points += option.points
+            
+            step = {
+                'step': len(roadmap) + 1,
+                'type': item.kind,
+                'status': STEP_STATUS[item.kind],
+                **self._skill_index[item.skill_id]
+            }
+            if item.current_level is not None:
+                step['current_level'] = item.current_level
+            step.update({
+                'target_level': option.level,
+                'estimated_hours': option.hours,
+                'resources': list(option.resources),
+                'match_gain': round(option.points * point_percentage, 1),
+                'start_week': start_week,
+                'end_week': max(start_week, math.ceil(hours / hours_per_week))
             })
+            roadmap.append(step)
         
-        return result
-    
-    def _is_proficient(self, level: str) -> bool:
-        """Check if user level meets requirement (intermediate)"""
-        return self.SKILL_LEVELS.get(level, 0) >= 2
-    
-    def _sort_by_category(
-        self,
-        skill_ids: List[str],
-        category_order: List[str]
-    ) -> List[str]:
-        """Sort skills by category priority"""
-        def get_priority(skill_id):
-            skill = self.skills_df[self.skills_df['skill_id'] == skill_id]
-            if skill.empty:
-                return 99
-            category = skill.iloc[0]['category']
-            try:
-                return category_order.index(category)
-            except ValueError:
-                return 99
-        
-        return sorted(skill_ids, key=get_priority)
+        scheduled = {i for i, _ in chosen}
+        for i, item in enumerate(items):
+            if i in scheduled or item.kind == 'prerequisite':
+                continue
+            if not item.options:
+                reason = 'no_resources'
+            elif item.blocked:
+                reason = 'prerequisite_unavailable'
+            else:
+                reason = 'budget'
+            unscheduled.append({'skill_id': item.skill_id, 'reason': reason})
+        
+        gain = points * point_percentage
+        return {
+            'roadmap': roadmap,
+            'total_estimated_hours': hours,
+            'match_percentage_gain': round(gain, 1),
+            'gain_per_hour': round(gain / hours, 3) if hours else 0.0,
+            'unscheduled': unscheduled
+        }
+
+
+_analyzer = None
+
+
+def get_analyzer(snapshot: Optional[CatalogSnapshot] = None) -> SkillAnalyzer:
+    """Shared SkillAnalyzer for a catalog snapshot (default: the current one)"""
+    global _analyzer
+    if snapshot is None:
+        snapshot = get_catalog().snapshot()
+    analyzer = _analyzer
+    if analyzer is None or analyzer.snapshot is not snapshot:
+        analyzer = SkillAnalyzer(snapshot)
+        _analyzer = analyzer
+    return analyzer
 
 
 # Example usage
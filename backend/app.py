@@ -9,61 +9,201 @@ This backend provides APIs for:
 - User management
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import pandas as pd
 import os
 import json
-from datetime import datetime
+import math
+import threading
+import time
+from datetime import date, datetime
 
 # Import ML predictor for job readiness
-from ml_predictor import predict_readiness, get_skill_recommendations
+from ml_predictor import (
+    get_skill_recommendations, preload_model, model_status,
+    model_version, readiness_cache_stats, batching_stats, unmapped_stats
+)
+from catalog import get_catalog
+from analyzer import get_analyzer, SCORING_MODES
+from cache import TTLCache, profile_key
+from user_store import get_user_store, VersionConflict
+from progress_log import get_progress_log
+from similarity import get_similarity_index, METRICS
+from bulk_users import import_profiles, export_lines, validate_row, NDJSON_MIMETYPE
+from static_responses import StaticResponseCache, make_static_response
+from skill_profile import MAX_LEVEL, valid_level
+import metrics
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Default JSON handling, with serialization timed as a metrics section"""
+    
+    def dumps(self, obj, **kwargs):
+        with metrics.section('serialization'):
+            return super().dumps(obj, **kwargs)
+
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 CORS(app)  # Enable CORS for Flutter app
 
 # Data directory
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
-USERS_FILE = os.path.join(DATA_DIR, 'users.csv')
 
-# Load CSV data
-def load_skills():
-    """Load skills database"""
-    return pd.read_csv(os.path.join(DATA_DIR, 'skills.csv'))
+# Upper bound on profiles scored by one /api/analyze-gap/batch call
+MAX_BATCH_USERS = 50000
+
+# Roles returned by /api/recommend-roles when k is not given
+DEFAULT_RECOMMEND_K = 5
+
+# /api/roadmap modes: the full gap in priority order, or the best plan that
+# fits a study-time budget
+ROADMAP_MODES = ('standard', 'optimize')
+MAX_HOURS_PER_WEEK = 168
+# Longest study plan an optimized roadmap accepts (ten years)
+MAX_ROADMAP_WEEKS = 520
+# Gap skills (missing plus to improve) one optimized roadmap may plan
+MAX_ROADMAP_SKILLS = 100
+
+# Users returned by /api/users/<id>/similar when k is not given, and the cap
+DEFAULT_SIMILAR_K = 5
+MAX_SIMILAR_K = 100
+
+# Catalog CSVs are loaded once and hot-reloaded when they change on disk
+catalog = get_catalog()
+catalog.snapshot()
+catalog.start_watcher()
+
+# Load the ML model before serving so no request pays for deserializing it
+preload_model()
+
+# Memoized /api/analyze-gap payloads (SKILLSYNC_CACHE_SIZE / SKILLSYNC_CACHE_TTL)
+gap_cache = TTLCache()
+
+# User profiles and progress (SQLite by default, see user_store.py)
+user_store = get_user_store()
+
+# Progress updates are appended to an event log and folded into the user
+# store in the background
+progress_log = get_progress_log(user_store)
+progress_log.start()
+
+# Skill vectors of all users for peer matching, built on first query
+similarity_index = get_similarity_index(user_store)
+
+
+# Catalog endpoint bodies, serialized once per catalog version (same bytes
+# jsonify would produce)
+static_responses = StaticResponseCache(lambda payload: app.json.response(payload).get_data())
 
-def load_job_roles():
-    """Load job roles database"""
-    return pd.read_csv(os.path.join(DATA_DIR, 'job_roles.csv'))
 
-def load_resources():
-    """Load learning resources database"""
-    return pd.read_csv(os.path.join(DATA_DIR, 'resources.csv'))
+def catalog_response(snapshot, key, build):
+    """ETag/Cache-Control response for a catalog payload; 304 if unchanged"""
+    entry = static_responses.get(snapshot.version, key, build)
+    return make_static_response(request, entry)
 
-def load_users():
-    """Load users database, create if not exists"""
-    if not os.path.exists(USERS_FILE):
-        df = pd.DataFrame(columns=[
-            'user_id', 'name', 'email', 'degree', 'branch', 'semester',
-            'interests', 'skills', 'selected_role', 'progress', 'created_at'
-        ])
-        df.to_csv(USERS_FILE, index=False)
-    return pd.read_csv(USERS_FILE)
 
-def save_users(df):
-    """Save users database"""
-    df.to_csv(USERS_FILE, index=False)
+# ==================== METRICS ====================
+
+def _route_label():
+    """URL rule of the request (unmatched paths share one label)"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+@app.before_request
+def start_request_timer():
+    g.route_token = metrics.enter_route(_route_label())
+    g.request_start = time.perf_counter()
+    if metrics.PROFILING_ENABLED and request.headers.get(metrics.PROFILE_HEADER):
+        g.profiler = metrics.SamplingProfiler(threading.get_ident()).start()
+
+
+@app.after_request
+def record_request_time(response):
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    seconds = time.perf_counter() - start
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+    
+    route = _route_label()
+    metrics.observe_request(route, request.method, response.status_code, seconds)
+    if profiler is not None:
+        profile_id = metrics.save_profile(route, seconds, profiler)
+        response.headers[f'{metrics.PROFILE_HEADER}-Id'] = profile_id
+    return response
+
+
+@app.teardown_request
+def end_request_route(exc):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+    token = g.pop('route_token', None)
+    if token is not None:
+        metrics.exit_route(token)
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request and section latency histograms in Prometheus text format"""
+    return Response(metrics.render_metrics(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+
+@app.route('/debug/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    Collapsed stacks of a profiled request (SKILLSYNC_PROFILING=1 only).
+    Feed the text to flamegraph.pl or speedscope.
+    """
+    profile = metrics.get_profile(profile_id) if metrics.PROFILING_ENABLED else None
+    if profile is None:
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    return Response(profile, mimetype='text/plain')
 
 
 # ==================== API ENDPOINTS ====================
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """
+    Health check endpoint.
+    Returns 503 until the startup model load has finished, so load balancers
+    only route to warm workers. A missing model is not an error: the API
+    falls back to rule-based readiness scoring.
+    """
+    model = model_status()
+    ready = model['attempted']
+    
+    if model['loaded']:
+        message = 'SkillSync API is running (with ML Model)'
+    elif ready:
+        message = 'SkillSync API is running (ML Model unavailable, using fallback scoring)'
+    else:
+        message = 'SkillSync API is starting (ML Model loading)'
+    
     return jsonify({
-        'status': 'healthy',
-        'message': 'SkillSync API is running (with ML Model)',
+        'status': 'healthy' if ready else 'starting',
+        'message': message,
+        'model': {
+            'loaded': model['loaded'],
+            'load_seconds': model['load_seconds'],
+            'mmap_mode': model['mmap_mode'],
+            'error': model['error'],
+            # Inputs the model has no feature for (scored as if absent)
+            'unmapped': unmapped_stats()
+        },
+        'catalog_version': catalog.snapshot().version,
+        'caches': {
+            'analyze_gap': gap_cache.stats(),
+            'readiness': readiness_cache_stats()
+        },
+        'batching': batching_stats(),
         'timestamp': datetime.now().isoformat()
-    })
+    }), 200 if ready else 503
 
 
 # ==================== SKILLS ENDPOINTS ====================
@@ -71,11 +211,15 @@ def health_check():
 @app.route('/api/skills', methods=['GET'])
 def get_all_skills():
     """Get all available skills"""
-    skills_df = load_skills()
-    
+    snapshot = catalog.snapshot()
+    return catalog_response(snapshot, ('skills',), lambda: _all_skills_payload(snapshot))
+
+
+def _all_skills_payload(snapshot):
+    """Body of GET /api/skills"""
     # Group by category
     skills_by_category = {}
-    for _, row in skills_df.iterrows():
+    for row in snapshot.skills.values():
         category = row['category']
         if category not in skills_by_category:
             skills_by_category[category] = []
@@ -85,42 +229,99 @@ def get_all_skills():
             'description': row['description']
         })
     
-    return jsonify({
+    return {
         'success': True,
         'data': skills_by_category,
-        'total_skills': len(skills_df)
-    })
+        'total_skills': len(snapshot.skills)
+    }
 
 
 @app.route('/api/skills/<skill_id>', methods=['GET'])
 def get_skill(skill_id):
     """Get a specific skill by ID"""
-    skills_df = load_skills()
-    skill = skills_df[skills_df['skill_id'] == skill_id]
+    snapshot = catalog.snapshot()
+    skill = snapshot.skills.get(skill_id)
     
-    if skill.empty:
+    if skill is None:
         return jsonify({'success': False, 'error': 'Skill not found'}), 404
     
-    skill_data = skill.iloc[0].to_dict()
+    skill_data = dict(skill)
     
     # Get resources for this skill
-    resources_df = load_resources()
-    skill_resources = resources_df[resources_df['skill_id'] == skill_id]
-    skill_data['resources'] = skill_resources.to_dict('records')
+    skill_data['resources'] = [dict(res) for res in snapshot.get_resources(skill_id)]
     
     return jsonify({'success': True, 'data': skill_data})
 
 
+@app.route('/api/skills/<skill_id>/unlocks', methods=['GET'])
+def get_skill_unlocks(skill_id):
+    """
+    Prerequisites of a skill and the skills learning it leads to
+    
+    Query params:
+        known: Comma-separated skill IDs the user already has (optional);
+               adds 'ready', the skills whose prerequisites are all met once
+               this skill is learned too
+    """
+    snapshot = catalog.snapshot()
+    if skill_id not in snapshot.skills:
+        return jsonify({'success': False, 'error': 'Skill not found'}), 404
+    
+    known = request.args.get('known')
+    if known is None:
+        return catalog_response(
+            snapshot, ('skill_unlocks', skill_id),
+            lambda: _skill_unlocks_payload(snapshot, skill_id)
+        )
+    
+    payload = _skill_unlocks_payload(snapshot, skill_id)
+    known_skills = [s.strip() for s in known.split(',') if s.strip()]
+    payload['data']['ready'] = _skill_refs(
+        snapshot, snapshot.skill_graph.ready_after(skill_id, known_skills)
+    )
+    return jsonify(payload)
+
+
+def _skill_refs(snapshot, skill_ids):
+    """id/name/category of catalog skills, in the given order"""
+    return [
+        {
+            'id': skill_id,
+            'name': snapshot.skills[skill_id]['skill_name'],
+            'category': snapshot.skills[skill_id]['category']
+        }
+        for skill_id in skill_ids
+    ]
+
+
+def _skill_unlocks_payload(snapshot, skill_id):
+    """Body of GET /api/skills/<skill_id>/unlocks (without 'ready')"""
+    graph = snapshot.skill_graph
+    return {
+        'success': True,
+        'data': {
+            'skill_id': skill_id,
+            'prerequisites': _skill_refs(snapshot, graph.prerequisites(skill_id)),
+            'unlocks': _skill_refs(snapshot, graph.unlocks(skill_id)),
+            'leads_to': _skill_refs(snapshot, graph.unlocks(skill_id, transitive=True))
+        }
+    }
+
+
 # ==================== JOB ROLES ENDPOINTS ====================
 
 @app.route('/api/job-roles', methods=['GET'])
 def get_all_job_roles():
     """Get all available job roles"""
-    roles_df = load_job_roles()
-    
+    snapshot = catalog.snapshot()
+    return catalog_response(snapshot, ('job_roles',), lambda: _all_job_roles_payload(snapshot))
+
+
+def _all_job_roles_payload(snapshot):
+    """Body of GET /api/job-roles"""
     roles = []
-    for _, row in roles_df.iterrows():
-        required_skills = row['required_skills'].split(',')
+    for row in snapshot.roles.values():
+        required_skills = list(row['required_skills'])
         roles.append({
             'id': row['role_id'],
             'name': row['role_name'],
@@ -130,34 +331,37 @@ def get_all_job_roles():
             'skill_count': len(required_skills)
         })
     
-    return jsonify({'success': True, 'data': roles})
+    return {'success': True, 'data': roles}
 
 
 @app.route('/api/job-roles/<role_id>', methods=['GET'])
 def get_job_role(role_id):
     """Get a specific job role with detailed skill requirements"""
-    roles_df = load_job_roles()
-    role = roles_df[roles_df['role_id'] == role_id]
+    snapshot = catalog.snapshot()
+    role_data = snapshot.roles.get(role_id)
     
-    if role.empty:
+    if role_data is None:
         return jsonify({'success': False, 'error': 'Role not found'}), 404
     
-    role_data = role.iloc[0]
-    required_skill_ids = role_data['required_skills'].split(',')
-    
+    return catalog_response(
+        snapshot, ('job_role', role_id), lambda: _job_role_payload(snapshot, role_data)
+    )
+
+
+def _job_role_payload(snapshot, role_data):
+    """Body of GET /api/job-roles/<role_id>"""
     # Get detailed skill info
-    skills_df = load_skills()
     required_skills = []
-    for skill_id in required_skill_ids:
-        skill = skills_df[skills_df['skill_id'] == skill_id.strip()]
-        if not skill.empty:
+    for skill_id in role_data['required_skills']:
+        skill = snapshot.skills.get(skill_id)
+        if skill is not None:
             required_skills.append({
-                'id': skill.iloc[0]['skill_id'],
-                'name': skill.iloc[0]['skill_name'],
-                'category': skill.iloc[0]['category']
+                'id': skill['skill_id'],
+                'name': skill['skill_name'],
+                'category': skill['category']
             })
     
-    return jsonify({
+    return {
         'success': True,
         'data': {
             'id': role_data['role_id'],
@@ -166,11 +370,21 @@ def get_job_role(role_id):
             'icon': role_data['icon'],
             'required_skills': required_skills
         }
-    })
+    }
 
 
 # ==================== SKILL GAP ANALYSIS (ML-POWERED) ====================
 
+def _user_skills_error(user_skills):
+    """Why user_skills is not a skill_id -> level object, or None if it is"""
+    if not isinstance(user_skills, dict):
+        return 'user_skills must be an object'
+    for skill_id, level in user_skills.items():
+        if not valid_level(level):
+            return f'Level of {skill_id} must be a level name or an integer from 0 to {MAX_LEVEL}'
+    return None
+
+
 @app.route('/api/analyze-gap', methods=['POST'])
 def analyze_skill_gap():
     """
@@ -183,8 +397,12 @@ def analyze_skill_gap():
             "python": "intermediate",
             "sql": "beginner"
         },
-        "target_role": "data_analyst"
+        "target_role": "data_analyst",
+        "scoring_mode": "ml"  // optional: "ml" (default) or "rule"
     }
+    
+    data.scoring_mode tells which score match_percentage holds: "ml",
+    "fallback" (no model file loaded) or "rule".
     """
     data = request.get_json()
     
@@ -193,98 +411,244 @@ def analyze_skill_gap():
     
     user_skills = data.get('user_skills', {})
     target_role = data.get('target_role')
+    scoring_mode = data.get('scoring_mode', 'ml')
     
     if not target_role:
         return jsonify({'success': False, 'error': 'target_role is required'}), 400
     
-    # Get role requirements
-    roles_df = load_job_roles()
-    role = roles_df[roles_df['role_id'] == target_role]
+    error = _user_skills_error(user_skills)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    
+    if scoring_mode not in SCORING_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"scoring_mode must be one of: {', '.join(SCORING_MODES)}"
+        }), 400
+    
+    snapshot = catalog.snapshot()
+    
+    # Identical profiles for the same role, scoring mode and catalog/model
+    # versions are served from the cache
+    key = profile_key(user_skills, target_role, scoring_mode, snapshot.version, model_version())
+    hit, result = gap_cache.get(key)
+    if not hit:
+        result = _compute_skill_gap(user_skills, target_role, scoring_mode, snapshot)
+        if result is not None:
+            gap_cache.set(key, result)
     
-    if role.empty:
+    if result is None:
         return jsonify({'success': False, 'error': 'Role not found'}), 404
     
-    role_data = role.iloc[0]
-    required_skill_ids = [s.strip() for s in role_data['required_skills'].split(',')]
-    
-    # Get skill details
-    skills_df = load_skills()
-    
-    # Analyze gaps
-    proficient_skills = []
-    skills_to_improve = []
-    missing_skills = []
-    
-    skill_level_values = {'beginner': 1, 'intermediate': 2, 'advanced': 3}
-    required_level = 'intermediate'  # Default required level
-    
-    for skill_id in required_skill_ids:
-        skill_info = skills_df[skills_df['skill_id'] == skill_id]
-        if skill_info.empty:
-            continue
-            
-        skill_name = skill_info.iloc[0]['skill_name']
-        skill_category = skill_info.iloc[0]['category']
-        
-        if skill_id in user_skills:
-            user_level = user_skills[skill_id].lower()
-            user_level_value = skill_level_values.get(user_level, 0)
-            required_level_value = skill_level_values.get(required_level, 2)
-            
-            if user_level_value >= required_level_value:
-                proficient_skills.append({
-                    'skill_id': skill_id,
-                    'skill_name': skill_name,
-                    'category': skill_category,
-                    'current_level': user_level,
-                    'required_level': required_level
-                })
-            else:
-                skills_to_improve.append({
-                    'skill_id': skill_id,
-                    'skill_name': skill_name,
-                    'category': skill_category,
-                    'current_level': user_level,
-                    'required_level': required_level,
-                    'gap': required_level_value - user_level_value
-                })
-        else:
-            missing_skills.append({
-                'skill_id': skill_id,
-                'skill_name': skill_name,
-                'category': skill_category,
-                'required_level': required_level
-            })
+    return jsonify({
+        'success': True,
+        'data': result
+    })
+
+
+def _compute_skill_gap(user_skills, target_role, scoring_mode, snapshot):
+    """Gap analysis payload for /api/analyze-gap, or None if the role is unknown"""
+    gap = get_analyzer(snapshot).analyze_gap(user_skills, target_role, scoring_mode)
+    if 'error' in gap:
+        return None
     
-    # ===== USE ML MODEL FOR JOB READINESS PREDICTION =====
-    ml_readiness_score = predict_readiness(user_skills, target_role)
+    role_data = snapshot.roles[target_role]
     
     # Get skill recommendations from ML module
     recommendations = get_skill_recommendations(user_skills, target_role)
     
-    # Combine ML score with gap analysis
-    total_required = len(required_skill_ids)
-    
+    return {
+        'target_role': {
+            'id': role_data['role_id'],
+            'name': role_data['role_name'],
+            'icon': role_data['icon']
+        },
+        'match_percentage': gap['match_percentage'],
+        'scoring_mode': gap['scoring_mode'],
+        'proficient_skills': gap['proficient_skills'],
+        'skills_to_improve': gap['skills_to_improve'],
+        'missing_skills': gap['missing_skills'],
+        'recommendations': recommendations,
+        'summary': {
+            'total_required': gap['total_required'],
+            'proficient': len(gap['proficient_skills']),
+            'to_improve': len(gap['skills_to_improve']),
+            'missing': len(gap['missing_skills']),
+            # Kept for older clients; same value as match_percentage
+            'ml_readiness_score': gap['match_percentage']
+        }
+    }
+
+
+@app.route('/api/analyze-gap/batch', methods=['POST'])
+def analyze_skill_gap_batch():
+    """
+    Score many users against many job roles in one request.
+    Uses the rule-based match formula of SkillAnalyzer (scoring_mode "rule") (proficient skills
+    count fully, skills to improve count half), computed as matrix operations.
+
+    Request body:
+    {
+        "users": [
+            {"user_id": "u1", "user_skills": {"python": "intermediate"}},
+            {"user_id": "u2", "user_skills": {"html": "advanced"}}
+        ],
+        "target_roles": ["data_analyst", "web_developer"]  // optional, default all
+    }
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'success': False, 'error': 'No data provided'}), 400
+
+    users = data.get('users')
+    target_roles = data.get('target_roles')
+
+    if not isinstance(users, list) or not users:
+        return jsonify({'success': False, 'error': 'users must be a non-empty list'}), 400
+
+    if len(users) > MAX_BATCH_USERS:
+        return jsonify({
+            'success': False,
+            'error': f'At most {MAX_BATCH_USERS} users per batch'
+        }), 400
+
+    if target_roles is not None and (
+        not isinstance(target_roles, list)
+        or not all(isinstance(role_id, str) for role_id in target_roles)
+    ):
+        return jsonify({'success': False, 'error': 'target_roles must be a list of role IDs'}), 400
+
+    profiles = []
+    for user in users:
+        user_skills = user.get('user_skills') if isinstance(user, dict) else None
+        if not isinstance(user_skills, dict):
+            return jsonify({'success': False, 'error': 'Each user needs a user_skills object'}), 400
+        error = _user_skills_error(user_skills)
+        if error:
+            return jsonify({'success': False, 'error': f'User {len(profiles)}: {error}'}), 400
+        profiles.append(user_skills)
+
+    try:
+        result = get_analyzer().analyze_gap_batch(profiles, target_roles)
+    except KeyError as e:
+        return jsonify({'success': False, 'error': e.args[0]}), 404
+
+    role_ids = result['role_ids']
+    match = result['match_percentage'].tolist()
+    proficient = result['proficient'].tolist()
+    to_improve = result['to_improve'].tolist()
+    missing = result['missing'].tolist()
+
+    results = []
+    for i, user in enumerate(users):
+        results.append({
+            'user_id': user.get('user_id', i),
+            'scores': [
+                {
+                    'role_id': role_id,
+                    'match_percentage': match[i][j],
+                    'proficient': proficient[i][j],
+                    'to_improve': to_improve[i][j],
+                    'missing': missing[i][j]
+                }
+                for j, role_id in enumerate(role_ids)
+            ]
+        })
+
     return jsonify({
         'success': True,
         'data': {
-            'target_role': {
+            'roles': role_ids,
+            'scoring_mode': 'rule',
+            'results': results,
+            'total_users': len(results)
+        }
+    })
+
+
+# ==================== ROLE RECOMMENDATION ====================
+
+@app.route('/api/recommend-roles', methods=['GET', 'POST'])
+def recommend_roles():
+    """
+    Rank every job role for a user, best first.
+    Combines the rule-based match with the ML readiness score.
+    
+    GET /api/recommend-roles?user_id=u1&k=5 uses the saved skills of a user.
+    
+    POST request body:
+    {
+        "user_skills": {"python": "intermediate"},  // or "user_id": "u1"
+        "k": 5,                  // optional
+        "scoring_mode": "ml"     // optional: "ml" (default) or "rule"
+    }
+    """
+    if request.method == 'GET':
+        data = request.args.to_dict()
+        if 'k' in data:
+            try:
+                data['k'] = int(data['k'])
+            except ValueError:
+                return jsonify({'success': False, 'error': 'k must be an integer'}), 400
+    else:
+        data = request.get_json()
+        if not data:
+            return jsonify({'success': False, 'error': 'No data provided'}), 400
+    
+    k = data.get('k', DEFAULT_RECOMMEND_K)
+    scoring_mode = data.get('scoring_mode', 'ml')
+    
+    if not isinstance(k, int) or k < 1:
+        return jsonify({'success': False, 'error': 'k must be a positive integer'}), 400
+    
+    if scoring_mode not in SCORING_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"scoring_mode must be one of: {', '.join(SCORING_MODES)}"
+        }), 400
+    
+    user_skills = data.get('user_skills')
+    if user_skills is None:
+        user_id = data.get('user_id')
+        if not user_id:
+            return jsonify({'success': False, 'error': 'user_skills or user_id is required'}), 400
+        user_skills = user_store.get_skills(user_id)
+        if user_skills is None:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
+    
+    error = _user_skills_error(user_skills)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    
+    snapshot = catalog.snapshot()
+    result = get_analyzer(snapshot).recommend_roles(user_skills, k, scoring_mode)
+    
+    roles = []
+    for item in result['roles']:
+        role_data = snapshot.roles[item['role_id']]
+        roles.append({
+            'role': {
                 'id': role_data['role_id'],
                 'name': role_data['role_name'],
                 'icon': role_data['icon']
             },
-            'match_percentage': ml_readiness_score,  # ML-predicted score
-            'proficient_skills': proficient_skills,
-            'skills_to_improve': skills_to_improve,
-            'missing_skills': missing_skills,
-            'recommendations': recommendations,
+            'score': item['score'],
+            'match_percentage': item['match_percentage'],
+            'readiness_score': item['readiness_score'],
             'summary': {
-                'total_required': total_required,
-                'proficient': len(proficient_skills),
-                'to_improve': len(skills_to_improve),
-                'missing': len(missing_skills),
-                'ml_readiness_score': ml_readiness_score
+                'total_required': item['total_required'],
+                'proficient': item['proficient'],
+                'to_improve': item['to_improve'],
+                'missing': item['missing']
             }
+        })
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'scoring_mode': result['scoring_mode'],
+            'roles': roles
         }
     })
 
@@ -299,109 +663,33 @@ def generate_roadmap():
     Request body:
     {
         "missing_skills": ["javascript", "react"],
-        "skills_to_improve": [{"skill_id": "git", "current_level": "beginner"}]
+        "skills_to_improve": [{"skill_id": "git", "current_level": "beginner"}],
+        "mode": "standard"  // optional: "standard" (default) or "optimize"
     }
+    
+    mode "optimize" also takes "hours_per_week" and a "deadline"
+    (YYYY-MM-DD) or a number of "weeks"; see _optimized_roadmap.
     """
     data = request.get_json()
     
     if not data:
         return jsonify({'success': False, 'error': 'No data provided'}), 400
     
-    missing_skills = data.get('missing_skills', [])
-    skills_to_improve = data.get('skills_to_improve', [])
-    
-    resources_df = load_resources()
-    skills_df = load_skills()
+    mode = data.get('mode', 'standard')
+    if mode not in ROADMAP_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"mode must be one of: {', '.join(ROADMAP_MODES)}"
+        }), 400
     
-    roadmap = []
-    step = 1
+    analyzer = get_analyzer(catalog.snapshot())
+    if mode == 'optimize':
+        return _optimized_roadmap(data, analyzer)
     
-    # Priority 1: Missing skills (sorted by category - Core CS first, then Programming, etc.)
-    category_priority = {
-        'Core CS': 1, 'Programming': 2, 'Web Development': 3,
-        'Database': 4, 'AI/ML': 5, 'Data Science': 6,
-        'Tools': 7, 'Cloud': 8, 'Soft Skills': 9, 'Methodology': 10
-    }
+    missing_skills = data.get('missing_skills', [])
+    skills_to_improve = data.get('skills_to_improve', [])
     
-    # Sort missing skills by category priority
-    missing_with_priority = []
-    for skill_id in missing_skills:
-        skill_info = skills_df[skills_df['skill_id'] == skill_id]
-        if not skill_info.empty:
-            category = skill_info.iloc[0]['category']
-            priority = category_priority.get(category, 99)
-            missing_with_priority.append((skill_id, priority, skill_info.iloc[0]))
-    
-    missing_with_priority.sort(key=lambda x: x[1])
-    
-    for skill_id, _, skill_info in missing_with_priority:
-        skill_resources = resources_df[resources_df['skill_id'] == skill_id]
-        
-        resources = []
-        total_hours = 0
-        for _, res in skill_resources.iterrows():
-            resources.append({
-                'name': res['resource_name'],
-                'type': res['resource_type'],
-                'url': res['url'],
-                'difficulty': res['difficulty'],
-                'hours': int(res['estimated_hours'])
-            })
-            total_hours += int(res['estimated_hours'])
-        
-        roadmap.append({
-            'step': step,
-            'skill_id': skill_id,
-            'skill_name': skill_info['skill_name'],
-            'category': skill_info['category'],
-            'status': 'New Skill',
-            'target_level': 'intermediate',
-            'estimated_hours': total_hours,
-            'resources': resources[:3]  # Top 3 resources
-        })
-        step += 1
-    
-    # Priority 2: Skills to improve
-    for skill_data in skills_to_improve:
-        skill_id = skill_data.get('skill_id')
-        current_level = skill_data.get('current_level', 'beginner')
-        
-        skill_info = skills_df[skills_df['skill_id'] == skill_id]
-        if skill_info.empty:
-            continue
-        
-        skill_resources = resources_df[resources_df['skill_id'] == skill_id]
-        
-        # Filter resources for next level
-        next_level = 'intermediate' if current_level == 'beginner' else 'advanced'
-        level_resources = skill_resources[skill_resources['difficulty'] == next_level]
-        if level_resources.empty:
-            level_resources = skill_resources
-        
-        resources = []
-        total_hours = 0
-        for _, res in level_resources.iterrows():
-            resources.append({
-                'name': res['resource_name'],
-                'type': res['resource_type'],
-                'url': res['url'],
-                'difficulty': res['difficulty'],
-                'hours': int(res['estimated_hours'])
-            })
-            total_hours += int(res['estimated_hours'])
-        
-        roadmap.append({
-            'step': step,
-            'skill_id': skill_id,
-            'skill_name': skill_info.iloc[0]['skill_name'],
-            'category': skill_info.iloc[0]['category'],
-            'status': 'Upgrade',
-            'current_level': current_level,
-            'target_level': next_level,
-            'estimated_hours': total_hours,
-            'resources': resources[:2]  # Top 2 resources
-        })
-        step += 1
+    roadmap = analyzer.generate_roadmap(missing_skills, skills_to_improve)
     
     # Calculate totals
     total_estimated_hours = sum(item['estimated_hours'] for item in roadmap)
@@ -417,20 +705,132 @@ def generate_roadmap():
     })
 
 
+def _optimized_roadmap(data, analyzer):
+    """
+    Roadmap that fits the study time until a deadline (mode "optimize")
+    
+    Request body:
+    {
+        "mode": "optimize",
+        "hours_per_week": 8,
+        "deadline": "2026-12-31",     // or "weeks": 12
+        "missing_skills": [...], "skills_to_improve": [...],
+        "target_role": "data_scientist",  // optional: match % out of its skills
+        "user_skills": {...}              // optional, with target_role: gap
+                                          // and known prerequisites from it
+    }
+    """
+    try:
+        hours_per_week = float(data.get('hours_per_week'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'hours_per_week must be a number'}), 400
+    if not 0 < hours_per_week <= MAX_HOURS_PER_WEEK:
+        return jsonify({
+            'success': False,
+            'error': f'hours_per_week must be between 0 and {MAX_HOURS_PER_WEEK}'
+        }), 400
+    
+    deadline = data.get('deadline')
+    if deadline is not None:
+        try:
+            days = (date.fromisoformat(deadline) - date.today()).days
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'deadline must be a date (YYYY-MM-DD)'}), 400
+        if days <= 0:
+            return jsonify({'success': False, 'error': 'deadline must be in the future'}), 400
+        weeks = days / 7
+        if weeks > MAX_ROADMAP_WEEKS:
+            return jsonify({
+                'success': False,
+                'error': f'deadline must be within {MAX_ROADMAP_WEEKS} weeks'
+            }), 400
+    else:
+        try:
+            weeks = float(data.get('weeks'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'deadline or weeks is required'}), 400
+        if not 0 < weeks <= MAX_ROADMAP_WEEKS:
+            return jsonify({
+                'success': False,
+                'error': f'weeks must be between 0 and {MAX_ROADMAP_WEEKS}'
+            }), 400
+    budget_hours = hours_per_week * weeks
+    
+    missing_skills = data.get('missing_skills', [])
+    skills_to_improve = data.get('skills_to_improve', [])
+    if not isinstance(missing_skills, list) or not all(
+        isinstance(skill_id, str) for skill_id in missing_skills
+    ):
+        return jsonify({'success': False, 'error': 'missing_skills must be a list of skill IDs'}), 400
+    if not isinstance(skills_to_improve, list) or not all(
+        isinstance(skill, dict) and isinstance(skill.get('skill_id'), str)
+        for skill in skills_to_improve
+    ):
+        return jsonify({
+            'success': False,
+            'error': 'skills_to_improve must be a list of objects with a skill_id'
+        }), 400
+    known_skills = None
+    total_required = None
+    target_role = data.get('target_role')
+    if target_role is not None:
+        role = analyzer.snapshot.roles.get(target_role)
+        if role is None:
+            return jsonify({'success': False, 'error': 'Role not found'}), 404
+        total_required = len(role['required_skills'])
+        user_skills = data.get('user_skills')
+        if user_skills is not None:
+            error = _user_skills_error(user_skills)
+            if error:
+                return jsonify({'success': False, 'error': error}), 400
+            gap = analyzer.analyze_gap(user_skills, target_role)
+            missing_skills = [skill['skill_id'] for skill in gap['missing_skills']]
+            skills_to_improve = [
+                {'skill_id': skill['skill_id'], 'current_level': skill['current_level']}
+                for skill in gap['skills_to_improve']
+            ]
+            known_skills = list(user_skills)
+    
+    if len(missing_skills) + len(skills_to_improve) > MAX_ROADMAP_SKILLS:
+        return jsonify({
+            'success': False,
+            'error': f'At most {MAX_ROADMAP_SKILLS} skills can be planned at once'
+        }), 400
+    
+    plan = analyzer.optimize_roadmap(
+        missing_skills, skills_to_improve, budget_hours, hours_per_week,
+        known_skills, total_required
+    )
+    total_estimated_hours = plan['total_estimated_hours']
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'mode': 'optimize',
+            'roadmap': plan['roadmap'],
+            'total_skills': len(plan['roadmap']),
+            'total_estimated_hours': total_estimated_hours,
+            'estimated_weeks': max(1, math.ceil(total_estimated_hours / hours_per_week)),
+            'hours_per_week': hours_per_week,
+            'budget_hours': round(budget_hours, 1),
+            'deadline': deadline,
+            'match_percentage_gain': plan['match_percentage_gain'],
+            'gain_per_hour': plan['gain_per_hour'],
+            'unscheduled': plan['unscheduled']
+        }
+    })
+
+
 # ==================== USER PROGRESS ====================
 
 @app.route('/api/users/<user_id>/progress', methods=['GET'])
 def get_user_progress(user_id):
     """Get user's learning progress"""
-    users_df = load_users()
-    user = users_df[users_df['user_id'] == user_id]
+    progress = progress_log.get_progress(user_id)
     
-    if user.empty:
+    if progress is None:
         return jsonify({'success': False, 'error': 'User not found'}), 404
     
-    user_data = user.iloc[0]
-    progress = json.loads(user_data['progress']) if pd.notna(user_data['progress']) else {}
-    
     return jsonify({
         'success': True,
         'data': {
@@ -465,32 +865,8 @@ def update_user_progress(user_id):
     if status not in ['not_started', 'in_progress', 'completed']:
         return jsonify({'success': False, 'error': 'Invalid status'}), 400
     
-    users_df = load_users()
-    user_idx = users_df[users_df['user_id'] == user_id].index
-    
-    if len(user_idx) == 0:
-        # Create new user entry
-        new_user = {
-            'user_id': user_id,
-            'name': '',
-            'email': '',
-            'degree': '',
-            'branch': '',
-            'semester': '',
-            'interests': '[]',
-            'skills': '{}',
-            'selected_role': '',
-            'progress': json.dumps({skill_id: status}),
-            'created_at': datetime.now().isoformat()
-        }
-        users_df = pd.concat([users_df, pd.DataFrame([new_user])], ignore_index=True)
-    else:
-        idx = user_idx[0]
-        progress = json.loads(users_df.at[idx, 'progress']) if pd.notna(users_df.at[idx, 'progress']) else {}
-        progress[skill_id] = status
-        users_df.at[idx, 'progress'] = json.dumps(progress)
-    
-    save_users(users_df)
+    # Appended to the progress log; the user entry is created on compaction
+    progress_log.append(user_id, skill_id, status)
     
     return jsonify({
         'success': True,
@@ -498,6 +874,27 @@ def update_user_progress(user_id):
     })
 
 
+@app.route('/api/users/<user_id>/progress/history', methods=['GET'])
+def get_user_progress_history(user_id):
+    """Get every recorded progress change for a user, oldest first"""
+    events = progress_log.history(user_id)
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'user_id': user_id,
+            'events': [
+                {
+                    'skill_id': event['skill_id'],
+                    'status': event['status'],
+                    'timestamp': event['ts']
+                }
+                for event in events
+            ]
+        }
+    })
+
+
 @app.route('/api/users/<user_id>/save', methods=['POST'])
 def save_user_data(user_id):
     """
@@ -512,7 +909,8 @@ def save_user_data(user_id):
         "semester": "5th Semester",
         "interests": ["Web Development", "AI"],
         "skills": {"python": "intermediate", "sql": "beginner"},
-        "selected_role": "data_analyst"
+        "selected_role": "data_analyst",
+        "version": 3  // optional: reject with 409 if the stored version differs
     }
     """
     data = request.get_json()
@@ -520,36 +918,115 @@ def save_user_data(user_id):
     if not data:
         return jsonify({'success': False, 'error': 'No data provided'}), 400
     
-    users_df = load_users()
-    user_idx = users_df[users_df['user_id'] == user_id].index
-    
-    user_data = {
-        'user_id': user_id,
-        'name': data.get('name', ''),
-        'email': data.get('email', ''),
-        'degree': data.get('degree', ''),
-        'branch': data.get('branch', ''),
-        'semester': data.get('semester', ''),
-        'interests': json.dumps(data.get('interests', [])),
-        'skills': json.dumps(data.get('skills', {})),
-        'selected_role': data.get('selected_role', ''),
-        'progress': '{}',
-        'created_at': datetime.now().isoformat()
-    }
+    expected_version = data.get('version')
+    if expected_version is not None and not isinstance(expected_version, int):
+        return jsonify({'success': False, 'error': 'version must be an integer'}), 400
     
-    if len(user_idx) == 0:
-        users_df = pd.concat([users_df, pd.DataFrame([user_data])], ignore_index=True)
-    else:
-        idx = user_idx[0]
-        for key, value in user_data.items():
-            if key != 'progress':  # Don't overwrite progress
-                users_df.at[idx, key] = value
+    # Same rules as a bulk import row
+    try:
+        _, profile = validate_row({**data, 'user_id': user_id})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # Progress is never overwritten by a profile save
+    try:
+        version = user_store.save_profile(user_id, profile, expected_version)
+    except VersionConflict as e:
+        return jsonify({
+            'success': False,
+            'error': 'User was modified by another request',
+            'current_version': e.current
+        }), 409
     
-    save_users(users_df)
+    similarity_index.upsert(user_id, data.get('skills', {}), version)
     
     return jsonify({
         'success': True,
-        'message': 'User data saved successfully'
+        'message': 'User data saved successfully',
+        'version': version
+    })
+
+
+@app.route('/api/users/import', methods=['POST'])
+def import_users():
+    """
+    Bulk create/update user profiles from an NDJSON body
+    
+    One JSON object per line, each a /api/users/<id>/save body plus user_id:
+    {"user_id": "u1", "name": "...", "skills": {"python": "beginner"}}
+    
+    Valid rows are written in chunked transactions; invalid ones are
+    skipped and reported by line number.
+    """
+    report = import_profiles(user_store, request.stream)
+    
+    if report['imported'] == 0 and report['failed'] == 0:
+        return jsonify({'success': False, 'error': 'No data provided'}), 400
+    
+    return jsonify({
+        'success': True,
+        'data': report
+    })
+
+
+@app.route('/api/users/export', methods=['GET'])
+def export_users():
+    """Stream every user record as NDJSON"""
+    return Response(
+        stream_with_context(export_lines(user_store)),
+        mimetype=NDJSON_MIMETYPE,
+        headers={'Content-Disposition': 'attachment; filename=users.ndjson'}
+    )
+
+
+# ==================== PEER MATCHING ====================
+
+@app.route('/api/users/<user_id>/similar', methods=['GET'])
+def get_similar_users(user_id):
+    """
+    Students with the most similar skill profiles (for peer mentoring)
+    
+    Query parameters:
+        k: number of users (default 5, at most 100)
+        metric: "cosine" (skill levels, default) or "jaccard" (skill sets)
+    """
+    k = request.args.get('k', DEFAULT_SIMILAR_K, type=int)
+    metric = request.args.get('metric', 'cosine')
+    
+    if not 1 <= k <= MAX_SIMILAR_K:
+        return jsonify({
+            'success': False,
+            'error': f'k must be an integer from 1 to {MAX_SIMILAR_K}'
+        }), 400
+    
+    if metric not in METRICS:
+        return jsonify({
+            'success': False,
+            'error': f"metric must be one of: {', '.join(METRICS)}"
+        }), 400
+    
+    matches = similarity_index.query(user_id, k, metric)
+    if matches is None:
+        return jsonify({'success': False, 'error': 'User not found'}), 404
+    
+    similar = []
+    for match in matches:
+        user = user_store.get_user(match['user_id']) or {}
+        similar.append({
+            'user_id': match['user_id'],
+            'name': user.get('name', ''),
+            'selected_role': user.get('selected_role', ''),
+            'similarity': match['similarity'],
+            'common_skills': match['common_skills']
+        })
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'user_id': user_id,
+            'metric': metric,
+            'similar_users': similar
+        }
     })
 
 
@@ -558,18 +1035,25 @@ def save_user_data(user_id):
 @app.route('/api/resources/<skill_id>', methods=['GET'])
 def get_skill_resources(skill_id):
     """Get learning resources for a specific skill"""
-    resources_df = load_resources()
-    skill_resources = resources_df[resources_df['skill_id'] == skill_id]
+    snapshot = catalog.snapshot()
+    skill_resources = snapshot.get_resources(skill_id)
     
-    if skill_resources.empty:
+    if not skill_resources:
         return jsonify({
             'success': True,
             'data': [],
             'message': 'No resources found for this skill'
         })
     
+    return catalog_response(
+        snapshot, ('resources', skill_id), lambda: _skill_resources_payload(skill_resources)
+    )
+
+
+def _skill_resources_payload(skill_resources):
+    """Body of GET /api/resources/<skill_id>"""
     resources = []
-    for _, res in skill_resources.iterrows():
+    for res in skill_resources:
         resources.append({
             'name': res['resource_name'],
             'type': res['resource_type'],
@@ -578,10 +1062,10 @@ def get_skill_resources(skill_id):
             'estimated_hours': int(res['estimated_hours'])
         })
     
-    return jsonify({
+    return {
         'success': True,
         'data': resources
-    })
+    }
 
 
 # ==================== MAIN ====================
@@ -594,12 +1078,20 @@ if __name__ == '__main__':
     print("\nAvailable endpoints:")
     print("  GET  /api/health          - Health check")
     print("  GET  /api/skills          - Get all skills")
+    print("  GET  /api/skills/<id>/unlocks - Prerequisites and unlocked skills")
     print("  GET  /api/job-roles       - Get all job roles")
     print("  POST /api/analyze-gap     - Analyze skill gap")
+    print("  POST /api/analyze-gap/batch - Score many users against many roles")
+    print("  GET/POST /api/recommend-roles - Rank job roles for a user")
     print("  POST /api/roadmap         - Generate learning roadmap")
     print("  POST /api/users/<id>/save - Save user data")
+    print("  POST /api/users/import    - Bulk import profiles (NDJSON)")
+    print("  GET  /api/users/export    - Export all users (NDJSON)")
     print("  GET  /api/users/<id>/progress - Get progress")
     print("  POST /api/users/<id>/progress - Update progress")
+    print("  GET  /api/users/<id>/progress/history - Progress history")
+    print("  GET  /api/users/<id>/similar - Students with similar skills")
+    print("  GET  /metrics             - Prometheus latency metrics")
     print("\n" + "=" * 50)
     
     app.run(debug=True, host='0.0.0.0', port=5000)
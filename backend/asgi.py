@@ -0,0 +1,26 @@
+"""
+SkillSync Backend - ASGI Entry Point
+Production serving of the Flask API under an ASGI server
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+
+The Flask app is wrapped with a2wsgi's WSGIMiddleware. The event loop only
+accepts connections and moves bytes; every request's Flask handler runs
+synchronously on a pool of HANDLER_THREADS threads, including its user-store
+(SQLite) reads and writes and model inference. That I/O is thread-pooled,
+not asynchronous: it blocks a pool thread but never the loop, and a worker
+handles at most HANDLER_THREADS requests at a time.
+"""
+
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import app
+
+# Handler threads per worker process
+HANDLER_THREADS = int(os.environ.get('SKILLSYNC_ASGI_THREADS', '32'))
+# Response chunks a handler may run ahead of a slow client
+MAX_BUFFERED_CHUNKS = 8
+
+application = WSGIMiddleware(app, workers=HANDLER_THREADS, send_queue_size=MAX_BUFFERED_CHUNKS)
@@ -0,0 +1,154 @@
+"""
+SkillSync Backend - Micro-batching
+Coalesces concurrent single-item calls into one batched call
+
+Callers block in submit() while dispatcher threads drain the shared queue:
+a dispatcher takes the first waiting item and everything queued behind it,
+up to max_batch items, runs the whole batch with one run_batch() call and
+hands every caller its own result.
+
+A batch only waits for more items while another batch is still running:
+then it keeps collecting until it is full or max_wait seconds have passed
+since its first item. When no batch is running it is dispatched at once, so
+a lone call never pays the batching window and batches grow only under load.
+
+stats() reports how full the batches get and how long items wait, for
+tuning max_batch and max_wait against tail latency.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+
+class MicroBatcher:
+    """Run concurrent submit() calls in batches of up to max_batch items"""
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch: int = 64,
+        max_wait: float = 0.002,
+        dispatchers: int = 1,
+        name: str = 'batcher'
+    ):
+        """
+        Args:
+            run_batch: Maps a list of items to a list of results, same order
+            max_batch: Most items per run_batch call
+            max_wait: Longest time the first item of a batch waits for more
+                      (only while another batch is running)
+            dispatchers: Batches that may run at the same time
+        """
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        # Batches inside run_batch right now
+        self._running = 0
+        self._running_lock = threading.Lock()
+        self.immediate_batches = 0
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self.max_queue_depth = 0
+        self._queue_depth_total = 0
+        self._wait_total = 0.0
+        self.max_wait_seen = 0.0
+        # Batch counts by size, bucketed by the next power of two
+        self.size_buckets = Counter()
+        for i in range(dispatchers):
+            threading.Thread(target=self._dispatch, name=f'{name}-{i}', daemon=True).start()
+
+    def submit(self, item: Any) -> Any:
+        """Result of item from its batch (re-raises the batch's exception)"""
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+        return future.result()
+
+    def _collect(self) -> List:
+        """
+        Block for one item, then gather more: only what is already queued
+        when no batch is running, else until full or timed out
+        """
+        batch = [self._queue.get()]
+        # Items waiting when the batch opens, this one included
+        depth = self._queue.qsize() + 1
+        with self._running_lock:
+            idle = self._running == 0
+        deadline = time.monotonic() + (0 if idle else self.max_wait)
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Window over (or none): still take whatever is queued
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._record(batch, depth, idle)
+        return batch
+
+    def _record(self, batch: List, depth: int, immediate: bool) -> None:
+        now = time.monotonic()
+        waits = [now - enqueued for _, _, enqueued in batch]
+        with self._stats_lock:
+            self.batches += 1
+            self.immediate_batches += immediate
+            self.items += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self._queue_depth_total += depth
+            self._wait_total += sum(waits)
+            self.max_wait_seen = max(self.max_wait_seen, max(waits))
+            self.size_buckets[1 << (len(batch) - 1).bit_length()] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Window settings, batch sizes, queue depths and queueing delays"""
+        with self._stats_lock:
+            batches = self.batches or 1
+            return {
+                'max_batch': self.max_batch,
+                'window_ms': self.max_wait * 1000,
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'mean_queue_depth': round(self._queue_depth_total / batches, 2),
+                'batches': self.batches,
+                # Dispatched without a window because no batch was running
+                'immediate_batches': self.immediate_batches,
+                'items': self.items,
+                'mean_batch_size': round(self.items / batches, 2),
+                'max_batch_size': self.max_batch_seen,
+                'batch_sizes': [
+                    {'up_to': size, 'batches': self.size_buckets[size]}
+                    for size in sorted(self.size_buckets)
+                ],
+                'mean_wait_ms': round(self._wait_total / (self.items or 1) * 1000, 3),
+                'max_wait_ms': round(self.max_wait_seen * 1000, 3)
+            }
+
+    def _dispatch(self) -> None:
+        while True:
+            batch = self._collect()
+            with self._running_lock:
+                self._running += 1
+            try:
+                results = self.run_batch([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"run_batch returned {len(results)} results for {len(batch)} items"
+                    )
+            except BaseException as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                with self._running_lock:
+                    self._running -= 1
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,4 @@
+"""
+SkillSync Backend - Benchmarks
+Reproducible timings of the backend hot paths (see benchmarks/run.py)
+"""
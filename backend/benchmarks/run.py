@@ -0,0 +1,335 @@
+"""
+SkillSync Backend - Benchmark Runner
+Times the backend hot paths on a synthetic catalog and writes JSON results
+
+    cd backend
+    python -m benchmarks.run --scale small --output bench-before.json
+    python -m benchmarks.run --scale small --compare bench-before.json
+
+The catalog CSVs, user store and progress log all live in a temporary
+directory; the real data/ folder is never read or written. Every result file
+records the git commit it was measured at, so runs from two commits can be
+compared with --compare (exit status 1 when a benchmark got slower by more
+than --threshold).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import (
+    SCALES, Scale, iter_users, make_catalog, make_prerequisites, write_catalog
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Distinct inputs cycled through by the per-call benchmarks; more than the
+# default result cache size, so cached endpoints keep missing
+INPUT_POOL = 5000
+# Users per analyze_gap_batch call in the streaming benchmark
+STREAM_CHUNK = 2000
+# Missing skills per optimize_roadmap call on the prerequisite catalog
+PREREQUISITE_GAP = 40
+
+
+def git_revision() -> Dict[str, Optional[object]]:
+    """Commit of the working tree and whether it has uncommitted changes"""
+    def git(*args: str) -> Optional[str]:
+        try:
+            result = subprocess.run(
+                ['git', *args], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=30
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    commit = git('rev-parse', 'HEAD')
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {'commit': commit, 'dirty': bool(status) if status is not None else None}
+
+
+def measure(
+    fn: Callable[[], object],
+    min_time: float = 0.5,
+    min_iterations: int = 5,
+    max_iterations: int = 100000
+) -> Dict[str, float]:
+    """
+    Call fn repeatedly (after one warm-up call) and summarise the timings
+
+    Runs until both min_time seconds and min_iterations calls have passed.
+    """
+    fn()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_iterations:
+        t0 = time.perf_counter_ns()
+        fn()
+        timings.append(time.perf_counter_ns() - t0)
+        if len(timings) >= min_iterations and time.perf_counter() - started >= min_time:
+            break
+
+    timings.sort()
+    mean = statistics.fmean(timings)
+    return {
+        'iterations': len(timings),
+        'mean_us': round(mean / 1000, 3),
+        'median_us': round(statistics.median(timings) / 1000, 3),
+        'p95_us': round(timings[int(0.95 * (len(timings) - 1))] / 1000, 3),
+        'min_us': round(timings[0] / 1000, 3),
+        'max_us': round(timings[-1] / 1000, 3),
+        'ops_per_sec': round(1e9 / mean, 1) if mean else None
+    }
+
+
+def cycle(items: List) -> Callable[[], object]:
+    """Next item of a list on every call, wrapping around"""
+    return itertools.cycle(items).__next__
+
+
+def isolate(data_dir: str) -> None:
+    """
+    Point the process-wide catalog, user store and progress log at data_dir
+
+    Must run before app is imported: app creates its singletons at import.
+    """
+    import catalog
+    import progress_log
+    import user_store
+
+    catalog._catalog = catalog.Catalog(data_dir, poll_interval=0)
+    store = user_store.SqliteUserRepository(os.path.join(data_dir, 'users.db'), csv_path=None)
+    user_store._store = store
+    progress_log._progress_log = progress_log.ProgressLog(
+        store, log_dir=os.path.join(data_dir, 'progress')
+    )
+
+
+def run(scale: Scale, data_dir: str, seed: int, min_time: float, only: Optional[str]) -> Dict:
+    """Run every benchmark (or those whose name starts with only)"""
+    results = {}
+
+    def wanted(name: str) -> bool:
+        return not only or name.startswith(only)
+
+    def bench(name: str, fn: Callable[[], object], **kwargs) -> None:
+        if not wanted(name):
+            return
+        results[name] = measure(fn, min_time=min_time, **kwargs)
+        print(f"  {name:<36} {results[name]['median_us']:>12.1f} us median")
+
+    frames = make_catalog(scale, seed)
+    write_catalog(data_dir, frames)
+    isolate(data_dir)
+
+    from analyzer import SkillAnalyzer
+    from catalog import CATALOG_FILES, CatalogSnapshot, get_catalog, read_catalog_frames
+    from catalog_pack import PACK_FILE, describe_sources, write_pack
+    import ml_predictor
+
+    ml_predictor.load_model()
+    snapshot = get_catalog().snapshot()
+    role_ids = list(snapshot.role_ids)
+    skill_ids = list(snapshot.skill_ids)
+    users = list(iter_users(skill_ids, INPUT_POOL, scale.skills_per_user, seed + 1))
+    pairs = [(user, role_ids[i % len(role_ids)]) for i, user in enumerate(users)]
+
+    # ---------- catalog ----------
+    bench('catalog.from_files', lambda: CatalogSnapshot.from_files(data_dir), min_iterations=3)
+    if wanted('catalog.from_pack'):
+        # From here on from_files reads the pack
+        write_pack(
+            os.path.join(data_dir, PACK_FILE), read_catalog_frames(data_dir),
+            describe_sources(data_dir, CATALOG_FILES)
+        )
+        bench('catalog.from_pack', lambda: CatalogSnapshot.from_files(data_dir), min_iterations=3)
+    bench('catalog.from_frames', lambda: CatalogSnapshot.from_frames(*frames), min_iterations=3)
+    bench('analyzer.init', lambda: SkillAnalyzer(snapshot), min_iterations=3)
+
+    # ---------- analyzer ----------
+    analyzer = SkillAnalyzer(snapshot)
+    next_pair = cycle(pairs)
+    bench('analyzer.analyze_gap', lambda: analyzer.analyze_gap(*next_pair()))
+    bench('analyzer.analyze_gap_ml', lambda: analyzer.analyze_gap(*next_pair(), scoring_mode='ml'))
+
+    gaps = [analyzer.analyze_gap(user, role) for user, role in pairs[:1000]]
+    roadmap_inputs = cycle([
+        (
+            [skill['skill_id'] for skill in gap['missing_skills']],
+            [
+                {'skill_id': skill['skill_id'], 'current_level': skill['current_level']}
+                for skill in gap['skills_to_improve']
+            ]
+        )
+        for gap in gaps
+    ])
+    bench('analyzer.generate_roadmap', lambda: analyzer.generate_roadmap(*roadmap_inputs()))
+    bench(
+        'analyzer.optimize_roadmap',
+        lambda: analyzer.optimize_roadmap(*roadmap_inputs(), budget_hours=40, hours_per_week=8)
+    )
+    if wanted('analyzer.optimize_roadmap_prerequisites'):
+        # Same catalog with a dense, heavily shared prerequisite graph
+        dense = SkillAnalyzer(CatalogSnapshot.from_frames(*frames, make_prerequisites(scale, seed)))
+        rng = random.Random(seed)
+        gap_inputs = cycle([
+            (rng.sample(skill_ids, min(PREREQUISITE_GAP, len(skill_ids))), [])
+            for _ in range(100)
+        ])
+        bench(
+            'analyzer.optimize_roadmap_prerequisites',
+            lambda: dense.optimize_roadmap(*gap_inputs(), budget_hours=120, hours_per_week=8)
+        )
+
+    next_user = cycle(users)
+    bench('analyzer.recommend_roles', lambda: analyzer.recommend_roles(next_user(), k=5))
+
+    # ---------- readiness ----------
+    bench('ml.predict_readiness', lambda: ml_predictor.predict_readiness(*next_pair()))
+    bench(
+        'ml.predict_readiness_uncached',
+        lambda: ml_predictor._predict_readiness_uncached(*next_pair())
+    )
+    bench(
+        'ml.fallback_readiness',
+        lambda: ml_predictor._calculate_fallback_readiness(*next_pair())
+    )
+
+    # ---------- streamed users ----------
+    if wanted('analyzer.analyze_gap_batch_stream'):
+        results['analyzer.analyze_gap_batch_stream'] = stream_users(
+            analyzer, skill_ids, scale, seed + 2
+        )
+
+    # ---------- HTTP endpoints ----------
+    if not only or only.startswith('http.') or 'http.'.startswith(only):
+        from app import app
+
+        client = app.test_client()
+        bodies = cycle([{'user_skills': user, 'target_role': role} for user, role in pairs])
+        role_paths = cycle([f'/api/job-roles/{role_id}' for role_id in role_ids])
+
+        bench('http.health', lambda: client.get('/api/health'))
+        bench('http.skills', lambda: client.get('/api/skills'))
+        bench('http.job_role', lambda: client.get(role_paths()))
+        bench('http.analyze_gap', lambda: client.post('/api/analyze-gap', json=bodies()))
+
+        def post_roadmap():
+            missing, improve = roadmap_inputs()
+            return client.post(
+                '/api/roadmap', json={'missing_skills': missing, 'skills_to_improve': improve}
+            )
+
+        bench('http.roadmap', post_roadmap)
+        bench(
+            'http.recommend_roles',
+            lambda: client.post('/api/recommend-roles', json={'user_skills': next_user(), 'k': 5})
+        )
+
+    return results
+
+
+def stream_users(analyzer, skill_ids: List[str], scale: Scale, seed: int) -> Dict[str, float]:
+    """Score scale.users streamed profiles against every role, in chunks"""
+    elapsed = 0.0
+    chunk = []
+    for user in iter_users(skill_ids, scale.users, scale.skills_per_user, seed):
+        chunk.append(user)
+        if len(chunk) == STREAM_CHUNK:
+            t0 = time.perf_counter()
+            analyzer.analyze_gap_batch(chunk)
+            elapsed += time.perf_counter() - t0
+            chunk = []
+    if chunk:
+        t0 = time.perf_counter()
+        analyzer.analyze_gap_batch(chunk)
+        elapsed += time.perf_counter() - t0
+    result = {
+        'users': scale.users,
+        'roles': scale.roles,
+        'seconds': round(elapsed, 3),
+        'users_per_sec': round(scale.users / elapsed, 1) if elapsed else None
+    }
+    print(f"  {'analyzer.analyze_gap_batch_stream':<36} {result['users_per_sec']:>12.1f} users/s")
+    return result
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> bool:
+    """
+    Print the change of every benchmark against a baseline result file
+
+    Returns:
+        True if no benchmark got slower by more than threshold
+    """
+    ok = True
+    print(f"\nAgainst {baseline.get('commit') or 'unknown commit'} ({baseline.get('scale')}):")
+    for name, result in current['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if before is None:
+            continue
+        if 'median_us' in result:
+            ratio = result['median_us'] / before['median_us'] if before['median_us'] else 1.0
+        else:
+            ratio = before['users_per_sec'] / result['users_per_sec'] if result['users_per_sec'] else 1.0
+        regressed = ratio > 1 + threshold
+        ok = ok and not regressed
+        print(f"  {name:<36} {ratio:>7.2f}x time{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the SkillSync backend hot paths')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help='seconds spent timing each benchmark')
+    parser.add_argument('--only', help='run only benchmarks whose name starts with this')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='slowdown ratio counted as a regression (default 0.10)')
+    args = parser.parse_args(argv)
+
+    scale = SCALES[args.scale]
+    print(f"SkillSync benchmarks, scale {args.scale}: {scale._asdict()}")
+    with tempfile.TemporaryDirectory(prefix='skillsync-bench-') as data_dir:
+        benchmarks = run(scale, data_dir, args.seed, args.min_time, args.only)
+        import ml_predictor
+        mode = ml_predictor.readiness_mode()
+
+    report = {
+        **git_revision(),
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'scale': args.scale,
+        'params': {**scale._asdict(), 'seed': args.seed},
+        'readiness_mode': mode,
+        'benchmarks': benchmarks
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+SkillSync Backend - Synthetic Benchmark Data
+Catalogs and user profiles of any size, shaped like the real CSVs
+
+Everything is derived from a seed, so one scale produces the same data on
+every run and results from different commits stay comparable. Skill
+popularity is skewed (a few skills appear in many roles and profiles), so
+gap analyses find a realistic mix of proficient, to-improve and missing
+skills even in a 10k-skill catalog.
+"""
+
+import os
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from catalog import SKILLS_FILE, JOB_ROLES_FILE, RESOURCES_FILE
+from skill_profile import LEVEL_NAMES
+
+CATEGORIES = [
+    'Programming', 'Data Science', 'AI/ML', 'Web Development', 'Database',
+    'Tools', 'Core CS', 'Cloud', 'Development', 'Methodology', 'Soft Skills'
+]
+RESOURCE_TYPES = ['Video', 'Course', 'Documentation', 'Tutorial', 'Book', 'Practice']
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+
+# Users generated per block of random draws
+USER_BLOCK = 10000
+# Prerequisites per skill in make_prerequisites
+PREREQUISITES_PER_SKILL = 3
+
+
+class Scale(NamedTuple):
+    """Size of a synthetic catalog and user population"""
+    skills: int
+    roles: int
+    resources_per_skill: int
+    skills_per_role: int
+    users: int
+    skills_per_user: int
+
+
+SCALES = {
+    'small': Scale(200, 20, 4, 8, 10000, 8),
+    'medium': Scale(2000, 200, 5, 12, 100000, 12),
+    'large': Scale(10000, 1000, 5, 15, 1000000, 15),
+}
+
+
+def _popularity(count: int) -> np.ndarray:
+    """Zipf-like selection probabilities for count skills"""
+    weights = 1.0 / np.arange(1, count + 1) ** 0.8
+    return weights / weights.sum()
+
+
+def _pick(rng: np.random.Generator, weights: np.ndarray, rows: int, k: int) -> List[List[int]]:
+    """rows lists of up to k distinct skill ordinals, popular ones more often"""
+    draws = rng.choice(len(weights), size=(rows, 2 * k), p=weights)
+    picks = []
+    for row in draws.tolist():
+        picks.append(list(dict.fromkeys(row))[:k])
+    return picks
+
+
+def skill_id(ordinal: int) -> str:
+    return f'skill_{ordinal:05d}'
+
+
+def make_catalog(scale: Scale, seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Synthetic catalog with the columns of the real CSVs
+
+    Returns:
+        (skills_df, roles_df, resources_df), ready for
+        CatalogSnapshot.from_frames or write_catalog
+    """
+    rng = np.random.default_rng(seed)
+    skill_ids = [skill_id(i) for i in range(scale.skills)]
+
+    skills_df = pd.DataFrame({
+        'skill_id': skill_ids,
+        'skill_name': [f'Skill {i}' for i in range(scale.skills)],
+        'category': [CATEGORIES[i] for i in rng.integers(len(CATEGORIES), size=scale.skills)],
+        'description': [f'Synthetic skill number {i}' for i in range(scale.skills)]
+    })
+
+    picks = _pick(rng, _popularity(scale.skills), scale.roles, scale.skills_per_role)
+    roles_df = pd.DataFrame({
+        'role_id': [f'role_{i:04d}' for i in range(scale.roles)],
+        'role_name': [f'Role {i}' for i in range(scale.roles)],
+        'description': [f'Synthetic job role number {i}' for i in range(scale.roles)],
+        'required_skills': [','.join(skill_ids[o] for o in row) for row in picks],
+        'icon': ['💼'] * scale.roles
+    })
+
+    count = scale.skills * scale.resources_per_skill
+    ordinals = np.repeat(np.arange(scale.skills), scale.resources_per_skill)
+    types = rng.integers(len(RESOURCE_TYPES), size=count)
+    difficulties = rng.integers(len(DIFFICULTIES), size=count)
+    resources_df = pd.DataFrame({
+        'skill_id': [skill_ids[o] for o in ordinals.tolist()],
+        'resource_name': [f'Resource {i}' for i in range(count)],
+        'resource_type': [RESOURCE_TYPES[t] for t in types.tolist()],
+        'url': [f'https://example.com/resources/{i}' for i in range(count)],
+        'difficulty': [DIFFICULTIES[d] for d in difficulties.tolist()],
+        'estimated_hours': rng.integers(1, 21, size=count)
+    })
+    return skills_df, roles_df, resources_df
+
+
+def make_prerequisites(scale: Scale, seed: int = 0) -> pd.DataFrame:
+    """
+    Dense prerequisite edges for the skills of make_catalog(scale)
+
+    Every skill but the first few needs up to PREREQUISITES_PER_SKILL skills
+    with lower ordinals (so the graph is acyclic), popular ones more often,
+    which makes a handful of prerequisites shared by most of the catalog.
+    """
+    rng = np.random.default_rng(seed)
+    weights = _popularity(scale.skills)
+    rows = []
+    for ordinal in range(PREREQUISITES_PER_SKILL, scale.skills):
+        earlier = weights[:ordinal] / weights[:ordinal].sum()
+        picks = rng.choice(ordinal, size=PREREQUISITES_PER_SKILL, replace=False, p=earlier)
+        rows.extend((skill_id(ordinal), skill_id(int(p))) for p in picks)
+    return pd.DataFrame(rows, columns=['skill_id', 'prerequisite_id'])
+
+
+def write_catalog(
+    data_dir: str,
+    frames: Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]
+) -> None:
+    """Write a catalog as skills.csv, job_roles.csv and resources.csv"""
+    os.makedirs(data_dir, exist_ok=True)
+    for name, df in zip((SKILLS_FILE, JOB_ROLES_FILE, RESOURCES_FILE), frames):
+        df.to_csv(os.path.join(data_dir, name), index=False)
+
+
+def iter_users(
+    skill_ids: Sequence[str],
+    count: int,
+    skills_per_user: int,
+    seed: int = 0
+) -> Iterator[Dict[str, str]]:
+    """
+    Stream count synthetic skill profiles ({skill_id: level name})
+
+    Profiles are drawn USER_BLOCK at a time, so memory stays bounded however
+    many users are requested.
+    """
+    rng = np.random.default_rng(seed)
+    weights = _popularity(len(skill_ids))
+    levels = [LEVEL_NAMES[value] for value in sorted(LEVEL_NAMES)]
+    remaining = count
+    while remaining > 0:
+        block = min(USER_BLOCK, remaining)
+        picks = _pick(rng, weights, block, skills_per_user)
+        values = rng.integers(len(levels), size=(block, skills_per_user)).tolist()
+        for row, row_levels in zip(picks, values):
+            yield {skill_ids[o]: levels[v] for o, v in zip(row, row_levels)}
+        remaining -= block
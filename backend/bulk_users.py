@@ -0,0 +1,166 @@
+"""
+SkillSync Backend - Bulk User Import/Export
+Newline-delimited JSON (NDJSON) streams of user profiles
+
+Imports read the request body one line at a time, validate each row and
+write them to the user store in chunks of IMPORT_CHUNK_SIZE, one transaction
+per chunk. Memory stays bounded by the chunk size, however large the upload.
+Bad rows are reported by line number and skipped; they never abort the
+rest of the import. Exports stream one JSON object per user.
+"""
+
+import json
+import os
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from skill_profile import SKILL_LEVELS
+from user_store import UserRepository
+
+# Rows written per store transaction
+IMPORT_CHUNK_SIZE = int(os.environ.get('SKILLSYNC_IMPORT_CHUNK_SIZE', '500'))
+# Longest accepted NDJSON line
+MAX_LINE_BYTES = 1 << 20
+# Row errors listed in an import report (the rest are only counted)
+MAX_REPORTED_ERRORS = 100
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Profile fields that hold plain strings
+STRING_FIELDS = ['name', 'email', 'degree', 'branch', 'semester', 'selected_role']
+
+
+def iter_ndjson(stream: BinaryIO) -> Iterator[Tuple[int, Optional[object], Optional[str]]]:
+    """
+    Parse an NDJSON byte stream lazily
+
+    Yields:
+        (line number, parsed value, None) or (line number, None, error) for
+        every non-blank line
+    """
+    line_no = 0
+    while True:
+        line = stream.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        line_no += 1
+
+        if len(line) > MAX_LINE_BYTES and not line.endswith(b'\n'):
+            # Skip the rest of the oversized line without buffering it
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(MAX_LINE_BYTES)
+            yield line_no, None, f'Line longer than {MAX_LINE_BYTES} bytes'
+            continue
+
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line), None
+        except ValueError as e:
+            yield line_no, None, f'Invalid JSON: {e}'
+
+
+def validate_row(row: object) -> Tuple[str, Dict[str, str]]:
+    """
+    Check one import row and convert it to a store profile
+
+    Rows use the /api/users/<id>/save body plus a user_id field.
+
+    Returns:
+        (user_id, profile with JSON-encoded interests and skills)
+
+    Raises:
+        ValueError: describing the first problem found
+    """
+    if not isinstance(row, dict):
+        raise ValueError('Row must be a JSON object')
+
+    user_id = row.get('user_id')
+    if not isinstance(user_id, str) or not user_id.strip():
+        raise ValueError('user_id must be a non-empty string')
+
+    profile = {}
+    for field in STRING_FIELDS:
+        value = row.get(field, '')
+        if not isinstance(value, str):
+            raise ValueError(f'{field} must be a string')
+        profile[field] = value
+
+    interests = row.get('interests', [])
+    if not isinstance(interests, list) or not all(isinstance(i, str) for i in interests):
+        raise ValueError('interests must be a list of strings')
+
+    skills = row.get('skills', {})
+    if not isinstance(skills, dict):
+        raise ValueError('skills must be an object')
+    for skill_id, level in skills.items():
+        if not isinstance(level, str) or level.lower() not in SKILL_LEVELS:
+            raise ValueError(
+                f"Level of {skill_id} must be one of: {', '.join(SKILL_LEVELS)}"
+            )
+
+    profile['interests'] = json.dumps(interests)
+    profile['skills'] = json.dumps(skills)
+    return user_id, profile
+
+
+def import_profiles(
+    store: UserRepository,
+    stream: BinaryIO,
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Dict:
+    """
+    Import an NDJSON stream of profiles into the store
+
+    Returns:
+        Report with 'imported', 'failed', 'errors' (first
+        MAX_REPORTED_ERRORS, each {'line', 'error'}) and 'errors_truncated'
+    """
+    report = {'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+    def fail(line_no: int, error: str) -> None:
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_no, 'error': error})
+        else:
+            report['errors_truncated'] = True
+
+    chunk: List[Tuple[int, str, Dict[str, str]]] = []
+
+    def flush() -> None:
+        try:
+            store.upsert_profiles([(user_id, profile) for _, user_id, profile in chunk])
+            report['imported'] += len(chunk)
+        except Exception as e:
+            # The chunk's transaction rolled back; earlier chunks stay
+            for line_no, _, _ in chunk:
+                fail(line_no, f'Write failed: {e}')
+        chunk.clear()
+
+    for line_no, row, error in iter_ndjson(stream):
+        if error is None:
+            try:
+                user_id, profile = validate_row(row)
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            fail(line_no, error)
+            continue
+
+        chunk.append((line_no, user_id, profile))
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+    return report
+
+
+def export_lines(store: UserRepository) -> Iterator[bytes]:
+    """Every user record as one NDJSON line (JSON fields decoded)"""
+    for user in store.iter_users():
+        record = dict(user)
+        for field, empty in (('interests', []), ('skills', {}), ('progress', {})):
+            record[field] = json.loads(record[field]) if record[field] else empty
+        record['version'] = int(record.get('version') or 0)
+        yield (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
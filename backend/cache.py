@@ -0,0 +1,92 @@
+"""
+SkillSync Backend - Result Cache
+Bounded LRU cache with time-to-live for memoizing gap analysis and
+readiness predictions keyed by a canonical skill profile
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+DEFAULT_MAXSIZE = int(os.environ.get('SKILLSYNC_CACHE_SIZE', '4096'))
+DEFAULT_TTL = float(os.environ.get('SKILLSYNC_CACHE_TTL', '300'))
+
+
+def profile_key(user_skills: Dict, *parts: Any) -> str:
+    """
+    Canonical hash of a skill profile plus any extra key parts
+
+    Skill order and level capitalisation ("Beginner" vs "beginner") do not
+    change the key. Skill IDs are used as given: they are case-sensitive
+    catalog IDs, so {"SQL": ...} and {"sql": ...} are different profiles.
+    """
+    skills = sorted(
+        (skill_id, level.lower() if isinstance(level, str) else level)
+        for skill_id, level in user_skills.items()
+    )
+    payload = json.dumps([skills, *parts], separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """(True, value) on a live hit, (False, None) otherwise"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value, evicting the least recently used entries if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, bounds and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,384 @@
+"""
+SkillSync Backend - Catalog Store
+Keeps the skills, job roles and resources CSVs in memory for the whole process
+
+The CSVs are parsed once into an immutable CatalogSnapshot. A background
+watcher checks the file modification times and, when one changes, builds a
+new snapshot and swaps it in with a single reference assignment. Readers
+always get a complete snapshot and never touch disk.
+
+When data/catalog.pack (catalog_pack.py) was built from the current CSVs,
+snapshots are read from it instead, and pandas is only imported if someone
+asks a snapshot for its DataFrames.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from operator import itemgetter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from catalog_pack import PACK_FILE, CatalogPack
+from metrics import timed
+from skill_graph import SkillGraph
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+SKILLS_FILE = 'skills.csv'
+JOB_ROLES_FILE = 'job_roles.csv'
+RESOURCES_FILE = 'resources.csv'
+# Optional: skill_id,prerequisite_id edges (no file = no prerequisites)
+PREREQUISITES_FILE = 'skill_prerequisites.csv'
+CATALOG_FILES = (SKILLS_FILE, JOB_ROLES_FILE, RESOURCES_FILE, PREREQUISITES_FILE)
+OPTIONAL_FILES = (PREREQUISITES_FILE,)
+PREREQUISITE_COLUMNS = ['skill_id', 'prerequisite_id']
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Read data/catalog.pack when it is current (SKILLSYNC_CATALOG_PACK=0: always
+# parse the CSVs)
+USE_PACK = os.environ.get('SKILLSYNC_CATALOG_PACK', '1').lower() not in ('0', 'false', 'no')
+
+# How often the watcher looks at the CSV modification times (seconds)
+POLL_INTERVAL = float(os.environ.get('SKILLSYNC_CATALOG_POLL_SECONDS', '2'))
+
+# Roadmap order of skill categories (Core CS first, then Programming, etc.);
+# between skills without a prerequisite relation, see skill_graph.py
+CATEGORY_PRIORITY = {
+    'Core CS': 1, 'Programming': 2, 'Web Development': 3,
+    'Database': 4, 'AI/ML': 5, 'Data Science': 6,
+    'Tools': 7, 'Cloud': 8, 'Soft Skills': 9, 'Methodology': 10
+}
+UNKNOWN_CATEGORY_PRIORITY = 99
+
+# Resources kept per roadmap fragment (roadmap steps show at most this many)
+FRAGMENT_TOP_N = 3
+
+
+class RoadmapFragment(NamedTuple):
+    """Precomputed roadmap step data for one skill at one difficulty"""
+    skill_id: str
+    level: Optional[str]        # None = resources of every difficulty
+    resources: Tuple[Dict, ...]  # top FRAGMENT_TOP_N, roadmap resource format
+    total_hours: int            # over all resources of the level, not just the top
+    cheapest: Optional[Dict]    # fewest-hours resource of the level (first on ties)
+
+
+def _file_signature(data_dir: str) -> Tuple[Tuple[str, int, int], ...]:
+    """(name, mtime_ns, size) for every catalog file ((name, 0, -1) if optional and absent)"""
+    signature = []
+    for name in CATALOG_FILES:
+        path = os.path.join(data_dir, name)
+        if name in OPTIONAL_FILES and not os.path.exists(path):
+            signature.append((name, 0, -1))
+            continue
+        stat = os.stat(path)
+        signature.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _freeze(records: List[Dict]) -> Tuple[MappingProxyType, ...]:
+    """Wrap a list of row dicts as a tuple of read-only mappings"""
+    return tuple(MappingProxyType(record) for record in records)
+
+
+def _roadmap_resource(row: MappingProxyType) -> Dict:
+    """A resources.csv row in the format roadmap steps list resources in"""
+    return {
+        'name': row['resource_name'],
+        'type': row['resource_type'],
+        'url': row['url'],
+        'difficulty': row['difficulty'],
+        'hours': int(row['estimated_hours'])
+    }
+
+
+def read_catalog_frames(data_dir: str) -> Dict[str, 'pd.DataFrame']:
+    """
+    Parse the catalog CSVs of data_dir with pandas
+
+    Returns:
+        File name -> DataFrame for every CATALOG_FILES entry (an empty
+        frame for an optional file that does not exist)
+    """
+    import pandas as pd
+
+    frames = {}
+    for name in CATALOG_FILES:
+        path = os.path.join(data_dir, name)
+        if name == PREREQUISITES_FILE and not os.path.exists(path):
+            frames[name] = pd.DataFrame(columns=PREREQUISITE_COLUMNS)
+        else:
+            frames[name] = pd.read_csv(path)
+    return frames
+
+
+def _read_pack(data_dir: str) -> Optional[Dict[str, List[Dict]]]:
+    """Rows per file name from data_dir's catalog.pack; None if absent or stale"""
+    path = os.path.join(data_dir, PACK_FILE)
+    if not USE_PACK or not os.path.exists(path):
+        return None
+    try:
+        with CatalogPack(path) as pack:
+            if not pack.is_current(data_dir, CATALOG_FILES):
+                print(f"⚠ {PACK_FILE} does not match the catalog CSVs, reading the CSVs "
+                      f"(rebuild it with: python catalog_pack.py)")
+                return None
+            return {name: pack.records(name) for name in pack.table_names}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠ Could not read {PACK_FILE}, reading the CSVs: {e}")
+        return None
+
+
+class CatalogSnapshot:
+    """Immutable, indexed copy of the catalog CSVs at one point in time"""
+
+    def __init__(
+        self,
+        skill_rows: List[Dict],
+        role_rows: List[Dict],
+        resource_rows: List[Dict],
+        version: str,
+        prerequisite_rows: Iterable[Dict] = (),
+        frames: Optional[Tuple['pd.DataFrame', ...]] = None
+    ):
+        """
+        Args:
+            skill_rows, role_rows, resource_rows, prerequisite_rows: CSV rows
+                as dicts (DataFrame.to_dict('records') format)
+            version: Catalog version string
+            frames: (skills, roles, resources) DataFrames of the rows, if the
+                    caller already has them
+        """
+        self.version = version
+        self.loaded_at = time.time()
+        # File signature the snapshot was read from (None if built in memory)
+        self.signature = None
+
+        # Rows for the DataFrame properties, which build frames on first use
+        self._rows = (skill_rows, role_rows, resource_rows)
+        self._frames = frames
+
+        skill_records = _freeze(skill_rows)
+        self.skill_ids = tuple(record['skill_id'] for record in skill_records)
+        self.skills = MappingProxyType(
+            {record['skill_id']: record for record in skill_records}
+        )
+
+        role_records = []
+        for record in role_rows:
+            role_records.append({
+                **record,
+                'required_skills': tuple(s.strip() for s in record['required_skills'].split(','))
+            })
+        role_records = _freeze(role_records)
+        self.role_ids = tuple(record['role_id'] for record in role_records)
+        self.roles = MappingProxyType(
+            {record['role_id']: record for record in role_records}
+        )
+
+        resources_by_skill = {}
+        for record in _freeze(resource_rows):
+            resources_by_skill.setdefault(record['skill_id'], []).append(record)
+        self.resources_by_skill = MappingProxyType(
+            {skill_id: tuple(rows) for skill_id, rows in resources_by_skill.items()}
+        )
+
+        # skill_id -> prerequisite skill IDs (edges between catalog skills only)
+        prerequisites = {}
+        for record in prerequisite_rows:
+            skill_id = str(record['skill_id']).strip()
+            prerequisite_id = str(record['prerequisite_id']).strip()
+            if (skill_id != prerequisite_id and skill_id in self.skills
+                    and prerequisite_id in self.skills):
+                edges = prerequisites.setdefault(skill_id, [])
+                if prerequisite_id not in edges:
+                    edges.append(prerequisite_id)
+        self.prerequisites = MappingProxyType(
+            {skill_id: tuple(edges) for skill_id, edges in prerequisites.items()}
+        )
+        self.skill_graph = SkillGraph(self.skill_ids, self.prerequisites, {
+            skill_id: CATEGORY_PRIORITY.get(skill['category'], UNKNOWN_CATEGORY_PRIORITY)
+            for skill_id, skill in self.skills.items()
+        })
+
+        self.roadmap_fragments = MappingProxyType(self._build_roadmap_fragments())
+
+    # DataFrames are kept for callers that still want pandas; treat them as
+    # read-only, they are shared by every request
+
+    @property
+    def skills_df(self) -> 'pd.DataFrame':
+        return self._dataframes()[0]
+
+    @property
+    def roles_df(self) -> 'pd.DataFrame':
+        return self._dataframes()[1]
+
+    @property
+    def resources_df(self) -> 'pd.DataFrame':
+        return self._dataframes()[2]
+
+    def _dataframes(self) -> Tuple['pd.DataFrame', ...]:
+        """The catalog tables as DataFrames, built (and pandas imported) on first use"""
+        frames = self._frames
+        if frames is None:
+            import pandas as pd
+            # Racing builders make equal frames; whichever is assigned last wins
+            frames = self._frames = tuple(pd.DataFrame(rows) for rows in self._rows)
+        return frames
+
+    def _build_roadmap_fragments(self) -> Dict[Tuple[str, Optional[str]], RoadmapFragment]:
+        """(skill_id, difficulty or None) -> RoadmapFragment for every skill"""
+        fragments = {}
+        for skill_id in self.skills:
+            # Each resource is converted once and shared by its fragments
+            resources = [_roadmap_resource(row) for row in self.get_resources(skill_id)]
+            by_level = {None: resources}
+            for resource in resources:
+                by_level.setdefault(resource['difficulty'], []).append(resource)
+
+            for level, level_resources in by_level.items():
+                fragments[(skill_id, level)] = RoadmapFragment(
+                    skill_id=skill_id,
+                    level=level,
+                    resources=tuple(level_resources[:FRAGMENT_TOP_N]),
+                    total_hours=sum(resource['hours'] for resource in level_resources),
+                    cheapest=min(level_resources, key=itemgetter('hours'), default=None)
+                )
+        return fragments
+
+    @classmethod
+    def from_frames(
+        cls,
+        skills_df: 'pd.DataFrame',
+        roles_df: 'pd.DataFrame',
+        resources_df: 'pd.DataFrame',
+        prerequisites_df: Optional['pd.DataFrame'] = None
+    ) -> 'CatalogSnapshot':
+        """Build a snapshot from in-memory DataFrames (version from content)"""
+        import pandas as pd
+
+        digest = hashlib.sha1()
+        for df in (skills_df, roles_df, resources_df, prerequisites_df):
+            if df is not None:
+                digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return cls(
+            skills_df.to_dict('records'),
+            roles_df.to_dict('records'),
+            resources_df.to_dict('records'),
+            digest.hexdigest()[:12],
+            prerequisites_df.to_dict('records') if prerequisites_df is not None else (),
+            frames=(skills_df, roles_df, resources_df)
+        )
+
+    @classmethod
+    @timed('catalog_load')
+    def from_files(cls, data_dir: str = DATA_DIR) -> 'CatalogSnapshot':
+        """Load the catalog in data_dir into a snapshot (from catalog.pack if current)"""
+        signature = _file_signature(data_dir)
+        rows = _read_pack(data_dir)
+        if rows is None:
+            rows = {
+                name: df.to_dict('records') for name, df in read_catalog_frames(data_dir).items()
+            }
+        snapshot = cls(
+            rows[SKILLS_FILE],
+            rows[JOB_ROLES_FILE],
+            rows[RESOURCES_FILE],
+            hashlib.sha1(repr(signature).encode()).hexdigest()[:12],
+            rows[PREREQUISITES_FILE]
+        )
+        snapshot.signature = signature
+        return snapshot
+
+    def get_resources(self, skill_id: str) -> Tuple[MappingProxyType, ...]:
+        """All resources for a skill, in CSV order"""
+        return self.resources_by_skill.get(skill_id, ())
+
+    def roadmap_fragment(
+        self,
+        skill_id: str,
+        level: Optional[str] = None
+    ) -> Optional[RoadmapFragment]:
+        """
+        Roadmap data for a skill at a difficulty, falling back to all of the
+        skill's resources when none match; None for unknown skills
+        """
+        fragment = self.roadmap_fragments.get((skill_id, level))
+        if fragment is None and level is not None:
+            fragment = self.roadmap_fragments.get((skill_id, None))
+        return fragment
+
+
+class Catalog:
+    """Process-wide holder of the current CatalogSnapshot with hot reload"""
+
+    def __init__(self, data_dir: str = DATA_DIR, poll_interval: float = POLL_INTERVAL):
+        self.data_dir = data_dir
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot; only the very first call loads from disk"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = CatalogSnapshot.from_files(self.data_dir)
+                snapshot = self._snapshot
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """
+        Swap in a new snapshot if any catalog file changed on disk
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        current = self.snapshot()
+        try:
+            if _file_signature(self.data_dir) == current.signature:
+                return False
+        except OSError:
+            # File is being replaced; try again on the next poll
+            return False
+
+        # Someone else is already reloading; readers keep the old snapshot
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._snapshot = CatalogSnapshot.from_files(self.data_dir)
+        except Exception as e:
+            print(f"⚠ Catalog reload failed, keeping version {current.version}: {e}")
+            return False
+        finally:
+            self._lock.release()
+
+        print(f"✓ Catalog reloaded (version {self._snapshot.version})")
+        return True
+
+    def start_watcher(self) -> None:
+        """Start the background thread that polls for CSV changes"""
+        if self._watcher is not None or self.poll_interval <= 0:
+            return
+
+        def watch():
+            while True:
+                time.sleep(self.poll_interval)
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(target=watch, name='catalog-watcher', daemon=True)
+        self._watcher.start()
+
+
+_catalog = Catalog()
+
+
+def get_catalog() -> Catalog:
+    """Process-wide catalog instance"""
+    return _catalog
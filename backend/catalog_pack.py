@@ -0,0 +1,280 @@
+"""
+SkillSync Backend - Packed Catalog
+Compiles the catalog CSVs into one columnar file that loads without parsing
+
+    cd backend
+    python catalog_pack.py            # writes data/catalog.pack
+
+Parsing the CSVs needs pandas, which is slow to import and slower to parse
+once the catalog reaches tens of thousands of resources. catalog.pack holds
+the same tables ready to use:
+
+    8 bytes   magic b'SKSPACK\\0'
+    uint32    format version
+    uint32    header length
+    header    JSON: source files, string table and column layout
+    body      (8-byte aligned) string offsets, string bytes, columns
+
+Every distinct string is stored once in the string table. A string column is
+an int32 array of string IDs (-1 for an empty cell), an int column an int32
+array and a float column a float64 array, all little-endian. Loading
+memory-maps the file, reads the columns with numpy.frombuffer and decodes
+each distinct string once, so there is no CSV parsing and no pandas import.
+
+The pack is a fast-decode format, not shared memory: CatalogSnapshot is
+built from Python dicts, so every worker still holds its own copy of the
+decoded catalog, and the mapping is closed once the rows are built.
+
+The header records the size, modification time and SHA-1 of every source
+CSV. catalog.py only uses a pack that still matches them and reads the CSVs
+otherwise, so a forgotten rebuild costs start-up time, never stale data.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PACK_FILE = 'catalog.pack'
+MAGIC = b'SKSPACK\0'
+FORMAT_VERSION = 1
+
+# magic, format version, header length
+_PREFIX = struct.Struct('<8sII')
+_ALIGN = 8
+_INT32 = np.dtype('<i4')
+_FLOAT64 = np.dtype('<f8')
+_INT32_RANGE = (np.iinfo(np.int32).min, np.iinfo(np.int32).max)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def describe_sources(data_dir: str, names: Sequence[str]) -> List[Dict]:
+    """Size, mtime and SHA-1 of each source file (size -1 if it does not exist)"""
+    sources = []
+    for name in names:
+        path = os.path.join(data_dir, name)
+        if not os.path.exists(path):
+            sources.append({'name': name, 'size': -1, 'mtime_ns': 0, 'sha1': None})
+            continue
+        stat = os.stat(path)
+        sources.append({
+            'name': name,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': _sha1(path)
+        })
+    return sources
+
+
+def write_pack(path: str, frames: Dict[str, 'pd.DataFrame'], sources: List[Dict]) -> Dict:
+    """
+    Write DataFrames as a pack (atomically: readers see the old or new file)
+
+    Args:
+        frames: table name -> DataFrame, as parsed from the source
+        sources: describe_sources() of the files the frames came from
+
+    Returns:
+        The pack header
+    """
+    import pandas as pd
+
+    strings: Dict[str, int] = {}
+    tables = {}
+    columns = []
+    for table, df in frames.items():
+        layout = []
+        for name in df.columns:
+            series = df[name]
+            if pd.api.types.is_integer_dtype(series.dtype):
+                values = series.to_numpy(dtype=np.int64)
+                low, high = _INT32_RANGE
+                if len(values) and (values.min() < low or values.max() > high):
+                    raise ValueError(f'{table} column {name} does not fit in int32')
+                kind, data = 'int', values.astype(_INT32)
+            elif pd.api.types.is_float_dtype(series.dtype):
+                kind, data = 'float', series.to_numpy(dtype=_FLOAT64)
+            else:
+                ids = [
+                    -1 if pd.isna(value) else strings.setdefault(str(value), len(strings))
+                    for value in series.tolist()
+                ]
+                kind, data = 'str', np.asarray(ids, dtype=_INT32)
+            layout.append({'name': str(name), 'type': kind})
+            columns.append(data.tobytes())
+        tables[table] = {'rows': len(df), 'columns': layout}
+
+    encoded = [value.encode('utf-8') for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=_INT32)
+    offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+    sections = [offsets.tobytes(), b''.join(encoded)] + columns
+
+    # Body offsets of every section, in write order
+    positions = []
+    position = 0
+    for section in sections:
+        positions.append(position)
+        position = _aligned(position + len(section))
+
+    header = {
+        'format': FORMAT_VERSION,
+        'created': datetime.now().isoformat(),
+        'sources': sources,
+        'strings': {'count': len(encoded), 'offsets': positions[0],
+                    'data': positions[1], 'size': len(sections[1])},
+        'tables': tables
+    }
+    column_positions = iter(positions[2:])
+    for layout in tables.values():
+        for column in layout['columns']:
+            column['offset'] = next(column_positions)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    body_start = _aligned(_PREFIX.size + len(header_bytes))
+
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for section, offset in zip(sections, positions):
+            f.write(b'\0' * (body_start + offset - f.tell()))
+            f.write(section)
+    os.replace(tmp_path, path)
+    return header
+
+
+class CatalogPack:
+    """A memory-mapped pack file; use as a context manager to unmap it"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mmap) < _PREFIX.size:
+                raise ValueError(f'{path} is not a catalog pack')
+            magic, version, header_length = _PREFIX.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not a catalog pack')
+            if version != FORMAT_VERSION:
+                raise ValueError(f'{path} has format {version}, expected {FORMAT_VERSION}')
+            end = _PREFIX.size + header_length
+            self.header = json.loads(self._mmap[_PREFIX.size:end].decode('utf-8'))
+        except Exception:
+            self._mmap.close()
+            raise
+        self._body = _aligned(end)
+        self._strings: Optional[List[str]] = None
+
+    def __enter__(self) -> 'CatalogPack':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    @property
+    def table_names(self) -> List[str]:
+        return list(self.header['tables'])
+
+    def is_current(self, data_dir: str, names: Sequence[str]) -> bool:
+        """
+        True if the pack was built from exactly the files names in data_dir
+        (same size, and same mtime or content)
+        """
+        sources = self.header['sources']
+        if [source['name'] for source in sources] != list(names):
+            return False
+        for source in sources:
+            path = os.path.join(data_dir, source['name'])
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                if source['size'] != -1:
+                    return False
+                continue
+            if stat.st_size != source['size']:
+                return False
+            if stat.st_mtime_ns != source['mtime_ns'] and _sha1(path) != source['sha1']:
+                return False
+        return True
+
+    def _array(self, dtype: np.dtype, offset: int, count: int) -> np.ndarray:
+        """A view of body bytes at offset; valid only while the pack is open"""
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=self._body + offset)
+
+    def strings(self) -> List[str]:
+        """The string table, decoded once"""
+        if self._strings is None:
+            table = self.header['strings']
+            offsets = self._array(_INT32, table['offsets'], table['count'] + 1).tolist()
+            start = self._body + table['data']
+            data = self._mmap[start:start + table['size']]
+            self._strings = [
+                data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(table['count'])
+            ]
+        return self._strings
+
+    def columns(self, table: str) -> Dict[str, list]:
+        """Column name -> Python values of a table"""
+        layout = self.header['tables'][table]
+        rows = layout['rows']
+        strings = self.strings()
+        columns = {}
+        for column in layout['columns']:
+            if column['type'] == 'float':
+                values = self._array(_FLOAT64, column['offset'], rows).tolist()
+            else:
+                values = self._array(_INT32, column['offset'], rows).tolist()
+                if column['type'] == 'str':
+                    values = [strings[i] if i >= 0 else float('nan') for i in values]
+            columns[column['name']] = values
+        return columns
+
+    def records(self, table: str) -> List[Dict]:
+        """Rows of a table as dicts, like DataFrame.to_dict('records')"""
+        columns = self.columns(table)
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from catalog import CATALOG_FILES, DATA_DIR, read_catalog_frames
+
+    parser = argparse.ArgumentParser(description='Compile the catalog CSVs into catalog.pack')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='directory of the catalog CSVs')
+    parser.add_argument('--output', help=f'pack file (default: <data-dir>/{PACK_FILE})')
+    args = parser.parse_args(argv)
+
+    path = args.output or os.path.join(args.data_dir, PACK_FILE)
+    sources = describe_sources(args.data_dir, CATALOG_FILES)
+    header = write_pack(path, read_catalog_frames(args.data_dir), sources)
+    rows = ', '.join(f"{table['rows']} {name}" for name, table in header['tables'].items())
+    print(f"✓ Catalog pack written to {path} ({os.path.getsize(path)} bytes; "
+          f"{header['strings']['count']} strings; {rows})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
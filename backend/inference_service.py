@@ -0,0 +1,218 @@
+"""
+SkillSync Backend - Inference Service
+One model per node, shared by every API worker process
+
+    SKILLSYNC_INFERENCE_AUTHKEY=<secret> \
+    SKILLSYNC_INFERENCE_ADDRESS=127.0.0.1:6100 python inference_service.py
+
+The service keeps a fixed pool of worker processes that load
+job_readiness_model.pkl with mmap_mode='r', so they all share the page
+cache of one file instead of each holding a private copy. API workers
+started with the same SKILLSYNC_INFERENCE_ADDRESS and
+SKILLSYNC_INFERENCE_AUTHKEY never load the model themselves: ml_predictor
+encodes feature rows locally and sends them here. Concurrent requests from
+all API workers are micro-batched into one predict call per batch.
+
+Connections are authenticated with SKILLSYNC_INFERENCE_AUTHKEY. There is no
+default: the service refuses to start, and clients to connect, without one.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import BaseManager
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+import ml_predictor
+from batching import MicroBatcher
+
+# Shared secret for service connections (required on both sides)
+AUTHKEY = os.environ.get('SKILLSYNC_INFERENCE_AUTHKEY', '').encode('utf-8') or None
+# Model processes in the pool (each batch runs on one of them)
+POOL_WORKERS = int(os.environ.get('SKILLSYNC_INFERENCE_WORKERS', str(os.cpu_count() or 1)))
+# Batching window: requests per batch and how long the first one waits
+# (only while another batch is running, see batching.py)
+BATCH_MAX_REQUESTS = int(os.environ.get('SKILLSYNC_INFERENCE_BATCH', '64'))
+BATCH_MAX_WAIT = float(os.environ.get('SKILLSYNC_INFERENCE_WAIT_MS', '2')) / 1000
+# Connections from each API worker process (one per sending thread)
+CLIENT_CONNECTIONS = 2
+
+
+def require_authkey(authkey: Optional[bytes] = None) -> bytes:
+    """authkey, else AUTHKEY; raises ValueError if neither is set"""
+    authkey = authkey or AUTHKEY
+    if not authkey:
+        raise ValueError('SKILLSYNC_INFERENCE_AUTHKEY is not set')
+    return authkey
+
+
+def parse_address(address: str) -> Union[Tuple[str, int], str]:
+    """'host:port' -> (host, port); anything else is a Unix socket path"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return host or '127.0.0.1', int(port)
+    return address
+
+
+def predict_stacked(
+    predict: Callable[[np.ndarray], List[int]],
+    matrices: List[np.ndarray]
+) -> List[List[int]]:
+    """One predict call for several feature matrices, split back per matrix"""
+    scores = predict(np.vstack(matrices))
+    results = []
+    offset = 0
+    for matrix in matrices:
+        results.append(scores[offset:offset + len(matrix)])
+        offset += len(matrix)
+    return results
+
+
+class InferenceManager(BaseManager):
+    """Connection manager for the inference service"""
+
+
+InferenceManager.register('get_service')
+
+
+# ---------- pool processes ----------
+
+def _init_worker(mmap_mode: Optional[str]) -> None:
+    # Pool processes are the ones that predict locally
+    ml_predictor.INFERENCE_ADDRESS = None
+    ml_predictor.load_model(mmap_mode)
+
+
+def _worker_status() -> Dict:
+    status = ml_predictor.model_status()
+    status['features'] = list(ml_predictor._features or [])
+    status['pid'] = os.getpid()
+    return status
+
+
+def _worker_predict(features: np.ndarray) -> List[int]:
+    return ml_predictor._predict_matrix(features)
+
+
+# ---------- service ----------
+
+class InferenceService:
+    """Micro-batched predictions on a pool of memory-mapped model processes"""
+
+    def __init__(
+        self,
+        workers: int = POOL_WORKERS,
+        mmap_mode: str = 'r',
+        max_batch: int = BATCH_MAX_REQUESTS,
+        max_wait: float = BATCH_MAX_WAIT
+    ):
+        # spawn: pool processes may start after the batcher threads exist
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(mmap_mode,)
+        )
+        self._status = self.pool.submit(_worker_status).result()
+        self._status.update({'pool_workers': workers, 'max_batch': max_batch})
+        # One dispatcher per pool process keeps every process busy
+        self.batcher = MicroBatcher(
+            self._run_batch, max_batch, max_wait, dispatchers=workers, name='inference-batch'
+        )
+
+    def status(self) -> Dict:
+        """Model status of the pool processes, plus the feature columns"""
+        return dict(self._status)
+
+    def predict(self, features: np.ndarray) -> List[int]:
+        """Scores for an encoded feature matrix (waits for its batch)"""
+        return self.batcher.submit(features)
+
+    def _run_batch(self, matrices: List[np.ndarray]) -> List[List[int]]:
+        return predict_stacked(
+            lambda features: self.pool.submit(_worker_predict, features).result(),
+            matrices
+        )
+
+
+def serve(address: str, authkey: Optional[bytes] = None) -> None:
+    """Run the service until interrupted"""
+    authkey = require_authkey(authkey)
+    service = InferenceService()
+    status = service.status()
+    if not status['loaded']:
+        print(f"⚠ Inference service has no model: {status['error']}")
+
+    class ServiceManager(BaseManager):
+        pass
+
+    ServiceManager.register('get_service', callable=lambda: service)
+    manager = ServiceManager(address=parse_address(address), authkey=authkey)
+    server = manager.get_server()
+    print(f"✓ Inference service on {address} ({status['pool_workers']} model processes)")
+    server.serve_forever()
+
+
+# ---------- API worker side ----------
+
+class InferenceClient:
+    """
+    Proxy to a running inference service (safe to share between threads)
+
+    Predictions from all threads of this process are micro-batched here
+    too, so the process needs only CLIENT_CONNECTIONS connections.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: Optional[bytes] = None,
+        max_batch: int = BATCH_MAX_REQUESTS,
+        max_wait: float = BATCH_MAX_WAIT
+    ):
+        self.address = address
+        self.authkey = require_authkey(authkey)
+        self._lock = threading.Lock()
+        self._service = None
+        self._connect()
+        self.batcher = MicroBatcher(
+            lambda matrices: predict_stacked(self._send, matrices),
+            max_batch, max_wait, dispatchers=CLIENT_CONNECTIONS, name='inference-client'
+        )
+
+    def _connect(self) -> None:
+        manager = InferenceManager(address=parse_address(self.address), authkey=self.authkey)
+        manager.connect()
+        self._service = manager.get_service()
+
+    def _call(self, method: str, *args):
+        # The proxy opens one connection per calling thread
+        try:
+            return getattr(self._service, method)(*args)
+        except (EOFError, ConnectionError):
+            # Service restarted: reconnect once and retry
+            with self._lock:
+                self._connect()
+            return getattr(self._service, method)(*args)
+
+    def _send(self, features: np.ndarray) -> List[int]:
+        return self._call('predict', features)
+
+    def status(self) -> Dict:
+        return self._call('status')
+
+    def predict(self, features: np.ndarray) -> List[int]:
+        """Scores for an encoded feature matrix"""
+        return self.batcher.submit(features)
+
+
+if __name__ == '__main__':
+    if not AUTHKEY:
+        print("⚠ Set SKILLSYNC_INFERENCE_AUTHKEY to a shared secret (e.g. the output of "
+              "python -c 'import secrets; print(secrets.token_hex(32))')")
+        sys.exit(1)
+    serve(os.environ.get('SKILLSYNC_INFERENCE_ADDRESS') or '127.0.0.1:6100')
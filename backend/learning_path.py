@@ -0,0 +1,348 @@
+"""
+SkillSync Backend - Learning Path Optimizer
+Chooses which gap skills to study, to which level and with which resources,
+so the match percentage gained within a time budget is as large as possible
+
+Every gap skill is an item with a few options (reach beginner, reach
+intermediate), each costing the hours of the cheapest resources for it.
+Prerequisites the user does not know yet become extra items worth no match
+points, and an option can only be taken once all of its skill's
+prerequisites are taken too.
+
+choose() solves this multiple-choice knapsack exactly with a dynamic program
+over the items in prerequisite order. Its subproblems are keyed by the match
+points gained so far and by which already-chosen prerequisites are still
+needed by later items, and each keeps only the fewest hours that reach it.
+Match points are small integers (two per skill), so the budget can be any
+number of hours without slowing it down, but the table doubles with every
+prerequisite that is shared by later items.
+
+Past EXACT_DP_LIMIT choose() bundles every gap skill with all of its
+missing prerequisites instead, solves the resulting knapsack of independent
+skills and fills the hours that shared prerequisites save greedily. That is
+polynomial in the number of skills whatever the prerequisite graph looks
+like, and the plan still respects the budget and every prerequisite.
+"""
+
+import itertools
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from catalog import CatalogSnapshot
+from skill_profile import iter_bits
+
+# Match points, in half-skill units: analyze_gap counts a proficient
+# (intermediate or better) skill as 1 and a beginner skill as 0.5
+POINTS = {'beginner': 1, 'intermediate': 2}
+
+# choose() solves exactly while items x (points + 1) x 2^(prerequisites held
+# at once) stays below this; larger inputs use the bundled knapsack
+EXACT_DP_LIMIT = 1 << 16
+
+
+class PathOption(NamedTuple):
+    """One way of studying a skill"""
+    level: str                   # level reached
+    points: int                  # match points gained (half-skill units)
+    hours: int
+    resources: Tuple[Dict, ...]  # roadmap resource format
+
+
+class PathItem(NamedTuple):
+    """A skill the optimizer may schedule"""
+    skill_id: str
+    kind: str                    # 'new', 'improve' or 'prerequisite'
+    current_level: Optional[str]
+    options: Tuple[PathOption, ...]
+    prerequisites: Tuple[int, ...]   # indexes of earlier items it needs
+    blocked: bool                # some prerequisite can never be scheduled
+
+
+def _cheapest(snapshot: CatalogSnapshot, skill_id: str, level: str, exact: bool = False) -> Optional[Dict]:
+    """
+    Fewest-hours resource for a level; unless exact, a skill without
+    resources at that level falls back to its resources of any difficulty
+    """
+    fragment = snapshot.roadmap_fragment(skill_id, level)
+    if fragment is None or (exact and fragment.level != level):
+        return None
+    return fragment.cheapest
+
+
+def _options(snapshot: CatalogSnapshot, skill_id: str, kind: str) -> Tuple[PathOption, ...]:
+    """Ways to study a skill, cheapest resource per difficulty"""
+    if kind == 'improve':
+        # From beginner: an intermediate resource makes the skill proficient
+        resource = _cheapest(snapshot, skill_id, 'intermediate', exact=True)
+        if resource is None:
+            return ()
+        return (PathOption('intermediate', POINTS['intermediate'] - POINTS['beginner'],
+                           resource['hours'], (resource,)),)
+
+    beginner = _cheapest(snapshot, skill_id, 'beginner')
+    if beginner is None:
+        return ()
+    points = 0 if kind == 'prerequisite' else POINTS['beginner']
+    options = [PathOption('beginner', points, beginner['hours'], (beginner,))]
+    # Only intermediate resources can take a new skill to proficient
+    intermediate = _cheapest(snapshot, skill_id, 'intermediate', exact=True) if kind == 'new' else None
+    if intermediate is not None:
+        if intermediate['url'] == beginner['url']:
+            # No beginner resources: the beginner option already uses this one
+            resources = (beginner,)
+        else:
+            resources = (beginner, intermediate)
+        options.append(PathOption(
+            'intermediate', POINTS['intermediate'],
+            sum(resource['hours'] for resource in resources), resources
+        ))
+    return tuple(options)
+
+
+def build_items(
+    snapshot: CatalogSnapshot,
+    missing_skills: Iterable[str],
+    skills_to_improve: Iterable[Tuple[str, str]],
+    known_skills: Set[str]
+) -> Tuple[List[PathItem], List[Dict]]:
+    """
+    Items for choose(), prerequisites before the skills that need them
+
+    Args:
+        missing_skills: Skill IDs the user does not have
+        skills_to_improve: (skill_id, current_level) pairs
+        known_skills: Skills the user has at some level (satisfy prerequisites)
+
+    Returns:
+        (items, skipped) where skipped lists {'skill_id', 'reason'} for gap
+        skills that cannot gain match points
+    """
+    kinds: Dict[str, Tuple[str, Optional[str]]] = {}
+    skipped = []
+    for skill_id in missing_skills:
+        if skill_id in snapshot.skills and skill_id not in kinds:
+            kinds[skill_id] = ('new', None)
+    for skill_id, current_level in skills_to_improve:
+        if skill_id not in snapshot.skills or skill_id in kinds:
+            continue
+        if current_level == 'beginner':
+            kinds[skill_id] = ('improve', current_level)
+        else:
+            # Already proficient: more study does not raise the match
+            skipped.append({'skill_id': skill_id, 'reason': 'no_match_gain'})
+    known = (set(known_skills) | {skill_id for skill_id, _ in skills_to_improve}) - {
+        skill_id for skill_id, (kind, _) in kinds.items() if kind == 'new'
+    }
+
+    # Unknown prerequisites of the gap skills, transitively
+    pending = list(kinds)
+    while pending:
+        for prerequisite_id in snapshot.prerequisites.get(pending.pop(), ()):
+            if prerequisite_id not in known and prerequisite_id not in kinds:
+                kinds[prerequisite_id] = ('prerequisite', None)
+                pending.append(prerequisite_id)
+
+    # Prerequisites held at some level (including skills to improve) are met
+    needs = {
+        skill_id: [
+            p for p in snapshot.prerequisites.get(skill_id, ()) if p in kinds and p not in known
+        ]
+        for skill_id in kinds
+    }
+    # Catalog learning order: prerequisites first, then category priority
+    order = snapshot.skill_graph.sort(kinds)
+    index = {skill_id: i for i, skill_id in enumerate(order)}
+
+    items = []
+    for skill_id in order:
+        kind, current_level = kinds[skill_id]
+        prerequisites = tuple(sorted(
+            index[p] for p in needs[skill_id] if index[p] < index[skill_id]
+        ))
+        cyclic = any(index[p] > index[skill_id] for p in needs[skill_id])
+        blocked = cyclic or any(
+            not items[p].options or items[p].blocked for p in prerequisites
+        )
+        items.append(PathItem(
+            skill_id, kind, current_level, _options(snapshot, skill_id, kind),
+            prerequisites, blocked
+        ))
+    return items, skipped
+
+
+def choose(items: List[PathItem], budget_hours: float) -> List[Tuple[int, PathOption]]:
+    """
+    Most match points within budget_hours (fewest hours on ties)
+
+    Exact while the dynamic program is provably small (see EXACT_DP_LIMIT);
+    otherwise a bounded approximation that still never exceeds the budget.
+
+    Returns:
+        (item index, chosen option) in item order
+    """
+    # Last item that needs each item; past it the item's bit can be dropped
+    last_use = [-1] * len(items)
+    for i, item in enumerate(items):
+        for p in item.prerequisites:
+            last_use[p] = max(last_use[p], i)
+
+    # Most prerequisite bits any state can hold at once
+    width = 0
+    live = 0
+    for i in range(len(items)):
+        live -= sum(1 for p in items[i].prerequisites if last_use[p] == i)
+        if last_use[i] > i:
+            live += 1
+        width = max(width, live)
+    max_points = sum(max((o.points for o in item.options), default=0) for item in items)
+    if len(items) * (max_points + 1) << width <= EXACT_DP_LIMIT:
+        return _choose_exact(items, budget_hours, last_use)
+    return _choose_grouped(items, budget_hours)
+
+
+def _choose_exact(
+    items: List[PathItem],
+    budget_hours: float,
+    last_use: List[int]
+) -> List[Tuple[int, PathOption]]:
+    """The dynamic program over (needed prerequisites, points) states"""
+    # (still-needed chosen prerequisites mask, points) -> (hours, choices)
+    # where choices is a linked list (item, option index, rest)
+    states = {(0, 0): (0, None)}
+    for i, item in enumerate(items):
+        need = 0
+        expire = 0
+        for p in item.prerequisites:
+            need |= 1 << p
+            if last_use[p] == i:
+                expire |= 1 << p
+        bit = 1 << i if last_use[i] > i else 0
+        options = () if item.blocked else item.options
+
+        next_states = {}
+
+        def keep(key, hours, choices):
+            best = next_states.get(key)
+            if best is None or hours < best[0]:
+                next_states[key] = (hours, choices)
+
+        for (mask, points), (hours, choices) in states.items():
+            keep((mask & ~expire, points), hours, choices)
+            if mask & need != need:
+                continue
+            for k, option in enumerate(options):
+                total = hours + option.hours
+                if total <= budget_hours:
+                    keep(((mask | bit) & ~expire, points + option.points), total, (i, k, choices))
+        states = next_states
+
+    best_hours, best_choices = None, None
+    best_points = -1
+    for (_, points), (hours, choices) in states.items():
+        if points > best_points or (points == best_points and hours < best_hours):
+            best_points, best_hours, best_choices = points, hours, choices
+
+    chosen = []
+    while best_choices is not None:
+        i, k, best_choices = best_choices
+        chosen.append((i, items[i].options[k]))
+    chosen.reverse()
+    return chosen
+
+
+def _choose_grouped(items: List[PathItem], budget_hours: float) -> List[Tuple[int, PathOption]]:
+    """
+    Knapsack over gap skills bundled with their missing prerequisites
+
+    Each option of a skill is priced with the beginner option of every
+    prerequisite it needs (transitively), which makes the skills independent:
+    a knapsack indexed by match points then picks the fewest hours for every
+    total, in O(skills x points x options). Shared prerequisites are counted
+    once per skill here but scheduled once, so the plan can come in under
+    budget; the hours saved are filled greedily by points per hour.
+    """
+    # Transitive prerequisites of every item, as bitmasks of item indexes
+    closure = [0] * len(items)
+    for i, item in enumerate(items):
+        for p in item.prerequisites:
+            closure[i] |= closure[p] | 1 << p
+
+    # Beginner hours of every item; base_hours sums them over a bitmask
+    # without walking its bits in Python (closures can span the catalog)
+    hours_by_item = np.array([item.options[0].hours if item.options else 0 for item in items])
+    mask_bytes = (len(items) + 7) // 8
+
+    def base_hours(mask: int) -> int:
+        bits = np.unpackbits(
+            np.frombuffer(mask.to_bytes(mask_bytes, 'little'), dtype=np.uint8),
+            count=len(items), bitorder='little'
+        )
+        return int(bits @ hours_by_item)
+
+    # (item, option index, bundled hours) of every option worth points
+    groups = []
+    for i, item in enumerate(items):
+        if item.blocked or not any(option.points for option in item.options):
+            continue
+        prerequisite_hours = base_hours(closure[i])
+        for k, option in enumerate(item.options):
+            if option.points > 0 and option.hours + prerequisite_hours <= budget_hours:
+                groups.append((i, k, option.hours + prerequisite_hours))
+
+    # points -> (bundled hours, choices), choices a linked list as in _choose_exact
+    best: Dict[int, Tuple[float, Optional[tuple]]] = {0: (0, None)}
+    for i, group in itertools.groupby(groups, key=itemgetter(0)):
+        group = list(group)
+        next_best = dict(best)
+        for points, (hours, choices) in best.items():
+            for _, k, group_hours in group:
+                total = hours + group_hours
+                key = points + items[i].options[k].points
+                if total <= budget_hours and (key not in next_best or total < next_best[key][0]):
+                    next_best[key] = (total, (i, k, choices))
+        best = next_best
+
+    # Most points; each total already keeps its fewest hours
+    _, choices = best[max(best)]
+    selected: Dict[int, int] = {}
+    while choices is not None:
+        i, k, choices = choices
+        selected[i] = k
+    chosen_mask = 0
+    for i in list(selected):
+        for p in iter_bits(closure[i] & ~chosen_mask):
+            selected.setdefault(p, 0)
+        chosen_mask |= closure[i] | 1 << i
+    hours = sum(items[i].options[k].hours for i, k in selected.items())
+
+    # Spend what sharing saved: add the option with the most points per
+    # hour it still costs, one option per pass, until none fits
+    while True:
+        best_ratio, best_step = 0.0, None
+        for i, k, _ in groups:
+            current = selected.get(i)
+            if current is not None and current >= k:
+                continue
+            missing = closure[i] & ~chosen_mask
+            points = items[i].options[k].points
+            extra = items[i].options[k].hours + base_hours(missing)
+            if current is not None:
+                points -= items[i].options[current].points
+                extra -= items[i].options[current].hours
+            if points > 0 and hours + extra <= budget_hours:
+                ratio = points / extra if extra > 0 else float('inf')
+                if ratio > best_ratio:
+                    best_ratio, best_step = ratio, (i, k, missing, extra)
+        if best_step is None:
+            break
+        i, k, missing, extra = best_step
+        hours += extra
+        selected[i] = k
+        for p in iter_bits(missing):
+            selected[p] = 0
+        chosen_mask |= missing | 1 << i
+
+    return [(i, items[i].options[selected[i]]) for i in sorted(selected)]
+
@@ -0,0 +1,249 @@
+"""
+SkillSync Backend - Metrics
+Latency histograms in Prometheus text format and an on-demand sampling
+profiler
+
+Every request is timed per route, and the expensive steps inside it (catalog
+CSV loading, the gap analysis, readiness prediction, JSON serialization and
+user store reads/writes) are timed as named sections of that route with
+timed(). Sections may nest, e.g. predict_readiness runs inside the gap
+analysis of scoring_mode=ml requests. Work done outside a request (startup,
+the catalog watcher, batch dispatchers) is recorded under route
+"background".
+
+With SKILLSYNC_PROFILING=1, a request sent with the X-SkillSync-Profile
+header is sampled by a SamplingProfiler; its stacks are served in collapsed
+(flamegraph.pl) format by GET /debug/profiles/<id>.
+"""
+
+import bisect
+import contextvars
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds (seconds) of the histogram buckets
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Profiling is off unless explicitly enabled: it exposes code structure
+PROFILING_ENABLED = os.environ.get('SKILLSYNC_PROFILING', '').lower() in ('1', 'true', 'yes')
+PROFILE_HEADER = 'X-SkillSync-Profile'
+# Seconds between stack samples, and how many finished profiles are kept
+PROFILE_INTERVAL = float(os.environ.get('SKILLSYNC_PROFILE_INTERVAL_MS', '1')) / 1000
+MAX_PROFILES = 32
+
+BACKGROUND_ROUTE = 'background'
+
+# Route of the request the current thread is serving
+_route = contextvars.ContextVar('skillsync_route', default=BACKGROUND_ROUTE)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Thread-safe latency histogram with one series per label combination"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        """Exposition lines for every series (cumulative buckets)"""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram'
+        ]
+        with self._lock:
+            series = [(labels, list(counts), total, count)
+                      for labels, (counts, total, count) in sorted(self._series.items())]
+        for labelvalues, counts, total, count in series:
+            labels = ','.join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues)
+            )
+            prefix = f'{labels},' if labels else ''
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{self.name}_sum{suffix} {total!r}')
+            lines.append(f'{self.name}_count{suffix} {count}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'skillsync_request_duration_seconds',
+    'Time to produce a response, by route, method and status',
+    ('route', 'method', 'status')
+)
+SECTION_SECONDS = Histogram(
+    'skillsync_section_duration_seconds',
+    'Time spent in a named step, by the route it ran for',
+    ('route', 'section')
+)
+
+_registry = [REQUEST_SECONDS, SECTION_SECONDS]
+
+
+def render_metrics() -> str:
+    """Every registered histogram in Prometheus text exposition format"""
+    lines = []
+    for histogram in _registry:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+
+# ---------- request context ----------
+
+def enter_route(route: str) -> contextvars.Token:
+    """Attribute sections timed on this thread to route (until exit_route)"""
+    return _route.set(route)
+
+
+def exit_route(token: contextvars.Token) -> None:
+    _route.reset(token)
+
+
+def observe_request(route: str, method: str, status: int, seconds: float) -> None:
+    REQUEST_SECONDS.observe(seconds, route, method, str(status))
+
+
+def timed(section: str) -> Callable:
+    """Decorator recording each call's duration as a section of the current route"""
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                SECTION_SECONDS.observe(time.perf_counter() - start, _route.get(), section)
+        return wrapper
+    return decorator
+
+
+class section:
+    """Context manager form of timed(), for a block inside a function"""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> 'section':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        SECTION_SECONDS.observe(time.perf_counter() - self.start, _route.get(), self.name)
+
+
+# ---------- sampling profiler ----------
+
+def _collapse(frame) -> str:
+    """Stack of a frame as 'outer;...;inner' of file:function names"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples one thread's stack every interval seconds until stopped"""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='skillsync-profiler', daemon=True)
+
+    def start(self) -> 'SamplingProfiler':
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+_profile_ids = itertools.count(1)
+
+
+def save_profile(route: str, seconds: float, profiler: SamplingProfiler) -> str:
+    """Keep a stopped profiler's stacks (the oldest beyond MAX_PROFILES are dropped)"""
+    profile_id = str(next(_profile_ids))
+    with _profiles_lock:
+        _profiles[profile_id] = {
+            'route': route,
+            'seconds': seconds,
+            'interval': profiler.interval,
+            'samples': profiler.samples,
+            'stacks': profiler.stacks
+        }
+        while len(_profiles) > MAX_PROFILES:
+            _profiles.popitem(last=False)
+    return profile_id
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    """A kept profile in collapsed-stack format, or None if unknown"""
+    with _profiles_lock:
+        profile = _profiles.get(profile_id)
+    if profile is None:
+        return None
+    lines = [
+        f"# route={profile['route']} seconds={profile['seconds']:.6f} "
+        f"samples={profile['samples']} interval_ms={profile['interval'] * 1000:g}"
+    ]
+    for stack, count in profile['stacks'].most_common():
+        lines.append(f'{stack} {count}')
+    return '\n'.join(lines) + '\n'
@@ -4,35 +4,376 @@ Uses trained ML model (PKL) for job readiness prediction
 """
 
 import joblib
-import pandas as pd
+import numpy as np
 import os
+import threading
+import time
+import warnings
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from batching import MicroBatcher
+from cache import TTLCache, profile_key
+from metrics import timed
 
 # Model file paths (place your PKL files in backend/models/ folder)
 MODEL_DIR = os.path.join(os.path.dirname(__file__), 'models')
 MODEL_PATH = os.path.join(MODEL_DIR, 'job_readiness_model.pkl')
 FEATURES_PATH = os.path.join(MODEL_DIR, 'model_features.pkl')
 
-# Global model and features (loaded once)
+# joblib mmap_mode for the model arrays ('r' shares pages between worker
+# processes; only works for uncompressed dumps). Unset loads into memory.
+MODEL_MMAP_MODE = os.environ.get('SKILLSYNC_MODEL_MMAP') or None
+
+# Address of a running inference service (inference_service.py), e.g.
+# "127.0.0.1:6100" or a Unix socket path. When set, this process never loads
+# the model: it encodes features locally and the service predicts.
+INFERENCE_ADDRESS = os.environ.get('SKILLSYNC_INFERENCE_ADDRESS') or None
+
+# Concurrent single predictions are coalesced into one model call of up to
+# PREDICT_BATCH_MAX rows. While a model call is running the next batch waits
+# at most PREDICT_BATCH_WAIT seconds for more; otherwise it runs at once.
+# PREDICT_BATCH_MAX <= 1 predicts each one directly.
+PREDICT_BATCH_MAX = int(os.environ.get('SKILLSYNC_BATCH_MAX', '64'))
+PREDICT_BATCH_WAIT = float(os.environ.get('SKILLSYNC_BATCH_WAIT_MS', '2')) / 1000
+
+# Global model, features and compiled encoder (loaded once)
 _model = None
 _features = None
+_encoder = None
+_inference = None   # InferenceClient when INFERENCE_ADDRESS is set
+
+# Per-thread reusable 1-row feature buffer for single predictions
+_buffers = threading.local()
+
+# MicroBatcher for predict_readiness cache misses (created on first use)
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+# Outcome of the one load attempt, so a missing model is only checked once
+_load_state = {
+    'attempted': False,
+    'loaded': False,
+    'load_seconds': None,
+    'mmap_mode': None,
+    'version': None,
+    'error': None,
+    'inference_address': None
+}
+_load_lock = threading.Lock()
+
+# Memoized scores keyed by canonical (user_skills, target_role, model version)
+_readiness_cache = TTLCache()
+
+# Convert skill levels to numeric values
+SKILL_LEVELS = {
+    'beginner': 1,
+    'intermediate': 2,
+    'advanced': 3
+}
+
+# Map skill IDs to model feature names
+SKILL_FEATURE_MAPPING = {
+    'python': 'python',
+    'sql': 'sql',
+    'java': 'java',
+    'machine_learning': 'ml',
+    'deep_learning': 'ml',
+    'tensorflow': 'ml',
+    'pandas': 'stats',
+    'numpy': 'stats',
+    'data_viz': 'stats',
+    'git': 'git',
+}
+
+# Role mapping to model format
+ROLE_MAPPING = {
+    'data_analyst': 'data_analyst',
+    'data_scientist': 'data_analyst',
+    'ai_engineer': 'ml_engineer',
+    'backend_developer': 'backend_dev',
+    'software_developer': 'backend_dev',
+    'web_developer': 'backend_dev',
+    'fullstack_developer': 'backend_dev',
+    'devops_engineer': 'backend_dev',
+}
+
+# Feature values assumed for every user
+DEFAULT_FEATURES = {
+    'projects_completed': 2,
+    'internships': 1,
+}
+
+# Model role used when a target role has no entry in ROLE_MAPPING
+DEFAULT_MODEL_ROLE = 'backend_dev'
 
+# Distinct skill / role IDs counted by UnmappedInputs; later ones are only
+# added to a total, so arbitrary client-supplied IDs cannot grow memory
+UNMAPPED_TRACKED_IDS = 500
+# IDs listed per kind by unmapped_stats()
+UNMAPPED_REPORTED_IDS = 20
 
-def load_model():
-    """Load the ML model and features from PKL files"""
-    global _model, _features
+
+class FeatureEncoder:
+    """
+    Mappings from skill IDs, levels and roles to model feature columns,
+    compiled once from the feature list in model_features.pkl
+    """
+    
+    def __init__(self, features: List[str]):
+        self.features = list(features)
+        columns = {name: i for i, name in enumerate(self.features)}
+        
+        # skill_id -> column index (skills whose feature the model lacks are
+        # left out and returned as unmapped by encode)
+        self.skill_columns = {
+            skill_id: columns[feature]
+            for skill_id, feature in SKILL_FEATURE_MAPPING.items()
+            if feature in columns
+        }
+        self.level_values = dict(SKILL_LEVELS)
+        
+        # role_id -> column index of its target_role_* one-hot feature
+        self.role_columns = {}
+        for role_id, model_role in ROLE_MAPPING.items():
+            column = columns.get(f"target_role_{model_role}")
+            if column is not None:
+                self.role_columns[role_id] = column
+        self.default_role_column = columns.get(f"target_role_{DEFAULT_MODEL_ROLE}")
+        
+        # Row with every feature at its default value
+        self.template = np.zeros(len(self.features), dtype=np.float64)
+        for name, value in DEFAULT_FEATURES.items():
+            if name in columns:
+                self.template[columns[name]] = value
+    
+    def new_buffer(self, rows: int = 1) -> np.ndarray:
+        """Allocate a rows x features matrix for encode() to write into"""
+        return np.empty((rows, len(self.features)), dtype=np.float64)
     
-    if _model is None:
-        if os.path.exists(MODEL_PATH) and os.path.exists(FEATURES_PATH):
-            _model = joblib.load(MODEL_PATH)
+    def encode(
+        self,
+        user_skills: dict,
+        target_role: str,
+        out: np.ndarray
+    ) -> Tuple[List[str], bool]:
+        """
+        Write one user's features into a row buffer
+        
+        Args:
+            user_skills: Dict mapping skill_id to level name or 0-3
+            target_role: Job role ID
+            out: 1-D row of length len(features), overwritten in place
+        
+        Returns:
+            (skill IDs with no model feature, whether target_role was mapped)
+        """
+        out[:] = self.template
+        unmapped = []
+        
+        for skill_id, level in user_skills.items():
+            column = self.skill_columns.get(skill_id)
+            if column is None:
+                unmapped.append(skill_id)
+                continue
+            # Convert string level to numeric
+            if isinstance(level, str):
+                level = self.level_values.get(level.lower(), 1)
+            # Use max in case multiple skills map to same feature
+            if level > out[column]:
+                out[column] = level
+        
+        column = self.role_columns.get(target_role)
+        role_mapped = column is not None
+        if not role_mapped:
+            column = self.default_role_column
+        if column is not None:
+            out[column] = 1
+        
+        return unmapped, role_mapped
+
+
+class UnmappedInputs:
+    """Thread-safe, bounded counts of skills and roles the model cannot see"""
+    
+    def __init__(self, tracked: int = UNMAPPED_TRACKED_IDS):
+        self.tracked = tracked
+        self._lock = threading.Lock()
+        self._counts = {'skills': Counter(), 'roles': Counter()}
+        self._untracked = {'skills': 0, 'roles': 0}
+    
+    def _add(self, kind: str, ids: Iterable[str]) -> None:
+        counts = self._counts[kind]
+        for item_id in ids:
+            if item_id in counts or len(counts) < self.tracked:
+                counts[item_id] += 1
+            else:
+                self._untracked[kind] += 1
+    
+    def record(self, unmapped_skills: List[str], target_role: str, role_mapped: bool) -> None:
+        """Count one encode() result"""
+        if not unmapped_skills and role_mapped:
+            return
+        with self._lock:
+            self._add('skills', unmapped_skills)
+            if not role_mapped:
+                self._add('roles', (target_role,))
+    
+    def stats(self, top: int = UNMAPPED_REPORTED_IDS) -> Dict:
+        """Most frequent unmapped IDs per kind, plus the counts of the rest"""
+        stats = {}
+        with self._lock:
+            for kind, counts in self._counts.items():
+                top_counts = counts.most_common(top)
+                stats[kind] = {
+                    'top': dict(top_counts),
+                    'tracked': len(counts),
+                    'other': (sum(counts.values()) - sum(n for _, n in top_counts)
+                              + self._untracked[kind])
+                }
+        return stats
+
+
+# Unmapped inputs of every prediction computed by this process
+_unmapped = UnmappedInputs()
+
+
+def load_model(mmap_mode: Optional[str] = MODEL_MMAP_MODE) -> bool:
+    """
+    Load the ML model and features from PKL files
+    
+    Only the first call touches disk; the result, including "model
+    unavailable", is cached for the life of the process.
+    
+    Returns:
+        True if the model is available
+    """
+    if _load_state['attempted']:
+        return _load_state['loaded']
+    
+    with _load_lock:
+        if _load_state['attempted']:
+            return _load_state['loaded']
+        
+        start = time.perf_counter()
+        if INFERENCE_ADDRESS:
+            error, version = _connect_inference_service()
+        else:
+            error, version = _load_local_model(mmap_mode)
+        
+        _load_state.update({
+            'loaded': error is None,
+            'load_seconds': round(time.perf_counter() - start, 4),
+            'mmap_mode': mmap_mode,
+            'version': version,
+            'error': error,
+            'inference_address': INFERENCE_ADDRESS,
+            'attempted': True
+        })
+    return _load_state['loaded']
+
+
+def _load_local_model(mmap_mode: Optional[str]) -> Tuple[Optional[str], str]:
+    """Load the PKL files into this process; returns (error, version)"""
+    global _model, _features, _encoder
+    
+    error = None
+    if os.path.exists(MODEL_PATH) and os.path.exists(FEATURES_PATH):
+        try:
+            _model = joblib.load(MODEL_PATH, mmap_mode=mmap_mode)
             _features = joblib.load(FEATURES_PATH)
+            _encoder = FeatureEncoder(_features)
             print(f"✓ ML Model loaded successfully from {MODEL_PATH}")
-        else:
-            print(f"⚠ ML Model files not found at {MODEL_DIR}")
-            print("  Please place job_readiness_model.pkl and model_features.pkl in backend/models/")
-            return False
-    return True
+        except Exception as e:
+            _model = _features = _encoder = None
+            error = f"Failed to load model: {e}"
+            print(f"⚠ {error}")
+    else:
+        error = f"Model files not found at {MODEL_DIR}"
+        print(f"⚠ ML Model files not found at {MODEL_DIR}")
+        print("  Please place job_readiness_model.pkl and model_features.pkl in backend/models/")
+    
+    if error is None:
+        stat = os.stat(MODEL_PATH)
+        version = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    else:
+        version = 'fallback'
+    return error, version
+
+
+def _connect_inference_service() -> Tuple[Optional[str], str]:
+    """Use the model of a running inference service; returns (error, version)"""
+    global _features, _encoder, _inference
+    
+    # Imported here: the service module itself imports this one
+    from inference_service import InferenceClient
+    
+    try:
+        client = InferenceClient(INFERENCE_ADDRESS)
+        status = client.status()
+    except Exception as e:
+        error = f"Inference service at {INFERENCE_ADDRESS} unavailable: {e}"
+        print(f"⚠ {error}")
+        return error, 'fallback'
+    
+    if not status['loaded']:
+        error = f"Inference service has no model: {status['error']}"
+        print(f"⚠ {error}")
+        return error, 'fallback'
+    
+    _features = status['features']
+    _encoder = FeatureEncoder(_features)
+    _inference = client
+    print(f"✓ Using inference service at {INFERENCE_ADDRESS}")
+    return None, status['version']
+
+
+def preload_model(mmap_mode: Optional[str] = MODEL_MMAP_MODE) -> dict:
+    """Load the model eagerly (call at worker startup); returns model_status()"""
+    load_model(mmap_mode)
+    return model_status()
+
+
+def model_status() -> dict:
+    """Whether the model load has run, succeeded, and how long it took"""
+    return dict(_load_state)
+
+
+def model_version() -> str:
+    """Identifier of the loaded model file, or 'fallback' without a model"""
+    load_model()
+    return _load_state['version']
+
+
+def readiness_mode() -> str:
+    """How predict_readiness scores: 'ml' with a loaded model, else 'fallback'"""
+    return 'ml' if load_model() else 'fallback'
+
+
+def readiness_cache_stats() -> dict:
+    """Hit/miss/eviction counters of the predict_readiness cache"""
+    return _readiness_cache.stats()
+
+
+def unmapped_stats() -> dict:
+    """
+    Skills and roles of computed predictions that have no model feature
+    (cache hits are not counted; 'other' sums the IDs not in 'top')
+    """
+    return _unmapped.stats()
+
 
+def batching_stats() -> dict:
+    """Window settings, batch-size and queue-depth counters of single predictions"""
+    if _inference is not None:
+        # Already batched by the inference client
+        return {'enabled': True, 'via': 'inference_service', **_inference.batcher.stats()}
+    if _coalescer is None:
+        return {'enabled': PREDICT_BATCH_MAX > 1, 'batches': 0, 'items': 0}
+    return {'enabled': True, **_coalescer.stats()}
 
+
+@timed('predict_readiness')
 def predict_readiness(user_skills: dict, target_role: str) -> int:
     """
     Predict job readiness score using ML model
@@ -45,90 +386,114 @@ def predict_readiness(user_skills: dict, target_role: str) -> int:
     Returns:
         Job readiness score (0-100)
     """
+    key = profile_key(user_skills, target_role, model_version())
+    hit, score = _readiness_cache.get(key)
+    if hit:
+        return score
+    
+    score = _predict_readiness_uncached(user_skills, target_role)
+    _readiness_cache.set(key, score)
+    return score
+
+
+def _predict_readiness_uncached(user_skills: dict, target_role: str) -> int:
+    """Single prediction without the result cache"""
     if not load_model():
         # Fallback to simple calculation if model not available
         return _calculate_fallback_readiness(user_skills, target_role)
     
-    # Convert skill levels to numeric values
-    skill_levels = {
-        'beginner': 1,
-        'intermediate': 2,
-        'advanced': 3
-    }
+    coalescer = _get_coalescer()
+    if coalescer is not None:
+        # Encoded here, so a malformed profile fails only its own request
+        row = _encoder.new_buffer(1)[0]
+        unmapped, role_mapped = _encoder.encode(user_skills, target_role, row)
+        _unmapped.record(unmapped, target_role, role_mapped)
+        return coalescer.submit(row)
     
-    # Map skill IDs to model feature names
-    skill_mapping = {
-        'python': 'python',
-        'sql': 'sql',
-        'java': 'java',
-        'machine_learning': 'ml',
-        'deep_learning': 'ml',
-        'tensorflow': 'ml',
-        'pandas': 'stats',
-        'numpy': 'stats',
-        'data_viz': 'stats',
-        'git': 'git',
-    }
+    buffer = getattr(_buffers, 'row', None)
+    if buffer is None or buffer.shape[1] != len(_encoder.features):
+        buffer = _buffers.row = _encoder.new_buffer(1)
     
-    # Role mapping to model format
-    role_mapping = {
-        'data_analyst': 'data_analyst',
-        'data_scientist': 'data_analyst',
-        'ai_engineer': 'ml_engineer',
-        'backend_developer': 'backend_dev',
-        'software_developer': 'backend_dev',
-        'web_developer': 'backend_dev',
-        'fullstack_developer': 'backend_dev',
-        'devops_engineer': 'backend_dev',
-    }
+    unmapped, role_mapped = _encoder.encode(user_skills, target_role, buffer[0])
+    _unmapped.record(unmapped, target_role, role_mapped)
+    return _predict_matrix(buffer)[0]
+
+
+def _get_coalescer() -> Optional[MicroBatcher]:
+    """Batcher for single predictions, or None to predict them directly"""
+    global _coalescer
+    # The inference client batches the rows it sends on its own
+    if PREDICT_BATCH_MAX <= 1 or _inference is not None:
+        return None
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                # Two dispatchers: one batch collects while the other predicts
+                _coalescer = MicroBatcher(
+                    _predict_coalesced, PREDICT_BATCH_MAX, PREDICT_BATCH_WAIT,
+                    dispatchers=2, name='readiness-batch'
+                )
+    return _coalescer
+
+
+@timed('predict_readiness_batch')
+def _predict_coalesced(rows: List[np.ndarray]) -> List[int]:
+    """One model call for the encoded feature rows of a batch"""
+    return _predict_matrix(np.vstack(rows))
+
+
+@timed('predict_readiness_batch')
+def predict_readiness_batch(
+    profiles: List[dict],
+    target_roles: Union[str, List[str]]
+) -> List[int]:
+    """
+    Predict job readiness scores for many users with a single model call
     
-    # Prepare input data
-    user_data = {
-        "python": 0,
-        "sql": 0,
-        "java": 0,
-        "ml": 0,
-        "stats": 0,
-        "git": 0,
-        "projects_completed": 2,  # Default assumption
-        "internships": 1,        # Default assumption
-        "target_role_data_analyst": 0,
-        "target_role_ml_engineer": 0,
-        "target_role_backend_dev": 0
-    }
+    Args:
+        profiles: List of user_skills dicts (same format as predict_readiness)
+        target_roles: One role ID for every profile, or a list with one role
+                      ID per profile
     
-    # Map user skills to model features
-    for skill_id, level in user_skills.items():
-        # Convert string level to numeric
-        if isinstance(level, str):
-            level = skill_levels.get(level.lower(), 1)
-        
-        # Map to model feature
-        model_feature = skill_mapping.get(skill_id)
-        if model_feature and model_feature in user_data:
-            # Use max in case multiple skills map to same feature
-            user_data[model_feature] = max(user_data[model_feature], level)
+    Returns:
+        List of job readiness scores (0-100), in the order of profiles
+    """
+    if isinstance(target_roles, str):
+        target_roles = [target_roles] * len(profiles)
+    if len(target_roles) != len(profiles):
+        raise ValueError("target_roles must have one entry per profile")
     
-    # Set target role
-    mapped_role = role_mapping.get(target_role, 'backend_dev')
-    role_key = f"target_role_{mapped_role}"
-    if role_key in user_data:
-        user_data[role_key] = 1
+    if not load_model():
+        # Fallback to simple calculation if model not available
+        return [
+            _calculate_fallback_readiness(user_skills, target_role)
+            for user_skills, target_role in zip(profiles, target_roles)
+        ]
     
-    # Create DataFrame
-    df = pd.DataFrame([user_data])
+    if not profiles:
+        return []
     
-    # Ensure all features exist
-    for col in _features:
-        if col not in df:
-            df[col] = 0
+    # Preallocated feature matrix in the column order the model expects
+    features = _encoder.new_buffer(len(profiles))
+    for row, (user_skills, target_role) in enumerate(zip(profiles, target_roles)):
+        unmapped, role_mapped = _encoder.encode(user_skills, target_role, features[row])
+        _unmapped.record(unmapped, target_role, role_mapped)
     
-    df = df[_features]
+    return _predict_matrix(features)
+
+
+def _predict_matrix(features: np.ndarray) -> List[int]:
+    """Run the model on an encoded feature matrix and clip scores to 0-100"""
+    if _inference is not None:
+        return _inference.predict(features)
     
-    # Predict
-    prediction = _model.predict(df)[0]
+    # The model may have been fitted on a DataFrame; the columns are already
+    # in _features order, so the feature-name warning is noise
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        predictions = _model.predict(features)
     
-    return max(0, min(100, int(prediction)))
+    return np.clip(np.asarray(predictions).astype(np.int64), 0, 100).tolist()
 
 
 def _calculate_fallback_readiness(user_skills: dict, target_role: str) -> int:
@@ -0,0 +1,427 @@
+"""
+SkillSync Backend - Progress Event Log
+Append-only log of progress updates with periodic compaction
+
+Each POST /api/users/<id>/progress appends one JSON line
+(user_id, skill_id, status, ts) to data/progress/progress.log instead of
+rewriting the user's record. fsync is batched by a background flusher.
+The compactor rotates the active log to a .pending segment, folds its events
+into the per-user progress snapshots held by the user store and into the
+progress history (history.db, indexed by user), then keeps the segment as an
+archive. Only the newest archives are kept, and history older than
+HISTORY_DAYS is dropped.
+
+Reads combine the snapshot (or indexed history) with the events that have
+not been folded yet. Those are indexed by user in memory and only newly
+appended bytes are parsed on each read. Several worker processes can share
+one log directory: appends and reads take a shared file lock, rotation and
+folding take exclusive ones.
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking is only process-local
+    fcntl = None
+
+from user_store import UserRepository
+
+LOG_DIR = os.path.join(os.path.dirname(__file__), 'data', 'progress')
+ACTIVE_LOG = 'progress.log'
+PENDING_SUFFIX = '.pending'
+ARCHIVE_SUFFIX = '.log'
+
+# Longest time an appended event waits for fsync (seconds)
+FSYNC_INTERVAL = float(os.environ.get('SKILLSYNC_PROGRESS_FSYNC_MS', '50')) / 1000
+# How often the compactor folds the log into snapshots (seconds)
+COMPACT_INTERVAL = float(os.environ.get('SKILLSYNC_PROGRESS_COMPACT_SECONDS', '30'))
+# Compact early once the active log grows past this many bytes
+COMPACT_MAX_BYTES = int(os.environ.get('SKILLSYNC_PROGRESS_COMPACT_BYTES', str(1 << 20)))
+# Folded segments kept on disk as a raw backup (history is read from history.db)
+ARCHIVE_KEEP = int(os.environ.get('SKILLSYNC_PROGRESS_ARCHIVE_SEGMENTS', '8'))
+# Days of progress history kept (0 = forever)
+HISTORY_DAYS = float(os.environ.get('SKILLSYNC_PROGRESS_HISTORY_DAYS', '365'))
+
+HISTORY_DB = 'history.db'
+EVENT_FIELDS = ('user_id', 'skill_id', 'status', 'ts')
+
+
+def _is_event(event: object) -> bool:
+    return isinstance(event, dict) and all(isinstance(event.get(f), str) for f in EVENT_FIELDS)
+
+
+class _TailIndex:
+    """
+    Unfolded events by user, parsed incrementally
+
+    Segments are tracked by inode, so a rotation (a rename) keeps the active
+    log's events indexed, and by their first bytes, which catches a recycled
+    inode. Each refresh parses only the complete lines appended since the
+    previous one.
+    """
+
+    HEAD_BYTES = 64
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (st_dev, st_ino) -> {'head', 'offset', 'events': {user_id: [event]}}
+        self._files: Dict[tuple, Dict] = {}
+
+    def _refresh(self, paths: Iterable[str]) -> List[Dict]:
+        """Index entries of the given segments, in order"""
+        entries = []
+        files = {}
+        for path in paths:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                continue
+            with f:
+                stat = os.fstat(f.fileno())
+                key = (stat.st_dev, stat.st_ino)
+                entry = self._files.get(key)
+                if entry is not None and (
+                    stat.st_size < entry['offset'] or f.read(len(entry['head'])) != entry['head']
+                ):
+                    entry = None
+                if entry is None:
+                    entry = {'head': b'', 'offset': 0, 'events': {}}
+
+                if stat.st_size > entry['offset']:
+                    f.seek(entry['offset'])
+                    data = f.read(stat.st_size - entry['offset'])
+                    # A line without its newline is still being written
+                    end = data.rfind(b'\n') + 1
+                    for line in data[:end].splitlines():
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            # Torn line from a crashed writer
+                            continue
+                        if _is_event(event):
+                            entry['events'].setdefault(event['user_id'], []).append(event)
+                    entry['offset'] += end
+                    if len(entry['head']) < self.HEAD_BYTES:
+                        f.seek(0)
+                        entry['head'] = f.read(min(self.HEAD_BYTES, entry['offset']))
+            files[key] = entry
+            entries.append(entry)
+        # Segments no longer listed have been folded
+        self._files = files
+        return entries
+
+    def events(self, paths: Iterable[str], user_id: str) -> List[Dict[str, str]]:
+        """A user's events in the given segments, oldest first"""
+        with self._lock:
+            entries = self._refresh(paths)
+        return [event for entry in entries for event in entry['events'].get(user_id, ())]
+
+
+class ProgressLog:
+    """Append-only progress events on top of a UserRepository snapshot"""
+
+    def __init__(
+        self,
+        store: UserRepository,
+        log_dir: str = LOG_DIR,
+        fsync_interval: float = FSYNC_INTERVAL,
+        compact_interval: float = COMPACT_INTERVAL
+    ):
+        self.store = store
+        self.log_dir = log_dir
+        self.fsync_interval = fsync_interval
+        self.compact_interval = compact_interval
+        self.active_path = os.path.join(log_dir, ACTIVE_LOG)
+        os.makedirs(log_dir, exist_ok=True)
+
+        self._fd = None
+        self._fd_ino = None
+        self._fd_lock = threading.Lock()
+        self._unsynced = threading.Event()
+        self._tail = _TailIndex()
+        self._history_path = os.path.join(log_dir, HISTORY_DB)
+        self._local = threading.local()
+        self._init_history()
+        # Stand-ins for the file locks where fcntl is unavailable
+        self._local_locks = {
+            'append': threading.RLock(),
+            'fold': threading.RLock()
+        }
+        self._threads = []
+
+    # ---------- locking ----------
+
+    @contextmanager
+    def _file_lock(self, name: str, exclusive: bool):
+        """
+        Cross-process lock on <log_dir>/<name>.lock
+
+        A fresh descriptor per acquisition keeps threads of one process from
+        converting each other's flock.
+        """
+        if fcntl is None:
+            with self._local_locks[name]:
+                yield
+            return
+
+        fd = os.open(os.path.join(self.log_dir, f'{name}.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    # ---------- history index ----------
+
+    def _history_db(self) -> sqlite3.Connection:
+        """Per-thread connection to history.db in autocommit mode"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._history_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_history(self) -> None:
+        conn = self._history_db()
+        # Keyed by user first: one user's history is a range scan
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                user_id TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                skill_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                PRIMARY KEY (user_id, ts, skill_id, status)
+            ) WITHOUT ROWID
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS events_ts ON events (ts)')
+        # Archive segments whose events are in the events table
+        conn.execute('CREATE TABLE IF NOT EXISTS segments (name TEXT PRIMARY KEY)')
+
+    def _index_segment(self, name: str, events: List[Dict[str, str]]) -> None:
+        """Add a segment's events to the history (idempotent)"""
+        conn = self._history_db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT OR IGNORE INTO events (user_id, ts, skill_id, status) VALUES (?, ?, ?, ?)',
+                [(e['user_id'], e['ts'], e['skill_id'], e['status']) for e in events if _is_event(e)]
+            )
+            conn.execute('INSERT OR IGNORE INTO segments (name) VALUES (?)', (name,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _apply_retention(self) -> None:
+        """Drop archives beyond ARCHIVE_KEEP and history older than HISTORY_DAYS"""
+        conn = self._history_db()
+        indexed = {row['name'] for row in conn.execute('SELECT name FROM segments')}
+        archives = [p for p in self._segments(ARCHIVE_SUFFIX) if os.path.basename(p) in indexed]
+        for path in archives[:max(0, len(archives) - ARCHIVE_KEEP)]:
+            os.remove(path)
+            conn.execute('DELETE FROM segments WHERE name = ?', (os.path.basename(path),))
+        if HISTORY_DAYS > 0:
+            cutoff = (datetime.now() - timedelta(days=HISTORY_DAYS)).isoformat()
+            conn.execute('DELETE FROM events WHERE ts < ?', (cutoff,))
+
+    # ---------- writing ----------
+
+    def _active_fd(self) -> int:
+        """Descriptor for the active log, reopened after a rotation"""
+        try:
+            ino = os.stat(self.active_path).st_ino
+        except FileNotFoundError:
+            ino = None
+        if self._fd is None or ino != self._fd_ino:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+            self._fd = os.open(self.active_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._fd_ino = os.fstat(self._fd).st_ino
+        return self._fd
+
+    def append(self, user_id: str, skill_id: str, status: str) -> Dict[str, str]:
+        """
+        Record one progress change
+
+        The event is visible to readers immediately and reaches disk within
+        fsync_interval.
+        """
+        event = {
+            'user_id': user_id,
+            'skill_id': skill_id,
+            'status': status,
+            'ts': datetime.now().isoformat()
+        }
+        line = (json.dumps(event, separators=(',', ':')) + '\n').encode('utf-8')
+
+        with self._file_lock('append', exclusive=False):
+            with self._fd_lock:
+                # One write() on an O_APPEND descriptor: lines never interleave
+                os.write(self._active_fd(), line)
+        self._unsynced.set()
+        return event
+
+    def flush(self) -> None:
+        """fsync everything appended so far"""
+        self._unsynced.clear()
+        with self._fd_lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+
+    # ---------- reading ----------
+
+    def _segments(self, suffix: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.log_dir, f'progress-*{suffix}')))
+
+    def _read_events(self, path: str) -> Iterator[Dict[str, str]]:
+        try:
+            f = open(path, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Torn last line from a crashed writer
+                    continue
+
+    def _unfolded_events(self, user_id: str) -> List[Dict[str, str]]:
+        """A user's events not yet folded into snapshots, oldest first"""
+        return self._tail.events(self._segments(PENDING_SUFFIX) + [self.active_path], user_id)
+
+    def get_progress(self, user_id: str) -> Optional[Dict[str, str]]:
+        """Snapshot plus unfolded events, or None for an unknown user"""
+        with self._file_lock('fold', exclusive=False), \
+                self._file_lock('append', exclusive=False):
+            progress = self.store.get_progress(user_id)
+            tail = self._unfolded_events(user_id)
+
+        if progress is None and not tail:
+            return None
+        progress = dict(progress or {})
+        for event in tail:
+            progress[event['skill_id']] = event['status']
+        return progress
+
+    def history(self, user_id: str) -> List[Dict[str, str]]:
+        """A user's recorded progress events (within HISTORY_DAYS), oldest first"""
+        with self._file_lock('fold', exclusive=False), \
+                self._file_lock('append', exclusive=False):
+            folded = [
+                dict(row) for row in self._history_db().execute(
+                    'SELECT user_id, skill_id, status, ts FROM events '
+                    'WHERE user_id = ? ORDER BY ts', (user_id,)
+                )
+            ]
+            tail = self._unfolded_events(user_id)
+
+        # A segment indexed just before a crash is still pending; skip repeats
+        seen = {(e['ts'], e['skill_id'], e['status']) for e in folded}
+        return folded + [e for e in tail if (e['ts'], e['skill_id'], e['status']) not in seen]
+
+    # ---------- compaction ----------
+
+    def _rotate(self) -> bool:
+        """Turn the active log into a pending segment; False if it is empty"""
+        with self._file_lock('append', exclusive=True):
+            try:
+                if os.path.getsize(self.active_path) == 0:
+                    return False
+            except FileNotFoundError:
+                return False
+            self.flush()
+            pending = os.path.join(self.log_dir, f'progress-{time.time_ns():020d}{PENDING_SUFFIX}')
+            os.rename(self.active_path, pending)
+            return True
+
+    def compact(self) -> int:
+        """
+        Fold all unfolded events into the user store snapshots and the
+        history, then apply archive and history retention
+
+        Returns:
+            Number of events folded
+        """
+        self._rotate()
+        folded = 0
+        with self._file_lock('fold', exclusive=True):
+            # Segments are folded oldest first; a crash between folding and
+            # archiving only re-applies the same statuses on the next run
+            for path in self._segments(PENDING_SUFFIX):
+                events = [event for event in self._read_events(path) if _is_event(event)]
+                updates = {}
+                for event in events:
+                    updates.setdefault(event['user_id'], {})[event['skill_id']] = event['status']
+                    folded += 1
+                if updates:
+                    self.store.apply_progress(updates)
+                archive = path[:-len(PENDING_SUFFIX)] + ARCHIVE_SUFFIX
+                self._index_segment(os.path.basename(archive), events)
+                os.rename(path, archive)
+
+            # Archives written before history.db existed
+            indexed = {row['name'] for row in self._history_db().execute('SELECT name FROM segments')}
+            for path in self._segments(ARCHIVE_SUFFIX):
+                if os.path.basename(path) not in indexed:
+                    self._index_segment(os.path.basename(path), list(self._read_events(path)))
+
+            self._apply_retention()
+        return folded
+
+    def start(self) -> None:
+        """Start the background fsync and compaction threads"""
+        if self._threads:
+            return
+
+        def flusher():
+            while True:
+                self._unsynced.wait()
+                time.sleep(self.fsync_interval)
+                self.flush()
+
+        def compactor():
+            next_run = time.monotonic() + self.compact_interval
+            while True:
+                time.sleep(min(1.0, self.compact_interval))
+                try:
+                    size = os.path.getsize(self.active_path)
+                except FileNotFoundError:
+                    size = 0
+                if time.monotonic() >= next_run or size >= COMPACT_MAX_BYTES:
+                    try:
+                        self.compact()
+                    except Exception as e:
+                        print(f"⚠ Progress log compaction failed: {e}")
+                    next_run = time.monotonic() + self.compact_interval
+
+        for target, name in ((flusher, 'progress-fsync'), (compactor, 'progress-compactor')):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+
+_progress_log = None
+_progress_log_lock = threading.Lock()
+
+
+def get_progress_log(store: UserRepository) -> ProgressLog:
+    """Process-wide progress log over the given user store"""
+    global _progress_log
+    if _progress_log is None:
+        with _progress_log_lock:
+            if _progress_log is None:
+                _progress_log = ProgressLog(store)
+    return _progress_log
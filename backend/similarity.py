@@ -0,0 +1,228 @@
+"""
+SkillSync Backend - Skill Profile Similarity
+Top-k search for students with similar skill profiles (peer mentoring)
+
+Every user's skills are one row of a dense users x skills float32 matrix of
+level values (beginner=1 .. advanced=3). Cosine similarity compares the
+level vectors, Jaccard only which skills are present. A query only touches
+the columns of the skills the user has.
+
+The index is built from the user store on first use and then kept current
+row by row: saves in this process call upsert(), and saves made by other
+worker processes are pulled in by sync() through the store's updated_at
+timestamps.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import get_catalog
+from skill_profile import SKILL_LEVELS
+from user_store import UserRepository
+
+METRICS = ('cosine', 'jaccard')
+
+# How often a query checks the store for profiles saved by other processes
+SYNC_INTERVAL = float(os.environ.get('SKILLSYNC_SIMILARITY_SYNC_SECONDS', '1'))
+# Re-read window before the last sync, for writes that committed late
+SYNC_OVERLAP = timedelta(seconds=1)
+
+INITIAL_CAPACITY = 64
+
+
+class SimilarityIndex:
+    """Incrementally maintained skill vectors of every user"""
+
+    def __init__(self, store: UserRepository, sync_interval: float = SYNC_INTERVAL):
+        self.store = store
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._skill_ids = None
+        self._reset(())
+
+    def _reset(self, skill_ids: Tuple[str, ...]) -> None:
+        """Empty index over the given catalog skills"""
+        self._skill_ids = skill_ids
+        self._ordinal = {skill_id: i for i, skill_id in enumerate(skill_ids)}
+        self._matrix = np.zeros((INITIAL_CAPACITY, len(skill_ids)), dtype=np.float32)
+        self._norms = np.zeros(INITIAL_CAPACITY, dtype=np.float32)
+        self._sizes = np.zeros(INITIAL_CAPACITY, dtype=np.float32)
+        self._user_ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._versions: Dict[str, int] = {}
+        self._synced_until = None   # ISO timestamp of the last store sync
+        self._next_sync = 0.0
+
+    # ---------- writing ----------
+
+    def _encode(self, user_skills: object) -> np.ndarray:
+        """
+        Level vector of a skill map (unrecognised level names count as 1)
+
+        Stored profiles are not trusted: a skills value that is not a map
+        gives an empty row, and levels that are neither names nor finite
+        numbers are skipped.
+        """
+        vector = np.zeros(len(self._skill_ids), dtype=np.float32)
+        if not isinstance(user_skills, dict):
+            return vector
+        for skill_id, level in user_skills.items():
+            ordinal = self._ordinal.get(skill_id)
+            if ordinal is None:
+                continue
+            if isinstance(level, str):
+                level = SKILL_LEVELS.get(level.lower(), 1)
+            elif (isinstance(level, bool) or not isinstance(level, (int, float))
+                    or not math.isfinite(level)):
+                continue
+            vector[ordinal] = max(float(level), 1.0)
+        return vector
+
+    def _set_row(self, user_id: str, user_skills: Dict[str, str], version: int) -> None:
+        row = self._rows.get(user_id)
+        if row is None:
+            row = len(self._user_ids)
+            if row == len(self._matrix):
+                # Grow geometrically so n inserts cost O(n) copies
+                capacity = 2 * len(self._matrix)
+                self._matrix = np.resize(self._matrix, (capacity, len(self._skill_ids)))
+                self._norms = np.resize(self._norms, capacity)
+                self._sizes = np.resize(self._sizes, capacity)
+            self._user_ids.append(user_id)
+            self._rows[user_id] = row
+
+        vector = self._encode(user_skills)
+        self._matrix[row] = vector
+        self._norms[row] = np.sqrt(vector @ vector)
+        self._sizes[row] = np.count_nonzero(vector)
+        self._versions[user_id] = version
+
+    def upsert(self, user_id: str, user_skills: Dict[str, str], version: int) -> None:
+        """Update one user's row after a profile save"""
+        with self._lock:
+            # Before the first build the store is read in full anyway
+            if self._synced_until is None:
+                return
+            if version >= self._versions.get(user_id, 0):
+                self._set_row(user_id, user_skills, version)
+
+    def sync(self, force: bool = False) -> int:
+        """
+        Pull in profiles written since the last sync (by any process)
+
+        Rebuilds from scratch on the first call and when the catalog's skill
+        list changes.
+
+        Returns:
+            Number of rows updated
+        """
+        with self._lock:
+            skill_ids = get_catalog().snapshot().skill_ids
+            if skill_ids != self._skill_ids:
+                self._reset(skill_ids)
+            elif not force and time.monotonic() < self._next_sync:
+                return 0
+
+            started = datetime.now()
+            since = self._synced_until
+            if since is not None:
+                since = (datetime.fromisoformat(since) - SYNC_OVERLAP).isoformat()
+
+            updated = 0
+            for user in self.store.iter_updated_since(since):
+                version = int(user.get('version') or 0)
+                if user['user_id'] in self._versions and version <= self._versions[user['user_id']]:
+                    continue
+                try:
+                    skills = json.loads(user['skills']) if user['skills'] else {}
+                except (TypeError, ValueError):
+                    # Unreadable row: index it with no skills
+                    skills = {}
+                self._set_row(user['user_id'], skills, version)
+                updated += 1
+
+            self._synced_until = started.isoformat()
+            self._next_sync = time.monotonic() + self.sync_interval
+            return updated
+
+    # ---------- querying ----------
+
+    def query(
+        self,
+        user_id: str,
+        k: int = 5,
+        metric: str = 'cosine'
+    ) -> Optional[List[Dict]]:
+        """
+        The k users most similar to user_id, best first
+
+        Users sharing no skill with user_id are never returned.
+
+        Returns:
+            List of {'user_id', 'similarity', 'common_skills'}, or None if
+            user_id is not in the store
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of: {', '.join(METRICS)}")
+
+        self.sync()
+        with self._lock:
+            row = self._rows.get(user_id)
+            if row is None:
+                return None
+
+            vector = self._matrix[row]
+            columns = np.flatnonzero(vector)
+            count = len(self._user_ids)
+            if not len(columns) or count < 2 or k < 1:
+                return []
+
+            # Only the user's own skill columns can contribute
+            block = self._matrix[:count, columns]
+            if metric == 'cosine':
+                dots = block @ vector[columns]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    scores = dots / (self._norms[:count] * self._norms[row])
+            else:
+                shared = np.count_nonzero(block, axis=1).astype(np.float32)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    scores = shared / (self._sizes[:count] + len(columns) - shared)
+            scores = np.nan_to_num(scores, nan=0.0)
+            scores[row] = 0.0
+
+            k = min(k, count - 1)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+
+            results = []
+            for other in top.tolist():
+                if scores[other] <= 0:
+                    break
+                common = columns[self._matrix[other, columns] > 0]
+                results.append({
+                    'user_id': self._user_ids[other],
+                    'similarity': round(float(scores[other]), 4),
+                    'common_skills': [self._skill_ids[i] for i in common.tolist()]
+                })
+            return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index(store: UserRepository) -> SimilarityIndex:
+    """Process-wide similarity index over the given user store"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SimilarityIndex(store)
+    return _index
@@ -0,0 +1,153 @@
+"""
+SkillSync Backend - Skill Prerequisite Graph
+Prerequisite edges between catalog skills with a cached learning order
+
+A SkillGraph is built once per catalog snapshot from
+skill_prerequisites.csv and keeps:
+
+- order / rank: every skill in topological order (prerequisites first),
+  unrelated skills by category priority and then catalog order, so roadmaps
+  sort by a precomputed rank instead of comparing categories on every call
+- requires / required_by: transitive-closure bitmasks over catalog skill
+  ordinals (the ordinals skill_profile.skill_mask uses), so "does X need Y"
+  and "what does learning X lead to" are single bitwise operations
+
+Skills on a prerequisite cycle, and the skills that depend on them, have no
+valid order; they come after every other skill and are listed in cyclic.
+"""
+
+import heapq
+from typing import Iterable, List, Mapping, Sequence, Tuple
+
+from skill_profile import iter_bits, popcount, skill_mask
+
+
+class SkillGraph:
+    """Immutable prerequisite graph over the skills of one catalog snapshot"""
+
+    def __init__(
+        self,
+        skill_ids: Sequence[str],
+        prerequisites: Mapping[str, Sequence[str]],
+        priority: Mapping[str, int]
+    ):
+        """
+        Args:
+            skill_ids: Catalog skills in catalog order (their bit ordinals)
+            prerequisites: skill_id -> direct prerequisite IDs, catalog
+                           skills only
+            priority: skill_id -> category priority (lower is learned first)
+        """
+        self.skill_ids = tuple(skill_ids)
+        self.ordinal = {skill_id: i for i, skill_id in enumerate(self.skill_ids)}
+        count = len(self.skill_ids)
+
+        # Direct edges as bitmasks: prerequisites of i, skills that need i
+        direct = [0] * count
+        dependents = [0] * count
+        for skill_id, prerequisite_ids in prerequisites.items():
+            i = self.ordinal[skill_id]
+            for prerequisite_id in prerequisite_ids:
+                j = self.ordinal[prerequisite_id]
+                direct[i] |= 1 << j
+                dependents[j] |= 1 << i
+        self.direct = tuple(direct)
+        self.dependents = tuple(dependents)
+
+        order = self._topological_order(priority)
+        self.order = tuple(self.skill_ids[i] for i in order)
+        self.rank = {skill_id: position for position, skill_id in enumerate(self.order)}
+        self.requires = self._closure(order)
+
+        required_by = [0] * count
+        for i, mask in enumerate(self.requires):
+            for j in iter_bits(mask):
+                required_by[j] |= 1 << i
+        self.required_by = tuple(required_by)
+
+    def _topological_order(self, priority: Mapping[str, int]) -> List[int]:
+        """
+        Ordinals with prerequisites first; ties by priority, then ordinal
+
+        Also sets cyclic to the skills that could not be ordered.
+        """
+        waiting = [popcount(mask) for mask in self.direct]
+        ready = [
+            (priority[skill_id], i)
+            for i, skill_id in enumerate(self.skill_ids) if not waiting[i]
+        ]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, i = heapq.heappop(ready)
+            order.append(i)
+            for j in iter_bits(self.dependents[i]):
+                waiting[j] -= 1
+                if not waiting[j]:
+                    heapq.heappush(ready, (priority[self.skill_ids[j]], j))
+
+        # Whatever is still waiting sits on or behind a cycle
+        stuck = sorted(
+            (priority[skill_id], i)
+            for i, skill_id in enumerate(self.skill_ids) if waiting[i]
+        )
+        self.cyclic = frozenset(self.skill_ids[i] for _, i in stuck)
+        order.extend(i for _, i in stuck)
+        return order
+
+    def _closure(self, order: List[int]) -> Tuple[int, ...]:
+        """Transitive prerequisites of every skill, as bitmasks"""
+        requires = [0] * len(self.skill_ids)
+        for i in order:
+            mask = self.direct[i]
+            for j in iter_bits(self.direct[i]):
+                mask |= requires[j]
+            requires[i] = mask
+
+        # On a cycle one pass misses edges that point forward; iterate
+        cyclic = [self.ordinal[skill_id] for skill_id in self.cyclic]
+        changed = bool(cyclic)
+        while changed:
+            changed = False
+            for i in cyclic:
+                mask = requires[i]
+                for j in iter_bits(mask):
+                    mask |= requires[j]
+                if mask != requires[i]:
+                    requires[i] = mask
+                    changed = True
+        return tuple(requires)
+
+    def _ids(self, mask: int) -> List[str]:
+        """Skill IDs of a bitmask, in learning order"""
+        return sorted((self.skill_ids[i] for i in iter_bits(mask)), key=self.rank.__getitem__)
+
+    def sort(self, skill_ids: Iterable[str]) -> List[str]:
+        """Catalog skill IDs in learning order"""
+        return sorted(skill_ids, key=self.rank.__getitem__)
+
+    def prerequisites(self, skill_id: str, transitive: bool = True) -> List[str]:
+        """Skills to learn before skill_id, in learning order"""
+        i = self.ordinal[skill_id]
+        return self._ids(self.requires[i] if transitive else self.direct[i])
+
+    def unlocks(self, skill_id: str, transitive: bool = False) -> List[str]:
+        """Skills that list skill_id as a (direct or transitive) prerequisite"""
+        i = self.ordinal[skill_id]
+        return self._ids(self.required_by[i] if transitive else self.dependents[i])
+
+    def ready_after(self, skill_id: str, known_skills: Iterable[str]) -> List[str]:
+        """
+        Skills whose prerequisites are all met once skill_id is learned on
+        top of known_skills (skills already known are left out)
+        """
+        i = self.ordinal[skill_id]
+        known = skill_mask(known_skills, self.ordinal) | 1 << i
+        return [
+            dependent for dependent in self._ids(self.dependents[i] & ~known)
+            if self.direct[self.ordinal[dependent]] & ~known == 0
+        ]
+
+    def depends_on(self, skill_id: str, prerequisite_id: str) -> bool:
+        """True if prerequisite_id must be learned (at some depth) before skill_id"""
+        return bool(self.requires[self.ordinal[skill_id]] >> self.ordinal[prerequisite_id] & 1)
@@ -0,0 +1,139 @@
+"""
+SkillSync Backend - Bitset Skill Profiles
+Compact skill sets indexed by catalog skill ordinal
+
+A profile holds one Python int bitmask per skill level plus a packed uint8
+level array, so set questions (which required skills are proficient,
+missing, to improve) are a few bitwise operations on arbitrarily wide ints
+instead of a dict lookup per skill.
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+# Level values and their canonical names
+SKILL_LEVELS = {
+    'beginner': 1,
+    'intermediate': 2,
+    'advanced': 3
+}
+LEVEL_NAMES = {value: name for name, value in SKILL_LEVELS.items()}
+MAX_LEVEL = max(LEVEL_NAMES)
+
+
+def valid_level(level: object) -> bool:
+    """True for a level name (any string) or an integer level 0..MAX_LEVEL"""
+    if isinstance(level, str):
+        return True
+    return isinstance(level, int) and not isinstance(level, bool) and 0 <= level <= MAX_LEVEL
+
+
+def parse_level(level: object) -> int:
+    """
+    Level value of a user-supplied level: names case-insensitively, integers
+    0..MAX_LEVEL as they are, anything else (unknown names, floats, bools,
+    out-of-range integers) as 0
+    """
+    if isinstance(level, str):
+        return SKILL_LEVELS.get(level.lower(), 0)
+    return level if valid_level(level) else 0
+
+
+if hasattr(int, 'bit_count'):  # Python 3.10+
+    def popcount(mask: int) -> int:
+        """Number of set bits"""
+        return mask.bit_count()
+else:
+    def popcount(mask: int) -> int:
+        """Number of set bits"""
+        return bin(mask).count('1')
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Ordinals of the set bits, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def skill_mask(skill_ids, skill_ordinal: Dict[str, int]) -> int:
+    """Bitmask of the given skill IDs (IDs without an ordinal are ignored)"""
+    mask = 0
+    for skill_id in skill_ids:
+        ordinal = skill_ordinal.get(skill_id)
+        if ordinal is not None:
+            mask |= 1 << ordinal
+    return mask
+
+
+class SkillProfile:
+    """A user's skills as bitmasks over catalog skill ordinals"""
+
+    __slots__ = ('skills', 'level_masks', 'levels', 'raw_levels')
+
+    def __init__(
+        self,
+        skills: int,
+        level_masks: List[int],
+        levels: bytearray,
+        raw_levels: Dict[int, object]
+    ):
+        self.skills = skills              # every skill the user lists
+        self.level_masks = level_masks    # [level value] -> skills at that level
+        self.levels = levels              # ordinal -> level value + 1, 0 = absent
+        self.raw_levels = raw_levels      # ordinal -> level as given, if not canonical
+
+    @classmethod
+    def encode(
+        cls,
+        user_skills: Dict[str, object],
+        skill_ordinal: Dict[str, int]
+    ) -> 'SkillProfile':
+        """
+        Encode a skill_id -> level dict
+
+        Levels are read with parse_level, so anything unrecognised counts as
+        level 0. Skills outside the catalog are dropped. skill_ordinal must
+        number the catalog skills 0..n-1.
+        """
+        level_masks = [0] * (MAX_LEVEL + 1)
+        levels = bytearray(len(skill_ordinal))
+        raw_levels = {}
+
+        for skill_id, level in user_skills.items():
+            ordinal = skill_ordinal.get(skill_id)
+            if ordinal is None:
+                continue
+            value = parse_level(level)
+            if isinstance(level, str):
+                if not value:
+                    raw_levels[ordinal] = level.lower()
+            else:
+                raw_levels[ordinal] = level
+
+            level_masks[value] |= 1 << ordinal
+            levels[ordinal] = value + 1
+
+        skills = 0
+        for level_mask in level_masks:
+            skills |= level_mask
+        return cls(skills, level_masks, levels, raw_levels)
+
+    def at_least(self, value: int) -> int:
+        """Bitmask of skills at level value or above"""
+        mask = 0
+        for level_mask in self.level_masks[value:]:
+            mask |= level_mask
+        return mask
+
+    def level_value(self, ordinal: int) -> Optional[int]:
+        """Level value of a skill, or None if the user lacks it"""
+        code = self.levels[ordinal]
+        return code - 1 if code else None
+
+    def level_name(self, ordinal: int) -> Optional[object]:
+        """Level of a skill as the user gave it (lowercased), or None"""
+        code = self.levels[ordinal]
+        if not code:
+            return None
+        return self.raw_levels.get(ordinal, LEVEL_NAMES.get(code - 1))
@@ -0,0 +1,112 @@
+"""
+SkillSync Backend - Pre-serialized Catalog Responses
+JSON bodies for the read-only catalog endpoints, serialized once per catalog
+version and served with strong ETags, Cache-Control and precompressed
+gzip/brotli variants
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from flask import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Cache-Control max-age for catalog responses (seconds)
+CATALOG_MAX_AGE = int(os.environ.get('SKILLSYNC_CATALOG_MAX_AGE', '300'))
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+
+class SerializedResponse(NamedTuple):
+    """One response body in every encoding, with an ETag per encoding"""
+    variants: Dict[str, bytes]  # content-encoding ('identity', 'gzip', 'br') -> body
+    etags: Dict[str, str]       # content-encoding -> unquoted strong ETag
+
+
+def serialize(body: bytes) -> SerializedResponse:
+    """Hash and precompress a JSON body"""
+    variants = {'identity': body}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            variants['br'] = brotli.compress(body)
+
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    etags = {
+        encoding: digest if encoding == 'identity' else f"{digest}-{encoding}"
+        for encoding in variants
+    }
+    return SerializedResponse(variants, etags)
+
+
+class StaticResponseCache:
+    """Serialized responses for the current catalog version"""
+
+    def __init__(self, dumps: Callable[[Any], bytes]):
+        self._dumps = dumps
+        # (catalog version, responses of that version), replaced as a whole so
+        # a reader never pairs one version with another version's entries
+        self._current: Tuple[Optional[str], Dict[Hashable, SerializedResponse]] = (None, {})
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        version: str,
+        key: Hashable,
+        build: Callable[[], Any]
+    ) -> SerializedResponse:
+        """Cached response for key, calling build() for the payload on a miss"""
+        current_version, entries = self._current
+        if current_version != version:
+            with self._lock:
+                current_version, entries = self._current
+                if current_version != version:
+                    # New catalog: drop every response of the old version
+                    entries = {}
+                    self._current = (version, entries)
+
+        entry = entries.get(key)
+        if entry is None:
+            entry = serialize(self._dumps(build()))
+            entries[key] = entry
+        return entry
+
+
+def _choose_encoding(request: Request, entry: SerializedResponse) -> str:
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in entry.variants and accepted[encoding]:
+            return encoding
+    return 'identity'
+
+
+def make_static_response(
+    request: Request,
+    entry: SerializedResponse,
+    max_age: int = CATALOG_MAX_AGE
+) -> Response:
+    """Response for entry, or 304 Not Modified if the client's ETag matches"""
+    encoding = _choose_encoding(request, entry)
+    etag = entry.etags[encoding]
+
+    matched = [tag for tag in entry.etags.values() if request.if_none_match.contains(tag)]
+    if matched:
+        response = Response(status=304)
+        etag = etag if etag in matched else matched[0]
+    else:
+        response = Response(entry.variants[encoding], mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
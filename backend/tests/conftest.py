@@ -0,0 +1,50 @@
+"""
+Shared fixtures for the backend tests
+
+The user store and progress log are pointed at a temporary directory before
+app is imported (it creates its singletons at import), so the tests never
+touch data/users.db or data/progress. The catalog is the bundled data/ one.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import progress_log
+import user_store
+
+_DATA_DIR = tempfile.mkdtemp(prefix='skillsync-tests-')
+_store = user_store.SqliteUserRepository(os.path.join(_DATA_DIR, 'users.db'), csv_path=None)
+user_store._store = _store
+progress_log._progress_log = progress_log.ProgressLog(
+    _store, log_dir=os.path.join(_DATA_DIR, 'progress')
+)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app as flask_app
+    flask_app.testing = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def store():
+    return _store
+
+
+@pytest.fixture(scope='session')
+def analyzer():
+    from analyzer import get_analyzer
+    return get_analyzer()
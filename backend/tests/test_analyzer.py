@@ -0,0 +1,50 @@
+"""Gap analysis: the batch matrix path agrees with analyze_gap"""
+
+import pytest
+
+from skill_profile import SkillProfile, parse_level
+
+PROFILES = [
+    {},
+    {'python': 'intermediate', 'sql': 'beginner'},
+    {'python': 'Advanced', 'SQL': 'advanced', 'html': 'BEGINNER'},
+    {'python': 3, 'sql': 2, 'pandas': 1, 'numpy': 0},
+    {'python': 'guru', 'git': 'expert', 'css': 'intermediate'},
+    # Read as level 0 by both paths (the API rejects these with 400)
+    {'python': 5, 'sql': 2.0, 'pandas': True, 'numpy': None, 'git': [1]},
+    {'not_a_skill': 'advanced', 'machine_learning': 'intermediate'},
+]
+
+
+def test_batch_matches_single_analysis(analyzer):
+    result = analyzer.analyze_gap_batch(PROFILES)
+    for i, user_skills in enumerate(PROFILES):
+        for j, role_id in enumerate(result['role_ids']):
+            gap = analyzer.analyze_gap(user_skills, role_id, scoring_mode='rule')
+            assert result['match_percentage'][i][j] == gap['match_percentage'], (user_skills, role_id)
+            assert result['proficient'][i][j] == len(gap['proficient_skills'])
+            assert result['to_improve'][i][j] == len(gap['skills_to_improve'])
+            assert result['missing'][i][j] == len(gap['missing_skills'])
+
+
+def test_batch_unknown_role(analyzer):
+    with pytest.raises(KeyError):
+        analyzer.analyze_gap_batch(PROFILES[:1], ['no_such_role'])
+
+
+@pytest.mark.parametrize('level, value', [
+    ('beginner', 1), ('Intermediate', 2), ('ADVANCED', 3), ('guru', 0),
+    (0, 0), (3, 3), (4, 0), (-1, 0), (300, 0),
+    (2.0, 0), (True, 0), (None, 0), ([1], 0), ({}, 0),
+])
+def test_parse_level(level, value):
+    assert parse_level(level) == value
+
+
+def test_profile_and_matrix_read_levels_alike(analyzer):
+    user_skills = {'python': 300, 'sql': None, 'pandas': 'intermediate', 'numpy': 1}
+    profile = SkillProfile.encode(user_skills, analyzer._skill_ordinal)
+    row = analyzer.encode_profiles([user_skills])[0]
+    for skill_id in user_skills:
+        ordinal = analyzer._skill_ordinal[skill_id]
+        assert profile.level_value(ordinal) == row[ordinal]
@@ -0,0 +1,87 @@
+"""Request validation and catalog caching of the HTTP API"""
+
+import pytest
+
+INVALID_LEVELS = [2.0, True, None, [1], {'level': 1}, 5, -1]
+
+
+@pytest.mark.parametrize('level', INVALID_LEVELS)
+def test_analyze_gap_rejects_invalid_levels(client, level):
+    response = client.post('/api/analyze-gap', json={
+        'user_skills': {'python': level}, 'target_role': 'data_analyst'
+    })
+    assert response.status_code == 400
+    assert 'python' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('level', INVALID_LEVELS)
+def test_batch_rejects_invalid_levels(client, level):
+    response = client.post('/api/analyze-gap/batch', json={'users': [
+        {'user_id': 'u1', 'user_skills': {'python': 'beginner'}},
+        {'user_id': 'u2', 'user_skills': {'sql': level}},
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('User 1:')
+
+
+@pytest.mark.parametrize('level', INVALID_LEVELS)
+def test_recommend_roles_rejects_invalid_levels(client, level):
+    response = client.post('/api/recommend-roles', json={'user_skills': {'python': level}})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('level', ['intermediate', 'Advanced', 'guru', 0, 3])
+def test_valid_levels_are_accepted(client, level):
+    response = client.post('/api/analyze-gap', json={
+        'user_skills': {'python': level}, 'target_role': 'data_analyst'
+    })
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('target_roles', ['data_analyst', ['data_analyst', 3], {'r': 1}])
+def test_batch_rejects_malformed_target_roles(client, target_roles):
+    response = client.post('/api/analyze-gap/batch', json={
+        'users': [{'user_id': 'u1', 'user_skills': {}}], 'target_roles': target_roles
+    })
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('body', [
+    {'weeks': 1e308},
+    {'weeks': 0},
+    {'weeks': 'NaN'},
+    {'weeks': 4, 'hours_per_week': 1e308},
+    {'weeks': 4, 'user_skills': ['python'], 'target_role': 'data_analyst'},
+    {'weeks': 4, 'missing_skills': 'python'},
+    {'weeks': 4, 'skills_to_improve': ['git']},
+    {'weeks': 4, 'missing_skills': [f's{i}' for i in range(101)]},
+    {'deadline': '2999-01-01'},
+])
+def test_optimized_roadmap_rejects_bad_input(client, body):
+    response = client.post('/api/roadmap', json={'mode': 'optimize', 'hours_per_week': 8, **body})
+    assert response.status_code == 400
+
+
+def test_optimized_roadmap_fits_budget(client):
+    response = client.post('/api/roadmap', json={
+        'mode': 'optimize', 'hours_per_week': 5, 'weeks': 4,
+        'user_skills': {'python': 'beginner'}, 'target_role': 'data_scientist'
+    })
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['budget_hours'] == 20
+    assert data['total_estimated_hours'] <= 20
+
+
+def test_catalog_etag_revalidation(client):
+    first = client.get('/api/skills')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    cached = client.get('/api/skills', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
+
+    stale = client.get('/api/skills', headers={'If-None-Match': '"stale"'})
+    assert stale.status_code == 200
+    assert stale.get_data() == first.get_data()
@@ -0,0 +1,135 @@
+"""Roadmap optimizer: optimal on small inputs, feasible and fast on large ones"""
+
+import itertools
+import random
+import time
+
+import pandas as pd
+import pytest
+
+import learning_path
+from catalog import CatalogSnapshot
+from learning_path import build_items, choose
+
+
+def make_snapshot(n_skills, edges, seed=1):
+    """n_skills skills with a beginner and an intermediate resource each"""
+    rng = random.Random(seed)
+    skills = pd.DataFrame({
+        'skill_id': [f's{i}' for i in range(n_skills)],
+        'skill_name': [f'Skill {i}' for i in range(n_skills)],
+        'category': ['Programming'] * n_skills,
+        'description': [''] * n_skills,
+    })
+    roles = pd.DataFrame({
+        'role_id': ['r'], 'role_name': ['Role'], 'description': [''],
+        'required_skills': ['s0'], 'icon': ['x'],
+    })
+    resources = pd.DataFrame([
+        {'skill_id': f's{i}', 'resource_name': f's{i} {difficulty}', 'resource_type': 'Video',
+         'url': f'https://example.com/s{i}/{difficulty}', 'difficulty': difficulty,
+         'estimated_hours': rng.randint(1, 20)}
+        for i in range(n_skills) for difficulty in ('beginner', 'intermediate')
+    ])
+    prerequisites = pd.DataFrame(edges, columns=['skill_id', 'prerequisite_id'])
+    return CatalogSnapshot.from_frames(skills, roles, resources, prerequisites)
+
+
+def shared_prerequisites(shared, missing, seed=2):
+    """missing gap skills, each needing 3 of shared prerequisite skills"""
+    rng = random.Random(seed)
+    edges = [
+        (f's{shared + m}', f's{p}')
+        for m in range(missing) for p in rng.sample(range(shared), 3)
+    ]
+    snapshot = make_snapshot(shared + missing, edges)
+    items, _ = build_items(snapshot, [f's{shared + m}' for m in range(missing)], [], set())
+    return items
+
+
+def assert_feasible(items, chosen, budget_hours):
+    selected = dict(chosen)
+    assert sum(option.hours for option in selected.values()) <= budget_hours
+    for i in selected:
+        assert not items[i].blocked
+        assert all(p in selected for p in items[i].prerequisites), items[i].skill_id
+
+
+def brute_force(items, budget_hours):
+    """Most points, then fewest hours, over every assignment of options"""
+    best = (0, 0)
+    for picks in itertools.product(*[range(-1, len(item.options)) for item in items]):
+        if any(k >= 0 and items[i].blocked for i, k in enumerate(picks)):
+            continue
+        if any(k >= 0 and any(picks[p] < 0 for p in items[i].prerequisites)
+               for i, k in enumerate(picks)):
+            continue
+        hours = sum(items[i].options[k].hours for i, k in enumerate(picks) if k >= 0)
+        if hours > budget_hours:
+            continue
+        points = sum(items[i].options[k].points for i, k in enumerate(picks) if k >= 0)
+        best = max(best, (points, -hours))
+    return best
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_small_plans_are_optimal(seed):
+    rng = random.Random(seed)
+    edges = [(f's{i}', f's{p}') for i in range(1, 6) for p in rng.sample(range(i), min(i, rng.randint(0, 2)))]
+    snapshot = make_snapshot(6, edges, seed=seed)
+    missing = [f's{i}' for i in rng.sample(range(6), 3)]
+    items, _ = build_items(snapshot, missing, [], set())
+    budget_hours = rng.randint(5, 60)
+
+    chosen = choose(items, budget_hours)
+    assert_feasible(items, chosen, budget_hours)
+    points = sum(option.points for _, option in chosen)
+    hours = sum(option.hours for _, option in chosen)
+    assert (points, -hours) == brute_force(items, budget_hours)
+
+
+def test_large_plans_fit_budget_and_prerequisites():
+    items = shared_prerequisites(20, 40)
+    chosen = choose(items, 120)
+    assert_feasible(items, chosen, 120)
+    assert sum(option.points for _, option in chosen) > 0
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_grouped_knapsack_is_feasible(seed):
+    rng = random.Random(seed)
+    items = shared_prerequisites(rng.randint(3, 8), rng.randint(3, 10), seed=seed)
+    budget_hours = rng.randint(10, 150)
+    assert_feasible(items, learning_path._choose_grouped(items, budget_hours), budget_hours)
+
+
+def test_prerequisite_heavy_plans_are_fast():
+    items = shared_prerequisites(20, 40)
+    started = time.perf_counter()
+    choose(items, 120)
+    assert time.perf_counter() - started < 0.5
+
+    # A budget large enough to take every option must not blow up either
+    items = shared_prerequisites(40, 100)
+    started = time.perf_counter()
+    chosen = choose(items, 50000)
+    assert time.perf_counter() - started < 2.0
+    assert_feasible(items, chosen, 50000)
+
+
+def test_blocked_skill_is_never_scheduled():
+    # s1 and s2 need each other, s3 needs s1
+    snapshot = make_snapshot(4, [('s1', 's2'), ('s2', 's1'), ('s3', 's1')])
+    items, _ = build_items(snapshot, ['s1', 's3', 's0'], [], set())
+    chosen = choose(items, 1000)
+    scheduled = {items[i].skill_id for i, _ in chosen}
+    assert 's0' in scheduled
+    assert not scheduled & {'s1', 's2', 's3'}
+
+
+def test_known_prerequisites_are_not_scheduled():
+    snapshot = make_snapshot(3, [('s2', 's0'), ('s2', 's1')])
+    items, _ = build_items(snapshot, ['s2'], [], {'s0'})
+    assert [item.skill_id for item in items] == ['s1', 's2']
+    assert items[0].kind == 'prerequisite'
+    assert all(option.points == 0 for option in items[0].options)
@@ -0,0 +1,108 @@
+"""User store versions, NDJSON import/export and the progress log"""
+
+import io
+import json
+
+import pytest
+
+import progress_log
+from user_store import VersionConflict
+
+PROFILE = {'name': 'Ada', 'skills': {'python': 'advanced'}, 'selected_role': 'data_scientist'}
+
+
+def test_save_increments_version(client):
+    first = client.post('/api/users/v1/save', json=PROFILE)
+    assert first.status_code == 200
+    assert first.get_json()['version'] == 1
+
+    second = client.post('/api/users/v1/save', json={**PROFILE, 'version': 1})
+    assert second.status_code == 200
+    assert second.get_json()['version'] == 2
+
+
+def test_stale_version_conflicts(client, store):
+    client.post('/api/users/v2/save', json=PROFILE)
+    client.post('/api/users/v2/save', json={**PROFILE, 'name': 'Grace', 'version': 1})
+
+    response = client.post('/api/users/v2/save', json={**PROFILE, 'name': 'Lost', 'version': 1})
+    assert response.status_code == 409
+    assert response.get_json()['current_version'] == 2
+    assert store.get_user('v2')['name'] == 'Grace'
+
+
+def test_version_zero_only_creates(client):
+    assert client.post('/api/users/v3/save', json={**PROFILE, 'version': 0}).status_code == 200
+    response = client.post('/api/users/v3/save', json={**PROFILE, 'version': 0})
+    assert response.status_code == 409
+    assert response.get_json()['current_version'] == 1
+
+
+def test_store_raises_version_conflict(store):
+    store.save_profile('v4', {'name': 'Ada'})
+    with pytest.raises(VersionConflict) as conflict:
+        store.save_profile('v4', {'name': 'Grace'}, expected_version=7)
+    assert conflict.value.current == 1
+
+
+@pytest.mark.parametrize('body', [
+    {'version': '1'},
+    {'skills': {'python': 'guru'}},
+    {'skills': {'python': 2}},
+])
+def test_save_rejects_bad_input(client, body):
+    response = client.post('/api/users/v5/save', json={**PROFILE, **body})
+    assert response.status_code == 400
+
+
+def test_ndjson_import_reports_bad_lines(client, store):
+    body = '\n'.join([
+        json.dumps({'user_id': 'i1', 'name': 'One', 'skills': {'sql': 'beginner'}}),
+        '{not json',
+        json.dumps({'user_id': 'i2', 'skills': {'sql': 'guru'}}),
+        json.dumps({'user_id': 'i3', 'name': 'Three'}),
+    ])
+    response = client.post('/api/users/import', data=body)
+    report = response.get_json()['data']
+    assert report['imported'] == 2
+    assert [error['line'] for error in report['errors']] == [2, 3]
+    assert json.loads(store.get_user('i1')['skills']) == {'sql': 'beginner'}
+    assert store.get_user('i2') is None
+
+    exported = [json.loads(line) for line in client.get('/api/users/export').get_data().splitlines()]
+    assert {'i1', 'i3'} <= {user['user_id'] for user in exported}
+
+
+def test_empty_import_is_rejected(client):
+    assert client.post('/api/users/import', data=io.BytesIO(b'')).status_code == 400
+
+
+def test_progress_survives_compaction(tmp_path, store):
+    log = progress_log.ProgressLog(store, log_dir=str(tmp_path))
+    store.save_profile('p1', {'name': 'Ada'})
+    log.append('p1', 'python', 'in_progress')
+    log.append('p1', 'python', 'completed')
+    log.append('p1', 'sql', 'in_progress')
+    before = log.get_progress('p1')
+
+    assert log.compact() == 3
+    assert log.compact() == 0
+    assert log.get_progress('p1') == before == {'python': 'completed', 'sql': 'in_progress'}
+    assert json.loads(store.get_user('p1')['progress']) == before
+
+    log.append('p1', 'sql', 'completed')
+    assert log.get_progress('p1')['sql'] == 'completed'
+    # Events of one microsecond may come back in either order
+    statuses = sorted((event['skill_id'], event['status']) for event in log.history('p1'))
+    assert statuses == [
+        ('python', 'completed'), ('python', 'in_progress'),
+        ('sql', 'completed'), ('sql', 'in_progress'),
+    ]
+
+
+def test_progress_endpoints(client):
+    assert client.get('/api/users/nobody/progress').status_code == 404
+    client.post('/api/users/p2/progress', json={'skill_id': 'git', 'status': 'completed'})
+    response = client.get('/api/users/p2/progress')
+    assert response.get_json()['data']['progress'] == {'git': 'completed'}
+    assert client.post('/api/users/p2/progress', json={'skill_id': 'git', 'status': 'done'}).status_code == 400
@@ -0,0 +1,554 @@
+"""
+SkillSync Backend - User Store
+Pluggable repository for user profiles and learning progress
+
+SqliteUserRepository (default) keeps one row per user in data/users.db with
+WAL journaling, so single-user reads and writes cost the same no matter how
+many users exist. CsvUserRepository is the original users.csv layout, where
+every write rewrites the whole file. Pick the backend with
+SKILLSYNC_USER_STORE=sqlite|csv.
+
+Every record carries a version that each write increments. Writes are
+compare-and-swap on that version, so concurrent writers in different
+processes never overwrite each other; callers can pass the version they read
+to get a VersionConflict instead of a lost update. Within a process, writers
+to the same user queue on a per-user lock stripe while writers to different
+users run in parallel.
+"""
+
+import csv
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from metrics import timed
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking is only process-local
+    fcntl = None
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+USERS_FILE = os.path.join(DATA_DIR, 'users.csv')
+USERS_DB = os.path.join(DATA_DIR, 'users.db')
+
+USER_COLUMNS = [
+    'user_id', 'name', 'email', 'degree', 'branch', 'semester',
+    'interests', 'skills', 'selected_role', 'progress', 'created_at', 'version'
+]
+
+# Profile fields written by save_profile (everything except progress)
+PROFILE_COLUMNS = [
+    'name', 'email', 'degree', 'branch', 'semester',
+    'interests', 'skills', 'selected_role'
+]
+
+# Number of per-user lock stripes and compare-and-swap attempts per write
+LOCK_STRIPES = 64
+MAX_CAS_RETRIES = 20
+
+
+class VersionConflict(Exception):
+    """A write expected a user version that is no longer current"""
+
+    def __init__(self, user_id: str, expected: Optional[int], current: Optional[int]):
+        super().__init__(
+            f"User {user_id} is at version {current}, expected {expected}"
+        )
+        self.user_id = user_id
+        self.expected = expected
+        self.current = current
+
+
+class _StripedLock:
+    """Fixed pool of locks; a user always maps to the same one"""
+
+    def __init__(self, stripes: int = LOCK_STRIPES):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __call__(self, user_id: str) -> threading.Lock:
+        return self._locks[zlib.crc32(user_id.encode('utf-8')) % len(self._locks)]
+
+
+def _empty_user(user_id: str) -> Dict[str, str]:
+    """Row for a user that only exists because progress was recorded"""
+    return {
+        'user_id': user_id,
+        'name': '',
+        'email': '',
+        'degree': '',
+        'branch': '',
+        'semester': '',
+        'interests': '[]',
+        'skills': '{}',
+        'selected_role': '',
+        'progress': '{}',
+        'created_at': datetime.now().isoformat(),
+        'version': 0
+    }
+
+
+class UserRepository:
+    """
+    Storage interface for user records
+
+    Records are dicts keyed by USER_COLUMNS; interests, skills and progress
+    hold JSON text.
+    """
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, str]]:
+        """Full record for a user, or None"""
+        raise NotImplementedError
+
+    def save_profile(
+        self,
+        user_id: str,
+        profile: Dict[str, str],
+        expected_version: Optional[int] = None
+    ) -> int:
+        """
+        Create the user or update its PROFILE_COLUMNS, keeping progress
+        
+        Args:
+            expected_version: If given, only write when the stored version
+                              matches (0 = user must not exist yet)
+        
+        Returns:
+            The record's new version
+        
+        Raises:
+            VersionConflict: expected_version is stale
+        """
+        raise NotImplementedError
+
+    def upsert_profiles(self, profiles: List[Tuple[str, Dict[str, str]]]) -> None:
+        """
+        save_profile for many users, as one transaction where the backend
+        supports it (all or nothing)
+        """
+        for user_id, profile in profiles:
+            self.save_profile(user_id, profile)
+
+    def get_progress(self, user_id: str) -> Optional[Dict[str, str]]:
+        """skill_id -> status map, or None if the user does not exist"""
+        user = self.get_user(user_id)
+        if user is None:
+            return None
+        return json.loads(user['progress']) if user['progress'] else {}
+
+    def get_skills(self, user_id: str) -> Optional[Dict[str, str]]:
+        """skill_id -> level map, or None if the user does not exist"""
+        user = self.get_user(user_id)
+        if user is None:
+            return None
+        return json.loads(user['skills']) if user['skills'] else {}
+
+    def set_progress(self, user_id: str, skill_id: str, status: str) -> None:
+        """Record one skill status, creating the user if needed"""
+        raise NotImplementedError
+
+    def apply_progress(self, updates: Dict[str, Dict[str, str]]) -> None:
+        """Merge {user_id: {skill_id: status}} into stored progress"""
+        for user_id, statuses in updates.items():
+            for skill_id, status in statuses.items():
+                self.set_progress(user_id, skill_id, status)
+
+    def iter_users(self) -> Iterator[Dict[str, str]]:
+        """Every user record"""
+        raise NotImplementedError
+
+    def iter_updated_since(self, since: Optional[str]) -> Iterator[Dict[str, str]]:
+        """
+        Records written at or after the ISO timestamp since (None = all)
+
+        May also return older records; callers compare versions.
+        """
+        return self.iter_users()
+
+
+class CsvUserRepository(UserRepository):
+    """
+    Original users.csv store; every write rewrites the whole file
+
+    Writes hold an exclusive lock on users.csv.lock, so they are safe across
+    worker processes but never run in parallel.
+    """
+
+    def __init__(self, path: str = USERS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, newline='', encoding='utf-8') as f:
+            users = {}
+            for row in csv.DictReader(f):
+                row['version'] = int(row.get('version') or 0)
+                users[row['user_id']] = row
+            return users
+
+    def _save(self, users: Dict[str, Dict[str, str]]) -> None:
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=USER_COLUMNS)
+            writer.writeheader()
+            writer.writerows(users.values())
+        os.replace(tmp_path, self.path)
+
+    @timed('user_store_read')
+    def get_user(self, user_id):
+        return self._load().get(user_id)
+
+    @timed('user_store_write')
+    def save_profile(self, user_id, profile, expected_version=None):
+        with self._write_lock():
+            users = self._load()
+            user = users.get(user_id) or _empty_user(user_id)
+            if expected_version is not None and user['version'] != expected_version:
+                raise VersionConflict(user_id, expected_version, user['version'])
+            user.update({key: profile.get(key, '') for key in PROFILE_COLUMNS})
+            user['version'] += 1
+            users[user_id] = user
+            self._save(users)
+            return user['version']
+
+    @timed('user_store_write')
+    def upsert_profiles(self, profiles):
+        # One read and one rewrite of the file for the whole chunk
+        with self._write_lock():
+            users = self._load()
+            for user_id, profile in profiles:
+                user = users.get(user_id) or _empty_user(user_id)
+                user.update({key: profile.get(key, '') for key in PROFILE_COLUMNS})
+                user['version'] += 1
+                users[user_id] = user
+            self._save(users)
+
+    def set_progress(self, user_id, skill_id, status):
+        self.apply_progress({user_id: {skill_id: status}})
+
+    @timed('user_store_write')
+    def apply_progress(self, updates):
+        with self._write_lock():
+            users = self._load()
+            for user_id, statuses in updates.items():
+                user = users.get(user_id) or _empty_user(user_id)
+                progress = json.loads(user['progress']) if user['progress'] else {}
+                progress.update(statuses)
+                user['progress'] = json.dumps(progress)
+                user['version'] += 1
+                users[user_id] = user
+            self._save(users)
+
+    def iter_users(self):
+        return iter(list(self._load().values()))
+
+    def iter_updated_since(self, since):
+        # No per-row timestamps: everything if the file changed since then
+        try:
+            modified = datetime.fromtimestamp(os.path.getmtime(self.path)).isoformat()
+        except FileNotFoundError:
+            return iter(())
+        if since is not None and modified < since:
+            return iter(())
+        return self.iter_users()
+
+
+class SqliteUserRepository(UserRepository):
+    """One row per user in SQLite (WAL mode, primary key on user_id)"""
+
+    def __init__(self, path: str = USERS_DB, csv_path: Optional[str] = USERS_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._user_lock = _StripedLock()
+        self._init_schema()
+        if csv_path:
+            self.migrate_csv(csv_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Per-thread connection in autocommit mode"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                user_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL DEFAULT '',
+                email TEXT NOT NULL DEFAULT '',
+                degree TEXT NOT NULL DEFAULT '',
+                branch TEXT NOT NULL DEFAULT '',
+                semester TEXT NOT NULL DEFAULT '',
+                interests TEXT NOT NULL DEFAULT '[]',
+                skills TEXT NOT NULL DEFAULT '{}',
+                selected_role TEXT NOT NULL DEFAULT '',
+                progress TEXT NOT NULL DEFAULT '{}',
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(users)')}
+        if 'version' not in columns:
+            # Databases created before records were versioned
+            conn.execute('ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        conn.execute('CREATE INDEX IF NOT EXISTS users_updated_at ON users (updated_at)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS store_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+
+    def migrate_csv(self, csv_path: str) -> int:
+        """
+        One-shot import of an existing users.csv
+
+        Runs once per database (recorded in store_meta); users already in the
+        database win over CSV rows. The CSV file is left in place.
+
+        Returns:
+            Number of users imported
+        """
+        conn = self._connect()
+        if self._csv_migrated(conn):
+            return 0
+
+        imported = 0
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Another worker may have migrated while we waited for the lock
+            if self._csv_migrated(conn):
+                conn.execute('COMMIT')
+                return 0
+            if os.path.exists(csv_path):
+                now = datetime.now().isoformat()
+                with open(csv_path, newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        if not row.get('user_id'):
+                            continue
+                        record = _empty_user(row['user_id'])
+                        record.update({k: v for k, v in row.items() if k in record and v})
+                        cursor = conn.execute(
+                            f"INSERT OR IGNORE INTO users ({', '.join(USER_COLUMNS)}, updated_at) "
+                            f"VALUES ({', '.join('?' * len(USER_COLUMNS))}, ?)",
+                            [record[col] for col in USER_COLUMNS] + [now]
+                        )
+                        imported += cursor.rowcount
+            conn.execute(
+                "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('csv_migrated', ?)",
+                (f"{imported} users from {csv_path}",)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        if imported:
+            print(f"✓ Migrated {imported} users from {csv_path} to {self.path}")
+        return imported
+
+    @staticmethod
+    def _csv_migrated(conn: sqlite3.Connection) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM store_meta WHERE key = 'csv_migrated'"
+        ).fetchone() is not None
+
+    @timed('user_store_read')
+    def get_user(self, user_id):
+        row = self._connect().execute(
+            f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE user_id = ?",
+            (user_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    @timed('user_store_read')
+    def get_progress(self, user_id):
+        row = self._connect().execute(
+            'SELECT progress FROM users WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row['progress']) if row['progress'] else {}
+
+    def _current_version(self, user_id: str) -> Optional[int]:
+        row = self._connect().execute(
+            'SELECT version FROM users WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        return row['version'] if row else None
+
+    def _insert(self, record: Dict[str, str]) -> bool:
+        """Insert a new user at version 1; False if the user_id exists"""
+        record = dict(record, version=1)
+        cursor = self._connect().execute(
+            f"INSERT INTO users ({', '.join(USER_COLUMNS)}, updated_at) "
+            f"VALUES ({', '.join('?' * len(USER_COLUMNS))}, ?) "
+            f"ON CONFLICT(user_id) DO NOTHING",
+            [record[col] for col in USER_COLUMNS] + [datetime.now().isoformat()]
+        )
+        return cursor.rowcount == 1
+
+    def _compare_and_swap(
+        self,
+        user_id: str,
+        version: int,
+        assignments: Dict[str, str]
+    ) -> bool:
+        """Update columns only if the row is still at version; bumps version"""
+        cursor = self._connect().execute(
+            f"UPDATE users SET {', '.join(f'{col} = ?' for col in assignments)}, "
+            f"updated_at = ?, version = version + 1 "
+            f"WHERE user_id = ? AND version = ?",
+            list(assignments.values()) + [datetime.now().isoformat(), user_id, version]
+        )
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def _backoff(attempt: int) -> None:
+        time.sleep(random.uniform(0, 0.001 * (2 ** min(attempt, 6))))
+
+    @timed('user_store_write')
+    def save_profile(self, user_id, profile, expected_version=None):
+        assignments = {key: profile.get(key, '') for key in PROFILE_COLUMNS}
+        with self._user_lock(user_id):
+            for attempt in range(MAX_CAS_RETRIES):
+                current = self._current_version(user_id)
+                if expected_version is not None and (current or 0) != expected_version:
+                    raise VersionConflict(user_id, expected_version, current)
+
+                if current is None:
+                    record = _empty_user(user_id)
+                    record.update(assignments)
+                    if self._insert(record):
+                        return 1
+                elif self._compare_and_swap(user_id, current, assignments):
+                    return current + 1
+
+                # Another process wrote in between
+                if expected_version is not None:
+                    raise VersionConflict(user_id, expected_version, self._current_version(user_id))
+                self._backoff(attempt)
+        raise VersionConflict(user_id, expected_version, self._current_version(user_id))
+
+    @timed('user_store_write')
+    def upsert_profiles(self, profiles):
+        now = datetime.now().isoformat()
+        rows = []
+        for user_id, profile in profiles:
+            record = _empty_user(user_id)
+            record.update({key: profile.get(key, '') for key in PROFILE_COLUMNS})
+            record['version'] = 1
+            rows.append([record[col] for col in USER_COLUMNS] + [now])
+
+        # Existing users keep progress and created_at; the version bump
+        # makes concurrent compare-and-swap writers retry
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                f"INSERT INTO users ({', '.join(USER_COLUMNS)}, updated_at) "
+                f"VALUES ({', '.join('?' * (len(USER_COLUMNS) + 1))}) "
+                f"ON CONFLICT(user_id) DO UPDATE SET "
+                f"{', '.join(f'{col} = excluded.{col}' for col in PROFILE_COLUMNS)}, "
+                f"updated_at = excluded.updated_at, version = users.version + 1",
+                rows
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def set_progress(self, user_id, skill_id, status):
+        self.apply_progress({user_id: {skill_id: status}})
+
+    @timed('user_store_write')
+    def apply_progress(self, updates):
+        conn = self._connect()
+        for user_id, statuses in updates.items():
+            with self._user_lock(user_id):
+                for attempt in range(MAX_CAS_RETRIES):
+                    row = conn.execute(
+                        'SELECT progress, version FROM users WHERE user_id = ?', (user_id,)
+                    ).fetchone()
+                    if row is None:
+                        record = _empty_user(user_id)
+                        record['progress'] = json.dumps(statuses)
+                        if self._insert(record):
+                            break
+                    else:
+                        progress = json.loads(row['progress']) if row['progress'] else {}
+                        progress.update(statuses)
+                        if self._compare_and_swap(
+                            user_id, row['version'], {'progress': json.dumps(progress)}
+                        ):
+                            break
+                    self._backoff(attempt)
+                else:
+                    raise VersionConflict(user_id, None, self._current_version(user_id))
+
+    def iter_users(self):
+        cursor = self._connect().execute(
+            f"SELECT {', '.join(USER_COLUMNS)} FROM users ORDER BY user_id"
+        )
+        for row in cursor:
+            yield dict(row)
+
+    def iter_updated_since(self, since):
+        if since is None:
+            yield from self.iter_users()
+            return
+        cursor = self._connect().execute(
+            f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE updated_at >= ? "
+            f"ORDER BY updated_at",
+            (since,)
+        )
+        for row in cursor:
+            yield dict(row)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store() -> UserRepository:
+    """Process-wide user repository selected by SKILLSYNC_USER_STORE"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = os.environ.get('SKILLSYNC_USER_STORE', 'sqlite').lower()
+                if backend == 'csv':
+                    _store = CsvUserRepository()
+                elif backend == 'sqlite':
+                    _store = SqliteUserRepository()
+                else:
+                    raise ValueError(f"Unknown SKILLSYNC_USER_STORE: {backend}")
+    return _store